@@ -0,0 +1,36 @@
+"""Siapkan Django agar skrip benchmark bisa dijalankan langsung: python benchmarks/<nama>.py"""
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup():
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'melar_project.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """Database SQLite sementara berbasis file (bukan db.sqlite3) yang sudah dimigrasi.
+
+    Berbasis file agar beberapa thread/koneksi melihat data yang sama seperti di produksi.
+    """
+    from django.conf import settings
+    from django.db import connection
+
+    settings.DEBUG = False  # Jangan simpan setiap query di connection.queries
+    settings.ALLOWED_HOSTS = ['localhost', 'testserver']
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,164 @@
+"""Uji beban in-process: RPS dan latensi p99 /products/ dan /api/cart/ di WSGI vs ASGI.
+
+Tiga mode dibandingkan:
+    wsgi        WSGIHandler + ViewSet sync, request paralel lewat thread pool
+    asgi-sync   ASGIHandler + ViewSet sync (lewat sync_to_async)
+    asgi-async  ASGIHandler + view async (ASYNC_READ_ROUTES aktif)
+
+Request dipanggil langsung ke handler tanpa server/jaringan, sehingga angka
+menggambarkan biaya framework dan database saja.
+
+Contoh:
+    python benchmarks/asgi_vs_wsgi.py --requests 2000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import importlib
+import io
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import _django
+
+_django.setup()
+
+from django.core.handlers.asgi import ASGIHandler  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from django.urls import clear_url_caches  # noqa: E402
+
+from carts.models import Cart, CartItem  # noqa: E402
+from products.models import Category, Product  # noqa: E402
+from users.models import CustomUser  # noqa: E402
+from users.serializers import UserClaimsTokenObtainPairSerializer  # noqa: E402
+
+ROUTES = ('product-list', 'product-detail', 'cart-list', 'cart-detail')
+
+
+def seed(products):
+    seller = CustomUser.objects.create_user(
+        email='bench-seller@example.com', username='bench-seller', password='x', role='seller'
+    )
+    customer = CustomUser.objects.create_user(email='bench@example.com', username='bench', password='x')
+    category = Category.objects.create(name='Benchmark')
+    Product.objects.bulk_create([
+        Product(owner=seller, category=category, name=f'Produk {i}', description='Deskripsi produk',
+                price=Decimal('1000.00') + i)
+        for i in range(products)
+    ])
+    cart = Cart.objects.create(user=customer)
+    CartItem.objects.bulk_create([
+        CartItem(cart=cart, product=product, quantity=1) for product in Product.objects.all()[:20]
+    ])
+    Cart.objects.refresh_totals()
+    token = lambda user: str(UserClaimsTokenObtainPairSerializer.get_token(user).access_token)  # noqa: E731
+    return {'/products/': token(seller), '/api/cart/': token(customer)}
+
+
+def reload_urlconfs():
+    for module in ('products.urls', 'carts.urls', 'melar_project.urls'):
+        importlib.reload(importlib.import_module(module))
+    clear_url_caches()
+
+
+def summarize(latencies, elapsed):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / elapsed, statistics.median(latencies) * 1000, p99 * 1000
+
+
+def run_wsgi(path, token, requests, concurrency):
+    handler = WSGIHandler()
+
+    def call(_):
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1', 'HTTP_AUTHORIZATION': f'Bearer {token}',
+            'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+        }
+        start = time.perf_counter()
+        statuses = []
+        response = handler(environ, lambda status, headers: statuses.append(status))
+        b''.join(response)
+        response.close()
+        assert statuses[0].startswith('200'), statuses
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(call, range(requests)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def run_asgi(path, token, requests, concurrency):
+    handler = ASGIHandler()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'localhost'), (b'authorization', f'Bearer {token}'.encode())],
+        'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+    }
+
+    async def call():
+        sent = asyncio.Event()
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await sent.wait()
+            return {'type': 'http.disconnect'}
+
+        status = []
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+            elif not message.get('more_body'):
+                sent.set()
+
+        start = time.perf_counter()
+        await handler(dict(scope), receive, send)
+        assert status == [200], status
+        return time.perf_counter() - start
+
+    async def worker(count, latencies):
+        for _ in range(count):
+            latencies.append(await call())
+
+    async def main():
+        latencies = []
+        per_worker = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(count, latencies) for count in per_worker))
+        return summarize(latencies, time.perf_counter() - start)
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--products', type=int, default=1000)
+    args = parser.parse_args()
+
+    with _django.benchmark_database():
+        tokens = seed(args.products)
+        print(f'{"mode":<11} {"path":<11} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>8}')
+        for mode in ('wsgi', 'asgi-sync', 'asgi-async'):
+            routes = ROUTES if mode == 'asgi-async' else ()
+            with override_settings(ASYNC_READ_ROUTES=list(routes)):
+                reload_urlconfs()
+                for path, token in tokens.items():
+                    run = run_wsgi if mode == 'wsgi' else run_asgi
+                    rps, p50, p99 = run(path, token, args.requests, args.concurrency)
+                    print(f'{mode:<11} {path:<11} {rps:8.1f} {p50:8.2f} {p99:8.2f}')
+
+
+if __name__ == '__main__':
+    main()
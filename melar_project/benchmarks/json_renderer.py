@@ -0,0 +1,88 @@
+"""Waktu render/parse JSON: JSONRenderer/JSONParser DRF vs ORJSONRenderer/ORJSONParser.
+
+Payload dibentuk dari serializer sungguhan: satu halaman /products/ dan keranjang
+dengan banyak item (total_price berupa Decimal mentah).
+
+Contoh:
+    python benchmarks/json_renderer.py --products 100 --repeat 200
+"""
+
+import argparse
+import io
+import time
+from decimal import Decimal
+
+import _django
+
+_django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from carts.models import Cart, CartItem  # noqa: E402
+from carts.serializers import CartSerializer  # noqa: E402
+from melar_project.renderers import ORJSONParser, ORJSONRenderer  # noqa: E402
+from products.models import Category, Product  # noqa: E402
+from products.serializers import ProductSerializer  # noqa: E402
+from users.models import CustomUser  # noqa: E402
+
+
+def measure(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def build_payloads(products):
+    owner = CustomUser.objects.create_user(
+        email='renderer@example.com', username='renderer', password='x', role='seller'
+    )
+    category = Category.objects.create(name='Benchmark')
+    Product.objects.bulk_create(
+        Product(owner=owner, category=category, name=f'Produk {i} – édisi', description=f'Deskripsi produk {i}',
+                price=Decimal('1000.50') + i, available=i % 3 != 0)
+        for i in range(products)
+    )
+    cart = Cart.objects.create(user=owner)
+    CartItem.objects.bulk_create(
+        CartItem(cart=cart, product=product, quantity=i % 5 + 1) for i, product in enumerate(Product.objects.all())
+    )
+    Cart.objects.refresh_totals()
+    product_page = {
+        'next': 'http://testserver/products/?cursor=cD0yMDI0', 'previous': None,
+        'results': ProductSerializer(Product.objects.all(), many=True).data,
+    }
+    return {
+        'produk': product_page,
+        'keranjang': CartSerializer(Cart.objects.prefetch_related('cart_items').get(pk=cart.pk)).data,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with _django.benchmark_database():
+        payloads = build_payloads(args.products)
+
+    for name, data in payloads.items():
+        body = JSONRenderer().render(data)
+        assert ORJSONRenderer().render(data) == body
+        timings = {
+            'render DRF': measure(lambda: JSONRenderer().render(data), args.repeat),
+            'render orjson': measure(lambda: ORJSONRenderer().render(data), args.repeat),
+            'parse DRF': measure(lambda: JSONParser().parse(io.BytesIO(body)), args.repeat),
+            'parse orjson': measure(lambda: ORJSONParser().parse(io.BytesIO(body)), args.repeat),
+        }
+        print(f'{name} ({len(body) / 1024:.0f} KB):')
+        for label, seconds in timings.items():
+            print(f'  {label:<14} {seconds * 1e6:>8.0f} µs')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Throughput verifikasi password (≈ login) per core pada hasher dan iterasi yang dikonfigurasi.
+
+Contoh:
+    python benchmarks/password_hashing.py --seconds 5 --workers 4
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import wait
+
+import _django
+
+_django.setup()
+
+from django.contrib.auth.hashers import get_hasher, make_password  # noqa: E402
+
+from users.hashing import PasswordHashingPool, verify_password  # noqa: E402
+
+
+def run_serial(encoded, seconds):
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        verify_password('benchmark-password', encoded)
+        done += 1
+    return done / (time.perf_counter() - start)
+
+
+def run_pool(encoded, seconds, workers):
+    pool = PasswordHashingPool(workers=workers, max_pending=workers * 2)
+    done, start = 0, time.perf_counter()
+    try:
+        while time.perf_counter() - start < seconds:
+            futures = [pool.submit(verify_password, 'benchmark-password', encoded) for _ in range(workers * 2)]
+            wait(futures)
+            done += len(futures)
+    finally:
+        pool.shutdown()
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    hasher = get_hasher('default')
+    encoded = make_password('benchmark-password')
+    print(f'hasher: {hasher.algorithm}, iterasi: {getattr(hasher, "iterations", "-")}')
+
+    serial = run_serial(encoded, args.seconds)
+    print(f'1 thread      : {serial:8.1f} login/detik')
+    pooled = run_pool(encoded, args.seconds, args.workers)
+    print(f'{args.workers} worker pool : {pooled:8.1f} login/detik ({pooled / args.workers:.1f} per core)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Waktu impor produk massal (CSV/NDJSON) lewat ProductImporter pada SQLite.
+
+Contoh:
+    python benchmarks/product_import.py --rows 100000 --format csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+
+import _django
+
+_django.setup()
+
+from products.importer import ProductImporter, read_rows  # noqa: E402
+from products.models import Category, Product  # noqa: E402
+from users.models import CustomUser  # noqa: E402
+
+
+def write_file(path, rows, input_format, category_ids):
+    records = (
+        {
+            'name': f'Produk {i}',
+            'description': f'Deskripsi produk nomor {i} untuk benchmark impor',
+            'price': f'{1000 + i % 5000}.50',
+            'category': category_ids[i % len(category_ids)],
+            'available': 'true' if i % 3 else 'false',
+        }
+        for i in range(rows)
+    )
+    with open(path, 'w', newline='') as handle:
+        if input_format == 'csv':
+            writer = csv.DictWriter(handle, fieldnames=['name', 'description', 'price', 'category', 'available'])
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            for record in records:
+                handle.write(json.dumps(record) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+    parser.add_argument('--batch-size', type=int, default=None)
+    args = parser.parse_args()
+
+    with _django.benchmark_database(), tempfile.TemporaryDirectory() as directory:
+        owner = CustomUser.objects.create_user(
+            email='import@example.com', username='import', password='x', role='seller'
+        )
+        category_ids = [Category.objects.create(name=f'Kategori {i}').pk for i in range(20)]
+        path = os.path.join(directory, f'produk.{args.format}')
+        write_file(path, args.rows, args.format, category_ids)
+
+        start = time.perf_counter()
+        with open(path, 'rb') as stream:
+            report = ProductImporter(owner=owner, batch_size=args.batch_size).run(read_rows(stream, args.format))
+        elapsed = time.perf_counter() - start
+
+        assert Product.objects.count() == report['created'] == args.rows, report
+        print(f'{args.rows} baris {args.format}: {elapsed:.1f} detik ({args.rows / elapsed:,.0f} baris/detik)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Waktu CPU serialisasi daftar produk: ProductSerializer(many=True) vs FastSerializer.
+
+Mengukur query + pembentukan data per 1.000 produk, tanpa rendering JSON.
+
+Contoh:
+    python benchmarks/serializers.py --rows 1000 --repeat 50
+"""
+
+import argparse
+import time
+from decimal import Decimal
+
+import _django
+
+_django.setup()
+
+from melar_project.fast_serializers import FastSerializer  # noqa: E402
+from products.models import Category, Product  # noqa: E402
+from products.serializers import ProductSerializer  # noqa: E402
+from users.models import CustomUser  # noqa: E402
+
+
+def measure(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with _django.benchmark_database():
+        owner = CustomUser.objects.create_user(
+            email='serializer@example.com', username='serializer', password='x', role='seller'
+        )
+        category = Category.objects.create(name='Benchmark')
+        Product.objects.bulk_create(
+            Product(owner=owner, category=category, name=f'Produk {i}', description=f'Deskripsi {i}',
+                    price=Decimal('1000.50') + i, available=i % 3 != 0)
+            for i in range(args.rows)
+        )
+        queryset = Product.objects.order_by('-created_at', '-id')
+        fast = FastSerializer(ProductSerializer)
+
+        slow_data = ProductSerializer(queryset, many=True).data
+        fast_data = fast.serialize(fast.values(queryset))
+        assert [dict(item) for item in slow_data] == fast_data
+
+        before = measure(lambda: ProductSerializer(queryset.all(), many=True).data, args.repeat)
+        after = measure(lambda: fast.serialize(fast.values(queryset.all())), args.repeat)
+        per_thousand = 1000 / args.rows
+        print(f'ProductSerializer: {before * per_thousand * 1000:.1f} ms CPU / 1.000 produk')
+        print(f'FastSerializer:    {after * per_thousand * 1000:.1f} ms CPU / 1.000 produk ({before / after:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
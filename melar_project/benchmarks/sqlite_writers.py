@@ -0,0 +1,114 @@
+"""Penulis keranjang bersamaan pada SQLite: profil default vs profil produksi.
+
+Setiap thread berulang kali menambah item ke keranjangnya dalam satu transaksi
+(baca keranjang, tulis item, perbarui total), seperti POST /api/cart/<id>/add_item/.
+Dicetak throughput transaksi dan persentase error "database is locked".
+
+Contoh:
+    python benchmarks/sqlite_writers.py --threads 8 --seconds 5
+"""
+
+import argparse
+import threading
+import time
+
+import _django
+
+_django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import OperationalError, connection, connections, transaction  # noqa: E402
+
+from carts.models import Cart, CartItem  # noqa: E402
+from products.models import Category, Product  # noqa: E402
+from users.models import CustomUser  # noqa: E402
+
+PROFILES = {
+    'default': {},
+    'production': {
+        'CONN_MAX_AGE': None,
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 5},
+        'PRAGMAS': settings.SQLITE_PRODUCTION_PRAGMAS,
+    },
+}
+
+
+def writer(cart_id, product_ids, deadline, results, lock):
+    done = errors = 0
+    try:
+        while time.perf_counter() < deadline:
+            try:
+                with transaction.atomic():
+                    cart = Cart.objects.get(pk=cart_id)
+                    product_id = product_ids[done % len(product_ids)]
+                    item, created = CartItem.objects.get_or_create(
+                        cart=cart, product_id=product_id, defaults={'quantity': 1}
+                    )
+                    if not created:
+                        CartItem.objects.filter(pk=item.pk).update(quantity=item.quantity + 1)
+                    Cart.objects.refresh_totals(Cart.objects.filter(pk=cart_id))
+                done += 1
+            except OperationalError as exc:
+                if 'locked' not in str(exc):
+                    raise
+                errors += 1
+    finally:
+        connection.close()
+    with lock:
+        results['done'] += done
+        results['errors'] += errors
+
+
+def run(profile, threads, seconds):
+    with _django.benchmark_database():
+        saved = {key: connection.settings_dict[key] for key in ('CONN_MAX_AGE', 'OPTIONS')}
+        connection.settings_dict.update(PROFILES[profile])
+        connection.close()  # Koneksi berikutnya memakai OPTIONS/PRAGMAS profil
+        category = Category.objects.create(name='Benchmark')
+        owner = CustomUser.objects.create_user(
+            email='writers@example.com', username='writers', password='x', role='seller'
+        )
+        product_ids = [
+            Product.objects.create(owner=owner, category=category, name=f'Produk {i}', description='-', price=10).pk
+            for i in range(20)
+        ]
+        cart_ids = []
+        for i in range(threads):
+            user = CustomUser.objects.create_user(email=f'writer{i}@example.com', username=f'writer{i}', password='x')
+            cart_ids.append(Cart.objects.create(user=user).pk)
+        journal_mode = connection.cursor().execute('PRAGMA journal_mode').fetchone()[0]
+        connections.close_all()
+
+        results, lock = {'done': 0, 'errors': 0}, threading.Lock()
+        deadline = time.perf_counter() + seconds
+        workers = [
+            threading.Thread(target=writer, args=(cart_id, product_ids, deadline, results, lock))
+            for cart_id in cart_ids
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        connection.settings_dict.pop('PRAGMAS', None)
+        connection.settings_dict.update(saved)
+
+    attempts = results['done'] + results['errors']
+    print(
+        f'{profile:<10} (journal={journal_mode}): {results["done"] / elapsed:,.0f} transaksi/detik, '
+        f'error locked {results["errors"]}/{attempts} ({results["errors"] / max(attempts, 1):.1%})'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+    for profile in PROFILES:
+        run(profile, args.threads, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CartsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "carts"
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from . import checks, signals  # noqa: F401
+        from .sharding import reserve_shard_ids
+
+        post_migrate.connect(reserve_shard_ids, sender=self)
@@ -0,0 +1,19 @@
+from django.core.checks import Error, register
+
+from products.checks import is_per_process_cache
+from .models import cart_id_cache
+
+
+@register(deploy=True)
+def check_cart_id_cache(app_configs, **kwargs):
+    """Pemetaan pengguna -> id keranjang harus bersama agar penghapusan keranjang terlihat oleh semua worker."""
+    if not is_per_process_cache(cart_id_cache()):
+        return []
+    return [
+        Error(
+            "CART_ID_CACHE memakai cache per proses; worker lain tetap memakai id keranjang "
+            "yang sudah dihapus.",
+            hint='Arahkan CART_ID_CACHE ke alias cache bersama (Redis, Memcached, database).',
+            id='carts.E001',
+        )
+    ]
@@ -0,0 +1,119 @@
+import re
+import secrets
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from products.models import Product
+from .models import Cart
+from .sharding import shard_for_user
+
+# Token keranjang tamu dikirim lewat cookie (browser) atau header (klien API)
+GUEST_CART_COOKIE = 'melar_guest_cart'
+GUEST_CART_HEADER = 'X-Guest-Cart'
+
+_TOKEN_PATTERN = re.compile(r'[A-Za-z0-9_-]{24}')
+
+
+def new_guest_cart_token():
+    return secrets.token_urlsafe(18)
+
+
+def guest_cart_token(request):
+    """Token keranjang tamu dari cookie atau header; None bila tidak ada atau formatnya salah."""
+    token = request.COOKIES.get(GUEST_CART_COOKIE) or request.headers.get(GUEST_CART_HEADER)
+    if token and _TOKEN_PATTERN.fullmatch(token):
+        return token
+    return None
+
+
+class GuestCartStore:
+    """Keranjang pengunjung anonim di cache Django, bukan di tabel Cart/CartItem.
+
+    Isi keranjang disimpan sebagai string ringkas 'product:quantity,...' dengan
+    TTL yang diperpanjang setiap kali keranjang diubah; keranjang yang
+    ditinggalkan hilang sendiri tanpa pembersihan di database.
+    """
+
+    def __init__(self, cache, timeout, max_lines):
+        self.cache = cache
+        self.timeout = timeout
+        self.max_lines = max_lines
+
+    @staticmethod
+    def key(token):
+        return f'guest-cart:{token}'
+
+    @staticmethod
+    def encode(lines):
+        return ','.join(f'{product_id}:{quantity}' for product_id, quantity in lines.items())
+
+    @staticmethod
+    def decode(value):
+        lines = {}
+        for line in value.split(',') if value else ():
+            product_id, _, quantity = line.partition(':')
+            if product_id.isdigit() and quantity.isdigit() and int(quantity) > 0:
+                lines[int(product_id)] = int(quantity)
+        return lines
+
+    def get(self, token):
+        return self.decode(self.cache.get(self.key(token)))
+
+    def save(self, token, lines):
+        if lines:
+            self.cache.set(self.key(token), self.encode(lines), self.timeout)
+        else:
+            self.cache.delete(self.key(token))
+
+    def delete(self, token):
+        self.cache.delete(self.key(token))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_guest_cart_store():
+    """Bangun GuestCartStore dari settings.GUEST_CARTS (sekali per proses)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            config = getattr(settings, 'GUEST_CARTS', {})
+            _store = GuestCartStore(
+                caches[config.get('CACHE', 'default')],
+                timeout=config.get('TTL', 7 * 24 * 3600),
+                max_lines=config.get('MAX_LINES', 100),
+            )
+        return _store
+
+
+def reset_guest_cart_store():
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def merge_guest_cart(user, token):
+    """Gabungkan keranjang tamu ke keranjang `user` setelah login, lalu hapus dari cache.
+
+    Quantity dijumlahkan dengan item yang sudah ada; semua baris ditulis dengan
+    satu bulk upsert di shard pengguna (Cart.objects.add_lines). Produk yang sudah
+    dihapus dilewati. Mengembalikan jumlah baris yang digabungkan.
+    """
+    store = get_guest_cart_store()
+    lines = store.get(token)
+    if not lines:
+        return 0
+    existing_products = set(Product.objects.filter(pk__in=list(lines)).values_list('pk', flat=True))
+    lines = {product_id: quantity for product_id, quantity in lines.items() if product_id in existing_products}
+
+    if lines:
+        carts = Cart.objects.using(shard_for_user(user.pk))
+        with transaction.atomic(using=carts.db):
+            # Id dari cache diperiksa: keranjang yang dihapus proses lain tidak boleh menerima item
+            carts.add_lines(carts.checked_cart_id_for_user(user), lines)
+    store.delete(token)
+    return len(lines)
@@ -0,0 +1,98 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from carts.models import Cart, CartItem
+from carts.sharding import cart_shards, reserve_shard_ids, shard_for_user
+
+
+class Command(BaseCommand):
+    help = (
+        "Pindahkan keranjang (beserta item) ke shard milik pemiliknya setelah CART_SHARDS berubah. "
+        "Aman dijalankan ulang: baris yang sudah ada di shard tujuan tidak disalin dua kali."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Jumlah keranjang yang dipindah per transaksi.",
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Hanya hitung keranjang yang perlu dipindah.",
+        )
+
+    def handle(self, *args, **options):
+        shards = cart_shards()
+        unknown = [alias for alias in shards if alias not in connections]
+        if unknown:
+            raise CommandError(f"Alias CART_SHARDS tidak ada di DATABASES: {', '.join(unknown)}")
+        for alias in shards:
+            reserve_shard_ids(using=alias)
+
+        # 'default' tetap diperiksa walau bukan shard: asal data sebelum sharding diaktifkan
+        sources = shards if DEFAULT_DB_ALIAS in shards else [DEFAULT_DB_ALIAS, *shards]
+        moved = 0
+        for source in sources:
+            moved += self.rebalance_shard(source, shards, options['batch_size'], options['dry_run'])
+
+        verb = "Would move" if options['dry_run'] else "Moved"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {moved} carts."))
+
+    def rebalance_shard(self, source, shards, batch_size, dry_run):
+        moved, last_id = 0, 0
+        while True:
+            rows = list(
+                Cart.objects.using(source).filter(pk__gt=last_id).order_by('pk')
+                .values_list('pk', 'user_id')[:batch_size]
+            )
+            if not rows:
+                return moved
+            last_id = rows[-1][0]
+            targets = {}
+            for cart_id, user_id in rows:
+                target = shard_for_user(user_id, shards)
+                if target != source:
+                    targets.setdefault(target, []).append(cart_id)
+            for target, cart_ids in targets.items():
+                if not dry_run:
+                    self.move(source, target, cart_ids)
+                moved += len(cart_ids)
+
+    def move(self, source, target, cart_ids):
+        """Salin ke shard tujuan (id dan timestamp dipertahankan) lalu hapus dari asal.
+
+        Bila proses berhenti di antara dua langkah, menjalankan ulang command akan
+        melewati baris yang sudah tersalin dan menyelesaikan penghapusan.
+        """
+        carts = list(Cart.objects.using(source).filter(pk__in=cart_ids))
+        items = list(CartItem.objects.using(source).filter(cart_id__in=cart_ids))
+        # Pengguna yang sudah membuat keranjang baru di shard tujuan: item lama digabung ke
+        # keranjang itu (satu keranjang per pengguna), bukan disalin sebagai keranjang kedua.
+        # Quantity dijumlahkan, jadi hanya langkah ini yang tidak aman diulang bila proses
+        # berhenti sebelum keranjang asal dihapus
+        target_carts = dict(
+            Cart.objects.using(target).filter(user_id__in=[cart.user_id for cart in carts])
+            .exclude(pk__in=cart_ids).values_list('user_id', 'pk')
+        )
+        merged = {cart.pk: target_carts[cart.user_id] for cart in carts if cart.user_id in target_carts}
+        carts = [cart for cart in carts if cart.pk not in merged]
+        merged_lines = {}
+        for item in items:
+            if item.cart_id in merged:
+                merged_lines.setdefault(merged[item.cart_id], {})[item.product_id] = item.quantity
+        items = [item for item in items if item.cart_id not in merged]
+        with transaction.atomic(using=target):
+            for target_cart_id, lines in merged_lines.items():
+                Cart.objects.using(target).add_lines(target_cart_id, lines)
+            existing_carts = set(Cart.objects.using(target).filter(pk__in=cart_ids).values_list('pk', flat=True))
+            existing_items = set(
+                CartItem.objects.using(target).filter(pk__in=[item.pk for item in items]).values_list('pk', flat=True)
+            )
+            # raw=True: created_at/updated_at tidak ditimpa auto_now(_add)
+            for obj in [cart for cart in carts if cart.pk not in existing_carts] + [
+                item for item in items if item.pk not in existing_items
+            ]:
+                obj.save_base(using=target, raw=True, force_insert=True)
+        with transaction.atomic(using=source):
+            CartItem.objects.using(source).filter(cart_id__in=cart_ids).delete()
+            Cart.objects.using(source).filter(pk__in=cart_ids).delete()
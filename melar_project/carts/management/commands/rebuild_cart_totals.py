@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from carts.models import Cart
+from carts.sharding import cart_shards
+
+
+class Command(BaseCommand):
+    help = "Hitung ulang kolom item_count dan subtotal semua keranjang dari cart_items."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Jumlah keranjang yang diperbarui per transaksi.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        updated = 0
+
+        for alias in cart_shards():
+            carts = Cart.objects.using(alias)
+            last_id = 0
+            # Proses per rentang id agar setiap transaksi tetap pendek
+            while True:
+                ids = list(carts.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+                if not ids:
+                    break
+                with transaction.atomic(using=alias):
+                    updated += carts.filter(pk__gte=ids[0], pk__lte=ids[-1]).refresh_totals()
+                last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt totals for {updated} carts."))
@@ -0,0 +1,76 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:08
+
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS, migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_cart_totals(apps, schema_editor):
+    """Isi item_count dan subtotal dari item keranjang di database yang sedang dimigrasi.
+
+    Di shard keranjang tabel produk kosong, jadi harga dibaca dari database katalog
+    (default) dan total dihitung di Python, seperti pada 0007.
+    """
+    db_alias = schema_editor.connection.alias
+    Cart = apps.get_model("carts", "Cart")
+    CartItem = apps.get_model("carts", "CartItem")
+    Product = apps.get_model("products", "Product")
+    total_field = models.DecimalField(max_digits=12, decimal_places=2)
+
+    if db_alias != DEFAULT_DB_ALIAS:
+        items = list(CartItem.objects.using(db_alias).values_list("cart_id", "product_id", "quantity"))
+        prices = dict(
+            Product.objects.using(DEFAULT_DB_ALIAS)
+            .filter(pk__in={product_id for _, product_id, _ in items})
+            .values_list("pk", "price")
+        )
+        totals = {}
+        for cart_id, product_id, quantity in items:
+            count, subtotal = totals.get(cart_id, (0, Decimal(0)))
+            totals[cart_id] = (count + quantity, subtotal + quantity * prices.get(product_id, 0))
+        carts = list(Cart.objects.using(db_alias).filter(pk__in=list(totals)))
+        for cart in carts:
+            cart.item_count, cart.subtotal = totals[cart.pk]
+        Cart.objects.using(db_alias).bulk_update(carts, ["item_count", "subtotal"])
+        return
+
+    items = CartItem.objects.using(db_alias).filter(cart=OuterRef("pk")).order_by().values("cart")
+    Cart.objects.using(db_alias).update(
+        item_count=Coalesce(
+            Subquery(items.annotate(count=Sum("quantity")).values("count")),
+            Value(0),
+        ),
+        subtotal=Coalesce(
+            Subquery(
+                items.annotate(
+                    total=Sum(F("quantity") * F("product__price"), output_field=total_field)
+                ).values("total")
+            ),
+            Value(0),
+            output_field=total_field,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carts", "0002_remove_cart_total_price_alter_cart_user_and_more"),
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cart",
+            name="item_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="cart",
+            name="subtotal",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(populate_cart_totals, migrations.RunPython.noop),
+    ]
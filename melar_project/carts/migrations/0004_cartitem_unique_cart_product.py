@@ -0,0 +1,47 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:20
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_cart_items(apps, schema_editor):
+    """Gabungkan baris CartItem dengan (cart, product) yang sama ke baris dengan id terkecil."""
+    CartItem = apps.get_model("carts", "CartItem")
+    db_alias = schema_editor.connection.alias
+    duplicates = (
+        CartItem.objects.using(db_alias).values("cart_id", "product_id")
+        .annotate(rows=Count("id"), keep_id=Min("id"), total_quantity=Sum("quantity"))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    keepers = {row["keep_id"]: row for row in duplicates}
+    if not keepers:
+        return
+
+    kept_items = list(CartItem.objects.using(db_alias).filter(pk__in=keepers))
+    for item in kept_items:
+        item.quantity = keepers[item.pk]["total_quantity"]
+    CartItem.objects.using(db_alias).bulk_update(kept_items, ["quantity"])
+
+    for row in keepers.values():
+        CartItem.objects.using(db_alias).filter(
+            cart_id=row["cart_id"], product_id=row["product_id"]
+        ).exclude(pk=row["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carts", "0003_cart_item_count_subtotal"),
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cart_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="cartitem",
+            constraint=models.UniqueConstraint(
+                fields=("cart", "product"), name="unique_cart_product"
+            ),
+        ),
+    ]
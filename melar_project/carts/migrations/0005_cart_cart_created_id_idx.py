@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carts", "0004_cartitem_unique_cart_product"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cart",
+            index=models.Index(fields=["created_at", "id"], name="cart_created_id_idx"),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:38
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, migrations, models
+from django.db.models import Count, Min
+from django.utils import timezone
+
+
+def merge_duplicate_carts(apps, schema_editor):
+    """Gabungkan keranjang ganda milik satu pengguna ke keranjang dengan id terkecil.
+
+    Quantity produk yang sama dijumlahkan, lalu total keranjang yang dipertahankan
+    dihitung ulang. Harga dibaca dari database katalog (default), karena di shard
+    keranjang tabel produk kosong.
+    """
+    db_alias = schema_editor.connection.alias
+    Cart = apps.get_model("carts", "Cart")
+    CartItem = apps.get_model("carts", "CartItem")
+    Product = apps.get_model("products", "Product")
+
+    duplicates = (
+        Cart.objects.using(db_alias)
+        .values("user_id")
+        .annotate(carts=Count("id"), keep_id=Min("id"))
+        .filter(carts__gt=1)
+        .order_by()
+    )
+    keep_ids = {row["user_id"]: row["keep_id"] for row in duplicates}
+    if not keep_ids:
+        return
+
+    cart_users = dict(
+        Cart.objects.using(db_alias).filter(user_id__in=list(keep_ids)).values_list("pk", "user_id")
+    )
+    quantities = {}
+    for cart_id, product_id, quantity in (
+        CartItem.objects.using(db_alias)
+        .filter(cart_id__in=list(cart_users))
+        .values_list("cart_id", "product_id", "quantity")
+    ):
+        key = (keep_ids[cart_users[cart_id]], product_id)
+        quantities[key] = quantities.get(key, 0) + quantity
+
+    duplicate_ids = [pk for pk, user_id in cart_users.items() if pk != keep_ids[user_id]]
+    CartItem.objects.using(db_alias).filter(cart_id__in=duplicate_ids).delete()
+    Cart.objects.using(db_alias).filter(pk__in=duplicate_ids).delete()
+    CartItem.objects.using(db_alias).bulk_create(
+        [
+            CartItem(cart_id=cart_id, product_id=product_id, quantity=quantity)
+            for (cart_id, product_id), quantity in quantities.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["cart", "product"],
+        update_fields=["quantity"],
+    )
+
+    prices = dict(
+        Product.objects.using(DEFAULT_DB_ALIAS)
+        .filter(pk__in={product_id for _, product_id in quantities})
+        .values_list("pk", "price")
+    )
+    carts = list(Cart.objects.using(db_alias).filter(pk__in=list(keep_ids.values())))
+    now = timezone.now()
+    for cart in carts:
+        cart.item_count, cart.subtotal = 0, Decimal(0)
+        cart.updated_at = now
+    by_id = {cart.pk: cart for cart in carts}
+    for (cart_id, product_id), quantity in quantities.items():
+        by_id[cart_id].item_count += quantity
+        by_id[cart_id].subtotal += quantity * prices.get(product_id, 0)
+    Cart.objects.using(db_alias).bulk_update(carts, ["item_count", "subtotal", "updated_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carts", "0006_cart_cart_user_recent_idx"),
+        ("products", "0001_initial"),
+        # Remake tabel saat rollback harus melihat primary key pengguna setelah diganti nama
+        ("users", "0002_rename_user_id_customuser_id"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_carts, migrations.RunPython.noop),
+        # Indeks (user, created_at, id) tidak diperlukan lagi: constraint unik sudah mengindeks user
+        migrations.RemoveIndex(
+            model_name="cart",
+            name="cart_user_recent_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="cart",
+            constraint=models.UniqueConstraint(fields=("user",), name="unique_cart_user"),
+        ),
+    ]
@@ -1,24 +1,200 @@
 # carts/models.py
-from django.db import models
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from users.models import CustomUser  # Asumsi Anda memiliki model CustomUser
 from products.models import Product  # Asumsi Anda memiliki model Product
 
+TOTAL_PRICE_FIELD = DecimalField(max_digits=12, decimal_places=2)
+
+
+def cart_id_cache_key(user_id):
+    return f'cart-id:{user_id}'
+
+
+def cart_id_cache():
+    return caches[getattr(settings, 'CART_ID_CACHE', 'default')]
+
+
+def total_price_expression(prefix=''):
+    """Ekspresi SUM(quantity * price) untuk dihitung di database."""
+    return Coalesce(
+        Sum(F(f'{prefix}quantity') * F(f'{prefix}product__price'), output_field=TOTAL_PRICE_FIELD),
+        Value(0),
+        output_field=TOTAL_PRICE_FIELD,
+    )
+
+
+def item_count_expression(prefix=''):
+    """Ekspresi SUM(quantity) untuk dihitung di database."""
+    return Coalesce(Sum(f'{prefix}quantity'), Value(0))
+
+
+class CartQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Anotasi total harga dan jumlah item yang dihitung oleh database."""
+        return self.annotate(
+            items_total=total_price_expression('cart_items__'),
+            items_count=item_count_expression('cart_items__'),
+        )
+
+    def cart_id_for_user(self, user):
+        """Id keranjang milik `user`, dibuat bila belum ada.
+
+        Pemetaan pengguna -> id keranjang di-cache (CART_ID_CACHE_TIMEOUT detik), jadi
+        operasi keranjang yang sering tidak perlu query pencarian. Saat cache kosong,
+        keranjang diambil atau dibuat dengan satu INSERT ... ON CONFLICT DO UPDATE
+        ... RETURNING id sehingga request bersamaan tidak membuat keranjang ganda.
+        Id keranjang tetap saat dipindah antar shard, jadi cache berlaku di semua shard.
+
+        Id dari cache tidak diperiksa ke database; pemanggil yang menulis atau membaca
+        keranjang memakai checked_cart_id_for_user atau menangani keranjang yang hilang.
+        """
+        key = cart_id_cache_key(user.pk)
+        cache = cart_id_cache()
+        cart_id = cache.get(key)
+        if cart_id is None:
+            cart = self.model(user_id=user.pk)
+            # Memperbarui user_id dengan nilai yang sama: baris lama tidak berubah (updated_at
+            # dan ETag tetap), tetapi RETURNING tetap mengembalikan id-nya
+            self.bulk_create([cart], update_conflicts=True, unique_fields=['user'], update_fields=['user'])
+            cart_id = cart.pk
+            # Baru di-cache setelah commit: keranjang yang batal dibuat tidak boleh tertinggal di cache
+            transaction.on_commit(
+                lambda: cache.set(key, cart_id, getattr(settings, 'CART_ID_CACHE_TIMEOUT', 3600)), using=self.db
+            )
+        return cart_id
+
+    def checked_cart_id_for_user(self, user):
+        """Seperti cart_id_for_user, tetapi id dari cache dipastikan masih ada dengan satu query.
+
+        Keranjang bisa dihapus di proses lain, oleh rebalance_carts atau delete mentah tanpa
+        signal; id usang dibuang dari cache lalu keranjang diambil atau dibuat ulang.
+        """
+        cart_id = self.cart_id_for_user(user)
+        if not self.filter(pk=cart_id, user_id=user.pk).exists():
+            self.forget_cart_id(user.pk)
+            cart_id = self.cart_id_for_user(user)
+        return cart_id
+
+    @staticmethod
+    def forget_cart_id(user_id):
+        cart_id_cache().delete(cart_id_cache_key(user_id))
+
+    def add_lines(self, cart_id, lines):
+        """Tambahkan {product_id: quantity} ke keranjang; quantity dijumlahkan dengan item
+        yang sudah ada dan semua baris ditulis dengan satu bulk upsert, lalu total dihitung ulang.
+        """
+        items = CartItem.objects.using(self.db)
+        current = dict(
+            items.filter(cart_id=cart_id, product_id__in=list(lines)).values_list('product_id', 'quantity')
+        )
+        items.bulk_create(
+            [
+                CartItem(cart_id=cart_id, product_id=product_id, quantity=current.get(product_id, 0) + quantity)
+                for product_id, quantity in lines.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['cart', 'product'],
+            update_fields=['quantity'],
+        )
+        return self.filter(pk=cart_id).refresh_totals(touch=True)
+
+    def refresh_totals(self, touch=False):
+        """Hitung ulang item_count dan subtotal dari cart_items dalam satu UPDATE."""
+        if self.db != DEFAULT_DB_ALIAS:
+            return self._refresh_totals_across_databases(touch)
+        items = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+        extra = {'updated_at': timezone.now()} if touch else {}
+        return self.update(
+            item_count=Coalesce(Subquery(items.annotate(count=Sum('quantity')).values('count')), Value(0)),
+            subtotal=Coalesce(
+                Subquery(items.annotate(
+                    total=Sum(F('quantity') * F('product__price'), output_field=TOTAL_PRICE_FIELD)
+                ).values('total')),
+                Value(0),
+                output_field=TOTAL_PRICE_FIELD,
+            ),
+            **extra,
+        )
+
+    def _refresh_totals_across_databases(self, touch):
+        """Varian refresh_totals untuk shard keranjang: harga produk ada di database katalog,
+        jadi tidak bisa di-join; total dihitung di Python lalu ditulis dengan bulk_update.
+        """
+        carts = list(self.only('pk'))
+        items = list(
+            CartItem.objects.using(self.db).filter(cart__in=[cart.pk for cart in carts])
+            .values_list('cart_id', 'product_id', 'quantity')
+        )
+        prices = dict(
+            Product.objects.using(DEFAULT_DB_ALIAS).filter(pk__in={product_id for _, product_id, _ in items})
+            .values_list('pk', 'price')
+        )
+        totals = {cart.pk: [0, Decimal(0)] for cart in carts}
+        for cart_id, product_id, quantity in items:
+            totals[cart_id][0] += quantity
+            totals[cart_id][1] += quantity * prices.get(product_id, 0)
+        fields = ['item_count', 'subtotal']
+        now = timezone.now()
+        for cart in carts:
+            cart.item_count, cart.subtotal = totals[cart.pk]
+            if touch:
+                cart.updated_at = now
+        self.model.objects.using(self.db).bulk_update(carts, fields + ['updated_at'] if touch else fields)
+        return len(carts)
+
+
 class Cart(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='carts')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Total yang disimpan (denormalisasi), diperbarui oleh CartItemViewSet
+    # dan dapat dibangun ulang dengan `manage.py rebuild_cart_totals`
+    item_count = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    objects = CartQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Satu keranjang per pengguna; juga target konflik upsert di cart_id_for_user
+            models.UniqueConstraint(fields=['user'], name='unique_cart_user'),
+        ]
+        indexes = [
+            # Urutan paginasi cursor (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='cart_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"Cart of {self.user.username}"
     
     def get_total_price(self):
-        total = sum(item.product.price * item.quantity for item in self.cart_items.all())
-        return total
+        # Gunakan anotasi dari CartQuerySet.with_totals() jika tersedia
+        if hasattr(self, 'items_total'):
+            return self.items_total
+        return self.cart_items.aggregate(total=total_price_expression())['total']
+
+    def get_item_count(self):
+        if hasattr(self, 'items_count'):
+            return self.items_count
+        return self.cart_items.aggregate(count=item_count_expression())['count']
 
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, related_name='cart_items', on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
 
+    class Meta:
+        constraints = [
+            # Satu baris per produk di setiap keranjang, dipakai juga untuk upsert massal
+            models.UniqueConstraint(fields=['cart', 'product'], name='unique_cart_product'),
+        ]
+
     def __str__(self):
         return f"{self.quantity} x {self.product.name} in cart"
@@ -12,12 +12,35 @@ class CartSerializer(serializers.ModelSerializer):
     cart_items = CartItemSerializer(many=True, read_only=True)
     # Menampilkan total harga keranjang
     total_price = serializers.SerializerMethodField()
+    # Menampilkan jumlah seluruh item (quantity) di keranjang
+    item_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Cart
-        fields = ['id', 'user', 'cart_items', 'created_at', 'updated_at', 'total_price']
+        fields = ['id', 'user', 'cart_items', 'created_at', 'updated_at', 'total_price', 'item_count']
 
     def get_total_price(self, obj):
-        # Menghitung total harga keranjang berdasarkan cart_item yang terkait
-        total = sum(item.quantity * item.product.price for item in obj.cart_items.all())
-        return total
+        # Total dibaca dari kolom subtotal yang diperbarui setiap kali item berubah
+        return obj.subtotal
+
+
+class CartItemLineSerializer(serializers.Serializer):
+    # Produk divalidasi sekaligus di view (satu query), bukan per baris
+    product = serializers.IntegerField()
+    # Quantity 0 menghapus produk dari keranjang
+    quantity = serializers.IntegerField(min_value=0)
+
+
+class CartLinesSerializer(serializers.Serializer):
+    items = CartItemLineSerializer(many=True, allow_empty=False, max_length=500)
+
+    def validate_items(self, value):
+        """Pastikan setiap produk hanya muncul sekali dalam satu batch."""
+        product_ids = [line['product'] for line in value]
+        if len(product_ids) != len(set(product_ids)):
+            raise serializers.ValidationError("Setiap produk hanya boleh muncul sekali.")
+        return value
+
+
+class BulkCartItemSerializer(CartLinesSerializer):
+    cart = serializers.IntegerField()
@@ -0,0 +1,144 @@
+import hashlib
+import inspect
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+
+# Rentang id per shard: shard ke-i memberi id mulai i * SHARD_ID_SPAN, sehingga id
+# keranjang/item tetap unik global dan bisa dipindah antar shard tanpa diganti
+SHARD_ID_SPAN = 2 ** 40
+
+SHARDED_MODELS = {'carts.cart', 'carts.cartitem'}
+
+_current_shard = ContextVar('cart_shard', default=None)
+
+
+def cart_shards():
+    """Alias database shard keranjang, berurutan; 'default' adalah shard 0 bila tidak diatur."""
+    return list(getattr(settings, 'CART_SHARDS', None) or [DEFAULT_DB_ALIAS])
+
+
+def jump_hash(key, buckets):
+    """Jump consistent hash (Lamping & Veach): menambah bucket di akhir hanya
+    memindahkan ±1/buckets kunci, dan semuanya ke bucket baru.
+    """
+    bucket, candidate = -1, 0
+    while candidate < buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_for_user(user_id, shards=None):
+    shards = cart_shards() if shards is None else shards
+    if len(shards) == 1:
+        return shards[0]
+    key = int.from_bytes(hashlib.blake2b(str(user_id).encode(), digest_size=8).digest(), 'big')
+    return shards[jump_hash(key, len(shards))]
+
+
+def use_user_shard(user):
+    """Arahkan query Cart/CartItem request ini ke shard milik `user` (diatur setelah autentikasi)."""
+    if user is not None and user.is_authenticated:
+        _current_shard.set(shard_for_user(user.pk))
+
+
+def cart_transaction():
+    """transaction.atomic() di database tempat Cart/CartItem request ini ditulis.
+
+    atomic() tanpa argumen membuka transaksi di 'default', sehingga tulisan ke
+    shard keranjang tidak ikut di-rollback bila terjadi error.
+    """
+    from .models import Cart
+
+    return transaction.atomic(using=router.db_for_write(Cart))
+
+
+def is_sharded(model):
+    return model._meta.label_lower in SHARDED_MODELS
+
+
+class CartShardRouter:
+    """Tempatkan Cart dan CartItem di shard milik pengguna; model lain diserahkan ke router berikutnya.
+
+    Di dalam CartShardMixin shard diambil dari pengguna request. Di luar view
+    (command, shell) gunakan `.using(shard_for_user(user_id))` secara eksplisit.
+    """
+
+    def _db(self, model, hints):
+        if not is_sharded(model):
+            return None
+        shard = _current_shard.get()
+        if shard is not None:
+            return shard
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._db(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._db(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if is_sharded(type(obj1)) and is_sharded(type(obj2)):
+            return obj1._state.db == obj2._state.db
+        return None
+
+
+class CartShardMixin:
+    """View keranjang (ViewSet DRF atau AsyncReadOnlyView): semua query Cart/CartItem
+    selama request diarahkan ke shard pengguna yang terautentikasi.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if getattr(self, 'view_is_async', False):
+            return self._adispatch(super().dispatch(request, *args, **kwargs))
+        token = _current_shard.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _current_shard.reset(token)
+
+    async def _adispatch(self, coroutine):
+        # Direset juga di jalur async: async_to_sync menyalin perubahan context ke thread pemanggil
+        token = _current_shard.set(None)
+        try:
+            return await coroutine
+        finally:
+            _current_shard.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        result = super().initial(request, *args, **kwargs)
+        if inspect.isawaitable(result):
+            return self._ainitial(result, request)
+        use_user_shard(request.user)
+
+    async def _ainitial(self, awaitable, request):
+        await awaitable
+        use_user_shard(request.user)
+
+
+def reserve_shard_ids(using, **kwargs):
+    """post_migrate: mulai AUTOINCREMENT tabel keranjang di rentang id milik shard."""
+    shards = cart_shards()
+    if using not in shards or connections[using].vendor != 'sqlite':
+        return
+    floor = shards.index(using) * SHARD_ID_SPAN
+    if not floor:
+        return
+    from .models import Cart, CartItem
+
+    with connections[using].cursor() as cursor:
+        for model in (Cart, CartItem):
+            table = model._meta.db_table
+            cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = %s', [table])
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)', [table, floor])
+            elif row[0] < floor:
+                cursor.execute('UPDATE sqlite_sequence SET seq = %s WHERE name = %s', [floor, table])
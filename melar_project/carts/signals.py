@@ -0,0 +1,53 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from products.models import Product
+from users.models import CustomUser
+from .models import Cart, CartItem
+from .sharding import cart_shards
+
+
+@receiver(post_delete, sender=Cart)
+def forget_cart_id(sender, instance, **kwargs):
+    # Termasuk hapus berantai saat pengguna dihapus dan keranjang yang digabung rebalance_carts
+    Cart.objects.forget_cart_id(instance.user_id)
+
+
+def _other_shards():
+    # Di 'default' foreign key CASCADE sudah menghapus baris terkait; shard lain tanpa foreign key
+    return [alias for alias in cart_shards() if alias != DEFAULT_DB_ALIAS]
+
+
+def delete_product_items(product_id, aliases):
+    """Hapus item produk yang sudah dihapus dari keranjang di shard, lalu hitung ulang totalnya."""
+    for alias in aliases:
+        items = CartItem.objects.using(alias).filter(product_id=product_id)
+        cart_ids = list(items.values_list('cart_id', flat=True).distinct())
+        if cart_ids:
+            with transaction.atomic(using=alias):
+                items.delete()
+                Cart.objects.using(alias).filter(pk__in=cart_ids).refresh_totals(touch=True)
+
+
+def delete_user_carts(user_id, aliases):
+    """Hapus keranjang (beserta item) pengguna yang sudah dihapus dari shard."""
+    for alias in aliases:
+        with transaction.atomic(using=alias):
+            CartItem.objects.using(alias).filter(cart__user_id=user_id).delete()
+            Cart.objects.using(alias).filter(user_id=user_id).delete()
+
+
+@receiver(post_delete, sender=Product)
+def delete_sharded_product_items(sender, instance, using, **kwargs):
+    aliases = _other_shards()
+    if aliases:
+        # Setelah commit: penghapusan produk yang di-rollback tidak boleh mengosongkan keranjang
+        transaction.on_commit(lambda: delete_product_items(instance.pk, aliases), using=using)
+
+
+@receiver(post_delete, sender=CustomUser)
+def delete_sharded_user_carts(sender, instance, using, **kwargs):
+    aliases = _other_shards()
+    if aliases:
+        transaction.on_commit(lambda: delete_user_carts(instance.pk, aliases), using=using)
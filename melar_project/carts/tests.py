@@ -1,9 +1,24 @@
-from django.test import TestCase
+import time
+from decimal import Decimal
+from unittest import mock
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.contrib.auth import get_user_model
 from products.models import Product, Category
-from carts.models import Cart, CartItem
+from carts.guest import GUEST_CART_COOKIE, GUEST_CART_HEADER, get_guest_cart_store, reset_guest_cart_store
+from carts.checks import check_cart_id_cache
+from carts.models import Cart, CartItem, CartQuerySet, cart_id_cache_key
+from carts.sharding import SHARD_ID_SPAN, reserve_shard_ids, shard_for_user
+from melar_project.metrics import get_metrics_registry, reset_metrics_registry
+from melar_project.sqlite import apply_sqlite_pragmas
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.core.exceptions import ValidationError, PermissionDenied
+from django.core.management import call_command
+from django.core.cache import cache, caches
+from django.db import DatabaseError, IntegrityError, connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from io import StringIO
 
 User = get_user_model()
 
@@ -27,7 +42,8 @@ class CartTests(TestCase):
             category=self.category,
         )
         
-        # Buat keranjang untuk pengguna
+        # Buat keranjang untuk pengguna (pemetaan id keranjang dari test lain tidak berlaku)
+        cache.delete(cart_id_cache_key(self.user.pk))
         self.cart = Cart.objects.create(user=self.user)
 
         # Buat token JWT untuk pengguna
@@ -63,17 +79,24 @@ class CartTests(TestCase):
 
     def test_cart_total_price(self):
         """Test the total price of the cart."""
+        # Satu produk hanya boleh satu baris per keranjang, jadi gunakan produk kedua
+        other_product = Product.objects.create(
+            owner=self.user,
+            name="Other Product",
+            description="Another test product",
+            price=100.00,
+            category=self.category,
+        )
         cart_item1 = CartItem.objects.create(cart=self.cart, product=self.product, quantity=2)
-        cart_item2 = CartItem.objects.create(cart=self.cart, product=self.product, quantity=3)
+        cart_item2 = CartItem.objects.create(cart=self.cart, product=other_product, quantity=3)
         
         total_price = self.cart.get_total_price()
-        expected_total_price = 2 * self.product.price + 3 * self.product.price
+        expected_total_price = 2 * self.product.price + 3 * other_product.price
         self.assertEqual(total_price, expected_total_price)
 
     def test_empty_cart(self):
         """Test the behavior when the cart is empty."""
-        empty_cart = Cart.objects.create(user=self.user)
-        self.assertEqual(empty_cart.get_total_price(), 0.00)
+        self.assertEqual(self.cart.get_total_price(), 0.00)
 
     def test_authenticated_user_access(self):
         """Test that an authenticated user can access the cart."""
@@ -104,3 +127,688 @@ class CartTests(TestCase):
 
         # Pastikan mendapat status 403 Forbidden jika pengguna mencoba menambahkan item ke cart orang lain
         self.assertEqual(response.status_code, 403)
+
+    def _fill_cart(self, count):
+        """Isi keranjang dengan sejumlah produk berbeda."""
+        for i in range(count):
+            product = Product.objects.create(
+                owner=self.user,
+                name=f"Product {i}",
+                description="Bulk product",
+                price=10.00,
+                category=self.category,
+            )
+            CartItem.objects.create(cart=self.cart, product=product, quantity=1)
+        Cart.objects.filter(pk=self.cart.pk).refresh_totals()
+
+    def test_cart_list_query_count(self):
+        """Test that listing carts costs a fixed number of queries regardless of cart size."""
+        self._fill_cart(50)
+        # user (JWT), validator ETag, cart, cart_items
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/cart/', HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results'][0]['cart_items']), 50)
+        self.assertEqual(float(response.data['results'][0]['total_price']), 500.00)
+
+    def test_cart_detail_query_count(self):
+        """Test that retrieving a cart costs a fixed number of queries regardless of cart size."""
+        self._fill_cart(50)
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/cart/{self.cart.id}/', HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['cart_items']), 50)
+
+    def test_cart_total_price_annotation(self):
+        """Test that the database-side totals match the items in the cart."""
+        CartItem.objects.create(cart=self.cart, product=self.product, quantity=2)
+        self._fill_cart(3)
+        cart = Cart.objects.with_totals().get(pk=self.cart.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(cart.get_total_price(), Decimal('230.00'))
+            self.assertEqual(cart.get_item_count(), 5)
+
+    def test_empty_cart_total_annotation(self):
+        """Test that the annotated totals of an empty cart are zero."""
+        cart = Cart.objects.with_totals().get(pk=self.cart.pk)
+        self.assertEqual(cart.get_total_price(), 0)
+        self.assertEqual(cart.get_item_count(), 0)
+
+    def test_cart_item_api_updates_stored_totals(self):
+        """Test that creating, updating and deleting items through the API keeps the stored totals in sync."""
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {self.access_token}'}
+        response = self.client.post(
+            '/api/cart-items/',
+            {'cart': self.cart.id, 'product': self.product.id, 'quantity': 2},
+            **auth
+        )
+        self.assertEqual(response.status_code, 201)
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.item_count, 2)
+        self.assertEqual(self.cart.subtotal, Decimal('200.00'))
+
+        item_id = response.data['id']
+        response = self.client.patch(
+            f'/api/cart-items/{item_id}/', {'quantity': 5}, content_type='application/json', **auth
+        )
+        self.assertEqual(response.status_code, 200)
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.item_count, 5)
+        self.assertEqual(self.cart.subtotal, Decimal('500.00'))
+
+        response = self.client.delete(f'/api/cart-items/{item_id}/', **auth)
+        self.assertEqual(response.status_code, 204)
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.item_count, 0)
+        self.assertEqual(self.cart.subtotal, Decimal('0.00'))
+
+    def test_price_change_does_not_skew_stored_totals(self):
+        """Test that removing an item after a price change leaves the cart subtotal at zero."""
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {self.access_token}'}
+        response = self.client.post(
+            '/api/cart-items/',
+            {'cart': self.cart.id, 'product': self.product.id, 'quantity': 2},
+            **auth
+        )
+        item_id = response.data['id']
+        self.product.price = Decimal('150.00')
+        self.product.save()
+
+        response = self.client.patch(
+            f'/api/cart-items/{item_id}/', {'quantity': 3}, content_type='application/json', **auth
+        )
+        self.cart.refresh_from_db()
+        self.assertEqual((self.cart.item_count, self.cart.subtotal), (3, Decimal('450.00')))
+
+        self.client.delete(f'/api/cart-items/{item_id}/', **auth)
+        self.cart.refresh_from_db()
+        self.assertEqual((self.cart.item_count, self.cart.subtotal), (0, Decimal('0.00')))
+
+    def test_rebuild_cart_totals_command(self):
+        """Test that the repair command rebuilds stale stored totals."""
+        CartItem.objects.create(cart=self.cart, product=self.product, quantity=3)
+        other_user = User.objects.create_user(username="rebuild", email="rebuild@gmail.com", password=None)
+        empty_cart = Cart.objects.create(user=other_user, item_count=7, subtotal=Decimal('70.00'))
+
+        out = StringIO()
+        call_command('rebuild_cart_totals', '--batch-size', '1', stdout=out)
+
+        self.cart.refresh_from_db()
+        empty_cart.refresh_from_db()
+        self.assertEqual((self.cart.item_count, self.cart.subtotal), (3, Decimal('300.00')))
+        self.assertEqual((empty_cart.item_count, empty_cart.subtotal), (0, Decimal('0.00')))
+        self.assertIn('2 carts', out.getvalue())
+
+    def test_duplicate_cart_item_rejected(self):
+        """Test that a product can only appear once per cart."""
+        CartItem.objects.create(cart=self.cart, product=self.product, quantity=1)
+        with self.assertRaises(IntegrityError):
+            CartItem.objects.create(cart=self.cart, product=self.product, quantity=2)
+
+    def _bulk_products(self, count):
+        return [
+            Product.objects.create(
+                owner=self.user, name=f"Bulk {i}", description="Bulk", price=10.00, category=self.category
+            )
+            for i in range(count)
+        ]
+
+    def test_bulk_upsert_cart_items(self):
+        """Test that the bulk endpoint creates, updates and removes lines in one request."""
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {self.access_token}'}
+        products = self._bulk_products(3)
+        CartItem.objects.create(cart=self.cart, product=products[0], quantity=1)
+        CartItem.objects.create(cart=self.cart, product=products[1], quantity=1)
+
+        response = self.client.post('/api/cart-items/bulk/', {
+            'cart': self.cart.id,
+            'items': [
+                {'product': products[0].id, 'quantity': 4},
+                {'product': products[1].id, 'quantity': 0},
+                {'product': products[2].id, 'quantity': 2},
+            ],
+        }, content_type='application/json', **auth)
+
+        self.assertEqual(response.status_code, 200)
+        quantities = dict(self.cart.cart_items.values_list('product_id', 'quantity'))
+        self.assertEqual(quantities, {products[0].id: 4, products[2].id: 2})
+        self.assertEqual(response.data['item_count'], 6)
+        self.assertEqual(float(response.data['total_price']), 60.00)
+
+    def test_bulk_upsert_query_count_is_constant(self):
+        """Test that the number of queries does not grow with the batch size."""
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {self.access_token}'}
+
+        def payload(products):
+            # Separuh produk sudah ada di keranjang (update), separuh baru (create)
+            for product in products[::2]:
+                CartItem.objects.get_or_create(cart=self.cart, product=product)
+            return {
+                'cart': self.cart.id,
+                'items': [{'product': p.id, 'quantity': 3} for p in products],
+            }
+
+        small = payload(self._bulk_products(4))
+        large = payload(self._bulk_products(40))
+        with self.assertNumQueries(11):
+            self.client.post('/api/cart-items/bulk/', small, content_type='application/json', **auth)
+        with self.assertNumQueries(11):
+            self.client.post('/api/cart-items/bulk/', large, content_type='application/json', **auth)
+
+    def test_bulk_upsert_rejects_other_users_cart(self):
+        """Test that the bulk endpoint refuses carts owned by another user."""
+        another_user = User.objects.create_user(username="bulkother", email="bulkother@gmail.com", password="password")
+        other_cart = Cart.objects.create(user=another_user)
+        response = self.client.post('/api/cart-items/bulk/', {
+            'cart': other_cart.id,
+            'items': [{'product': self.product.id, 'quantity': 1}],
+        }, content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(other_cart.cart_items.exists())
+
+    def test_bulk_upsert_ownership_check_does_not_create_cart(self):
+        """Test that a rejected bulk request leaves a user without a cart still without one."""
+        another_user = User.objects.create_user(username="bulkother", email="bulkother@gmail.com", password="password")
+        token = str(RefreshToken.for_user(another_user).access_token)
+        response = self.client.post('/api/cart-items/bulk/', {
+            'cart': self.cart.id,
+            'items': [{'product': self.product.id, 'quantity': 1}],
+        }, content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Cart.objects.filter(user=another_user).exists())
+
+    def test_bulk_upsert_rejects_duplicate_and_unknown_products(self):
+        """Test that duplicate or unknown products in a batch are rejected."""
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {self.access_token}'}
+        for items in (
+            [{'product': self.product.id, 'quantity': 1}, {'product': self.product.id, 'quantity': 2}],
+            [{'product': 9999, 'quantity': 1}],
+        ):
+            response = self.client.post(
+                '/api/cart-items/bulk/', {'cart': self.cart.id, 'items': items},
+                content_type='application/json', **auth
+            )
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.cart.cart_items.exists())
+
+    def test_cart_conditional_get(self):
+        """Test that an unchanged cart returns 304 and a changed cart returns a new ETag."""
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {self.access_token}'}
+        response = self.client.get('/api/cart/', **auth)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get('/api/cart/', HTTP_IF_NONE_MATCH=etag, **auth)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.client.post(
+            '/api/cart-items/', {'cart': self.cart.id, 'product': self.product.id, 'quantity': 1}, **auth
+        )
+        response = self.client.get('/api/cart/', HTTP_IF_NONE_MATCH=etag, **auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+SHARDS = ['default', 'carts_1', 'carts_2']
+
+
+@override_settings(CART_SHARDS=SHARDS)
+class CartShardingTests(TransactionTestCase):
+    databases = {'default', 'carts_1', 'carts_2'}
+
+    def setUp(self):
+        reset_metrics_registry()
+        self.addCleanup(reset_metrics_registry)
+        for alias in SHARDS:
+            reserve_shard_ids(using=alias)
+        self.category = Category.objects.create(name="Shard Category")
+        self.seller = User.objects.create_user(username="seller", email="seller@gmail.com", password=None)
+        self.product = Product.objects.create(
+            owner=self.seller, name="Shard Product", description="-", price=Decimal('25.00'), category=self.category
+        )
+        self.users = [
+            User.objects.create_user(username=f"shard{i}", email=f"shard{i}@gmail.com", password=None)
+            for i in range(20)
+        ]
+
+    def user_on(self, alias):
+        return next(user for user in self.users if shard_for_user(user.pk) == alias)
+
+    def auth(self, user):
+        return {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+    def test_jump_hash_only_moves_keys_to_new_bucket(self):
+        """Test that growing the shard list only moves users onto the added shard."""
+        before = {user_id: shard_for_user(user_id, SHARDS[:2]) for user_id in range(1000)}
+        after = {user_id: shard_for_user(user_id, SHARDS) for user_id in range(1000)}
+        moved = [user_id for user_id in before if before[user_id] != after[user_id]]
+        self.assertTrue(all(after[user_id] == 'carts_2' for user_id in moved))
+        self.assertLess(len(moved), 450)
+        self.assertEqual({shard_for_user(user_id, ['default']) for user_id in range(10)}, {'default'})
+
+    def test_cart_api_uses_the_users_shard(self):
+        """Test that cart reads and item writes go to the user's shard with shard-ranged ids."""
+        user = self.user_on('carts_1')
+        auth = self.auth(user)
+        cart = Cart.objects.using('carts_1').create(user=user)
+        self.assertGreaterEqual(cart.pk, SHARD_ID_SPAN)
+        self.assertFalse(Cart.objects.filter(pk=cart.pk).exists())
+
+        response = self.client.post(
+            '/api/cart-items/', {'cart': cart.id, 'product': self.product.id, 'quantity': 2}, **auth
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertGreaterEqual(response.data['id'], SHARD_ID_SPAN)
+        cart.refresh_from_db()
+        self.assertEqual((cart.item_count, cart.subtotal), (2, Decimal('50.00')))
+
+        response = self.client.post('/api/cart-items/bulk/', {
+            'cart': cart.id, 'items': [{'product': self.product.id, 'quantity': 3}],
+        }, content_type='application/json', **auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['item_count'], 3)
+        self.assertEqual(float(response.data['total_price']), 75.00)
+
+        response = self.client.get('/api/cart/', **auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()['results']], [cart.id])
+        aliases = get_metrics_registry().queries_by_alias('CartItemViewSet.bulk_upsert')
+        self.assertEqual(set(aliases), {'default', 'carts_1'})
+
+    def test_failed_total_update_rolls_back_shard_writes(self):
+        """Test that an error after the item write rolls back the item on the user's shard."""
+        user = self.user_on('carts_1')
+        auth = self.auth(user)
+        cart = Cart.objects.using('carts_1').create(user=user)
+        failure = mock.patch.object(CartQuerySet, 'refresh_totals', side_effect=DatabaseError('totals failed'))
+        with failure:
+            with self.assertRaises(DatabaseError):
+                self.client.post(
+                    '/api/cart-items/', {'cart': cart.id, 'product': self.product.id, 'quantity': 2}, **auth
+                )
+            with self.assertRaises(DatabaseError):
+                self.client.post('/api/cart-items/bulk/', {
+                    'cart': cart.id, 'items': [{'product': self.product.id, 'quantity': 3}],
+                }, content_type='application/json', **auth)
+        self.assertFalse(CartItem.objects.using('carts_1').exists())
+
+    def test_deleting_product_or_user_cleans_up_shards(self):
+        """Test that deletes on the catalogue database remove orphaned rows from cart shards."""
+        user = self.user_on('carts_1')
+        other = Product.objects.create(
+            owner=self.seller, name="Other", description="-", price=Decimal('5.00'), category=self.category
+        )
+        carts = Cart.objects.using('carts_1')
+        cart_id = carts.cart_id_for_user(user)
+        carts.add_lines(cart_id, {self.product.pk: 1, other.pk: 2})
+
+        self.product.delete()
+        self.assertEqual(list(CartItem.objects.using('carts_1').values_list('product_id', flat=True)), [other.pk])
+        cart = carts.get(pk=cart_id)
+        self.assertEqual((cart.item_count, cart.subtotal), (2, Decimal('10.00')))
+
+        user.delete()
+        self.assertFalse(carts.exists())
+        self.assertFalse(CartItem.objects.using('carts_1').exists())
+
+    def test_other_shards_are_invisible_to_the_user(self):
+        """Test that a user cannot add items to a cart stored on another user's shard."""
+        owner = self.user_on('carts_2')
+        cart = Cart.objects.using('carts_2').create(user=owner)
+        response = self.client.post(
+            '/api/cart-items/', {'cart': cart.id, 'product': self.product.id, 'quantity': 1},
+            **self.auth(self.user_on('carts_1'))
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(CartItem.objects.using('carts_2').exists())
+
+    def test_rebalance_carts_command(self):
+        """Test that rebalancing moves carts to their owner's shard, keeping ids and timestamps."""
+        carts = {}
+        for user in self.users[:12]:
+            cart = Cart.objects.create(user=user)
+            CartItem.objects.create(cart=cart, product=self.product, quantity=1)
+            carts[cart.pk] = (user, cart.created_at)
+
+        out = StringIO()
+        call_command('rebalance_carts', '--dry-run', stdout=out)
+        expected = sum(1 for user, _ in carts.values() if shard_for_user(user.pk) != 'default')
+        self.assertIn(f"Would move {expected} carts.", out.getvalue())
+        self.assertEqual(Cart.objects.count(), 12)
+
+        out = StringIO()
+        call_command('rebalance_carts', stdout=out)
+        self.assertIn(f"Moved {expected} carts.", out.getvalue())
+        for cart_id, (user, created_at) in carts.items():
+            alias = shard_for_user(user.pk)
+            cart = Cart.objects.using(alias).get(pk=cart_id)
+            self.assertEqual((cart.user_id, cart.created_at), (user.pk, created_at))
+            self.assertEqual(CartItem.objects.using(alias).filter(cart_id=cart_id).count(), 1)
+        self.assertEqual(sum(Cart.objects.using(alias).count() for alias in SHARDS), 12)
+
+        out = StringIO()
+        call_command('rebalance_carts', stdout=out)
+        self.assertIn("Moved 0 carts.", out.getvalue())
+
+    def test_rebalance_merges_into_cart_created_on_new_shard(self):
+        """Test that a cart created on the new shard before rebalancing absorbs the old cart."""
+        user = self.user_on('carts_1')
+        old_cart = Cart.objects.create(user=user)
+        CartItem.objects.create(cart=old_cart, product=self.product, quantity=2)
+        carts = Cart.objects.using('carts_1')
+        new_cart_id = carts.cart_id_for_user(user)
+        carts.add_lines(new_cart_id, {self.product.pk: 1})
+
+        call_command('rebalance_carts', stdout=StringIO())
+
+        self.assertFalse(Cart.objects.filter(pk=old_cart.pk).exists())
+        cart = carts.get(user=user)
+        self.assertEqual(cart.pk, new_cart_id)
+        self.assertEqual((cart.item_count, cart.subtotal), (3, Decimal('75.00')))
+
+    def test_rebuild_cart_totals_covers_every_shard(self):
+        """Test that rebuild_cart_totals recomputes totals on every shard from catalogue prices."""
+        for alias in SHARDS:
+            cart = Cart.objects.using(alias).create(user=self.user_on(alias))
+            CartItem.objects.using(alias).create(cart=cart, product_id=self.product.pk, quantity=4)
+
+        out = StringIO()
+        call_command('rebuild_cart_totals', stdout=out)
+        self.assertIn("Rebuilt totals for 3 carts.", out.getvalue())
+        for alias in SHARDS:
+            cart = Cart.objects.using(alias).get()
+            self.assertEqual((cart.item_count, cart.subtotal), (4, Decimal('100.00')))
+
+
+class GuestCartTests(TestCase):
+    def setUp(self):
+        reset_guest_cart_store()
+        caches['guest_carts'].clear()
+        self.addCleanup(reset_guest_cart_store)
+        self.user = User.objects.create_user(username="guestuser", email="guestuser@gmail.com", password="password")
+        self.category = Category.objects.create(name="Guest Category")
+        self.products = [
+            Product.objects.create(
+                owner=self.user, name=f"Guest Product {i}", description="-", price=Decimal('10.00') * (i + 1),
+                category=self.category,
+            )
+            for i in range(3)
+        ]
+
+    def add(self, items, **headers):
+        return self.client.post('/api/guest-cart/', {'items': items}, content_type='application/json', **headers)
+
+    def test_anonymous_cart_causes_no_relational_writes(self):
+        """Test that guest cart changes only read from the database."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.add([{'product': self.products[0].id, 'quantity': 2}])
+            token = response[GUEST_CART_HEADER]
+            self.add(
+                [{'product': self.products[1].id, 'quantity': 1}, {'product': self.products[0].id, 'quantity': 0}],
+                HTTP_X_GUEST_CART=token,
+            )
+            response = self.client.get('/api/guest-cart/', HTTP_X_GUEST_CART=token)
+
+        self.assertTrue(all(query['sql'].startswith('SELECT') for query in queries.captured_queries))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['items'], [{'product': self.products[1].id, 'quantity': 1}])
+        self.assertEqual(response.data['total_price'], Decimal('20.00'))
+        self.assertFalse(Cart.objects.exists())
+
+    def test_guest_cart_uses_cookie_and_validates_products(self):
+        """Test that the cookie identifies the cart and unknown products or too many lines are rejected."""
+        response = self.add([{'product': self.products[2].id, 'quantity': 3}])
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(GUEST_CART_COOKIE, response.cookies)
+        response = self.client.get('/api/guest-cart/')
+        self.assertEqual(response.data['item_count'], 3)
+
+        self.assertEqual(self.add([{'product': 999999, 'quantity': 1}]).status_code, 400)
+        with self.settings(GUEST_CARTS={'CACHE': 'guest_carts', 'MAX_LINES': 1}):
+            reset_guest_cart_store()
+            self.assertEqual(self.add([{'product': self.products[0].id, 'quantity': 1}]).status_code, 400)
+        reset_guest_cart_store()
+        self.assertEqual(self.client.get('/api/guest-cart/').data['item_count'], 3)
+
+    def test_guest_cart_expires_after_ttl(self):
+        """Test that an abandoned guest cart is evicted once its TTL passes."""
+        with self.settings(GUEST_CARTS={'CACHE': 'guest_carts', 'TTL': 60}):
+            reset_guest_cart_store()
+            token = self.add([{'product': self.products[0].id, 'quantity': 1}])[GUEST_CART_HEADER]
+            with mock.patch('django.core.cache.backends.locmem.time.time', return_value=time.time() + 61):
+                response = self.client.get('/api/guest-cart/', HTTP_X_GUEST_CART=token)
+        self.assertEqual(response.data['items'], [])
+
+    def test_login_merges_guest_cart_in_one_bulk_write(self):
+        """Test that logging in adds the guest lines to the user's cart and clears the guest cart."""
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.products[0], quantity=1)
+        token = self.add([
+            {'product': self.products[0].id, 'quantity': 2},
+            {'product': self.products[1].id, 'quantity': 3},
+        ])[GUEST_CART_HEADER]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('login'), {
+                'email': 'guestuser@gmail.com', 'password': 'password',
+            }, HTTP_X_GUEST_CART=token)
+
+        self.assertEqual(response.status_code, 200)
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT INTO "carts_cartitem"')]
+        self.assertEqual(len(inserts), 1)
+        quantities = dict(cart.cart_items.values_list('product_id', 'quantity'))
+        self.assertEqual(quantities, {self.products[0].id: 3, self.products[1].id: 3})
+        cart.refresh_from_db()
+        self.assertEqual((cart.item_count, cart.subtotal), (6, Decimal('90.00')))
+        self.assertEqual(get_guest_cart_store().get(token), {})
+        self.assertEqual(response.cookies[GUEST_CART_COOKIE].value, '')
+
+    def test_failed_login_keeps_guest_cart(self):
+        """Test that a failed login neither merges nor clears the guest cart."""
+        token = self.add([{'product': self.products[0].id, 'quantity': 1}])[GUEST_CART_HEADER]
+        response = self.client.post(reverse('login'), {
+            'email': 'guestuser@gmail.com', 'password': 'wrong',
+        }, HTTP_X_GUEST_CART=token)
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Cart.objects.exists())
+        self.assertEqual(get_guest_cart_store().get(token), {self.products[0].id: 1})
+
+    def test_login_merges_into_fresh_cart_when_cached_id_is_stale(self):
+        """Test that a cached id for a cart deleted elsewhere does not break the merge at login."""
+        with self.captureOnCommitCallbacks(execute=True):
+            stale_id = Cart.objects.cart_id_for_user(self.user)
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM carts_cart WHERE id = %s', [stale_id])
+        token = self.add([{'product': self.products[0].id, 'quantity': 2}])[GUEST_CART_HEADER]
+
+        response = self.client.post(reverse('login'), {
+            'email': 'guestuser@gmail.com', 'password': 'password',
+        }, HTTP_X_GUEST_CART=token)
+        self.assertEqual(response.status_code, 200)
+        cart = Cart.objects.get(user=self.user)
+        self.assertNotEqual(cart.pk, stale_id)
+        self.assertEqual((cart.item_count, cart.subtotal), (2, Decimal('20.00')))
+
+    def test_failed_merge_does_not_fail_login(self):
+        """Test that a database error while merging still logs the user in and keeps the guest cart."""
+        token = self.add([{'product': self.products[0].id, 'quantity': 1}])[GUEST_CART_HEADER]
+        with mock.patch('users.views.merge_guest_cart', side_effect=IntegrityError('merge failed')):
+            with self.assertLogs('users.views', 'ERROR'):
+                response = self.client.post(reverse('login'), {
+                    'email': 'guestuser@gmail.com', 'password': 'password',
+                }, HTTP_X_GUEST_CART=token)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('tokens', response.data)
+        self.assertNotIn(GUEST_CART_COOKIE, response.cookies)
+        self.assertEqual(get_guest_cart_store().get(token), {self.products[0].id: 1})
+
+    def test_async_login_creates_cart_from_guest_cart(self):
+        """Test that the async login path also merges, creating the cart when the user has none."""
+        token = self.add([{'product': self.products[2].id, 'quantity': 1}])[GUEST_CART_HEADER]
+        response = self.client.post(reverse('login_async'), {
+            'email': 'guestuser@gmail.com', 'password': 'password',
+        }, content_type='application/json', HTTP_X_GUEST_CART=token)
+
+        self.assertEqual(response.status_code, 200)
+        cart = Cart.objects.get(user=self.user)
+        self.assertEqual((cart.item_count, cart.subtotal), (1, Decimal('30.00')))
+
+
+class OneCartPerUserTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="single", email="single@gmail.com", password=None)
+        cache.delete(cart_id_cache_key(self.user.pk))
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    def delete_cart_row(self, cart_id):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM carts_cart WHERE id = %s', [cart_id])
+
+    def test_second_cart_for_user_is_rejected(self):
+        """Test that the database refuses a second cart for the same user."""
+        Cart.objects.create(user=self.user)
+        with self.assertRaises(IntegrityError):
+            Cart.objects.create(user=self.user)
+
+    def test_cart_id_for_user_upserts_and_caches(self):
+        """Test that the cart is created once, left untouched afterwards and then served from cache."""
+        with self.captureOnCommitCallbacks(execute=True):
+            cart_id = Cart.objects.cart_id_for_user(self.user)
+        cart = Cart.objects.get(pk=cart_id)
+
+        cache.delete(cart_id_cache_key(self.user.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(Cart.objects.cart_id_for_user(self.user), cart_id)
+        self.assertEqual(Cart.objects.get(pk=cart_id).updated_at, cart.updated_at)
+        self.assertEqual(Cart.objects.filter(user=self.user).count(), 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(Cart.objects.cart_id_for_user(self.user), cart_id)
+
+    def test_deleting_cart_forgets_cached_id(self):
+        """Test that deleting a cart drops the cached mapping so a new cart is created next time."""
+        with self.captureOnCommitCallbacks(execute=True):
+            cart_id = Cart.objects.cart_id_for_user(self.user)
+        Cart.objects.filter(pk=cart_id).delete()
+        self.assertIsNone(cache.get(cart_id_cache_key(self.user.pk)))
+        self.assertNotEqual(Cart.objects.cart_id_for_user(self.user), cart_id)
+
+    def test_stale_cached_cart_id_is_replaced(self):
+        """Test that a cached id whose cart was deleted elsewhere does not break cart lookups."""
+        with self.captureOnCommitCallbacks(execute=True):
+            cart_id = Cart.objects.cart_id_for_user(self.user)
+        # Dihapus tanpa signal di proses ini, mis. oleh worker lain
+        self.delete_cart_row(cart_id)
+        self.assertEqual(cache.get(cart_id_cache_key(self.user.pk)), cart_id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/cart/', {}, **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['id'], cart_id)
+        self.assertEqual(cache.get(cart_id_cache_key(self.user.pk)), response.data['id'])
+
+        self.delete_cart_row(response.data['id'])
+        new_id = Cart.objects.checked_cart_id_for_user(self.user)
+        self.assertTrue(Cart.objects.filter(pk=new_id, user=self.user).exists())
+
+    def test_deploy_check_rejects_per_process_cart_id_cache(self):
+        """Test that the deploy check flags a cart id cache local to one process."""
+        self.assertEqual([error.id for error in check_cart_id_cache(None)], ['carts.E001'])
+
+    def test_post_cart_returns_the_single_cart(self):
+        """Test that creating a cart through the API twice returns the same cart."""
+        first = self.client.post('/api/cart/', {}, **self.auth)
+        second = self.client.post('/api/cart/', {}, **self.auth)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(Cart.objects.filter(user=self.user).count(), 1)
+
+
+class MergeDuplicateCartsMigrationTests(TransactionTestCase):
+    migrate_from = [('carts', '0006_cart_cart_user_recent_idx')]
+    migrate_to = [('carts', '0007_cart_unique_cart_user')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def test_duplicate_carts_are_merged(self):
+        """Test that the migration folds duplicate carts into the oldest one, summing quantities."""
+        user = User.objects.create_user(username="dupes", email="dupes@gmail.com", password=None)
+        category = Category.objects.create(name="Dupes")
+        products = [
+            Product.objects.create(owner=user, name=f"Dupe {i}", description="-", price=Decimal('5.00'),
+                                   category=category)
+            for i in range(2)
+        ]
+        old_apps = self.migrate(self.migrate_from)
+        OldCart, OldCartItem = old_apps.get_model('carts', 'Cart'), old_apps.get_model('carts', 'CartItem')
+        carts = [OldCart.objects.create(user_id=user.pk) for _ in range(3)]
+        OldCartItem.objects.create(cart_id=carts[0].pk, product_id=products[0].pk, quantity=1)
+        OldCartItem.objects.create(cart_id=carts[1].pk, product_id=products[0].pk, quantity=2)
+        OldCartItem.objects.create(cart_id=carts[2].pk, product_id=products[1].pk, quantity=4)
+
+        self.migrate(self.migrate_to)
+
+        cart = Cart.objects.get(user=user)
+        self.assertEqual(cart.pk, carts[0].pk)
+        self.assertEqual(
+            dict(cart.cart_items.values_list('product_id', 'quantity')), {products[0].pk: 3, products[1].pk: 4}
+        )
+        self.assertEqual((cart.item_count, cart.subtotal), (7, Decimal('35.00')))
+
+
+class ShardDataMigrationTests(TransactionTestCase):
+    databases = {'default', 'carts_1'}
+    latest = [('carts', '0007_cart_unique_cart_user')]
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="shardmig", email="shardmig@gmail.com", password=None)
+        category = Category.objects.create(name="Shard Migration")
+        self.product = Product.objects.create(
+            owner=self.user, name="Shard Product", description="-", price=Decimal('5.00'), category=category,
+        )
+        # Pembangunan ulang tabel SQLite memeriksa foreign key di shard, jadi barisnya dicerminkan;
+        # harga salinan sengaja berbeda karena total harus memakai katalog di default.
+        User.objects.using('carts_1').create(pk=self.user.pk, username="shardmig", email="shardmig@gmail.com")
+        Category.objects.using('carts_1').create(pk=category.pk, name=category.name)
+        Product.objects.using('carts_1').create(
+            pk=self.product.pk, owner_id=self.user.pk, name="Shard Product", description="-",
+            price=Decimal('1.00'), category_id=category.pk,
+        )
+        self.addCleanup(self.migrate, self.latest)
+
+    def migrate(self, targets):
+        shard = connections['carts_1']
+        executor = MigrationExecutor(shard)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        # Executor tidak mengirim post_migrate, jadi PRAGMAS shard diterapkan ulang di sini.
+        apply_sqlite_pragmas(sender=shard.__class__, connection=shard)
+        return executor.loader.project_state(targets).apps
+
+    def test_totals_are_populated_on_shard(self):
+        """Test that 0003 fills the stored totals of carts on a shard, with catalogue prices."""
+        old_apps = self.migrate([('carts', '0002_remove_cart_total_price_alter_cart_user_and_more')])
+        OldCart, OldCartItem = old_apps.get_model('carts', 'Cart'), old_apps.get_model('carts', 'CartItem')
+        cart = OldCart.objects.using('carts_1').create(user_id=self.user.pk)
+        OldCartItem.objects.using('carts_1').create(cart_id=cart.pk, product_id=self.product.pk, quantity=3)
+
+        new_apps = self.migrate([('carts', '0003_cart_item_count_subtotal')])
+        totals = new_apps.get_model('carts', 'Cart').objects.using('carts_1').values_list('item_count', 'subtotal')
+        self.assertEqual(list(totals), [(3, Decimal('15.00'))])
+
+    def test_duplicate_items_are_merged_on_shard(self):
+        """Test that 0004 folds duplicate cart items on the shard being migrated."""
+        old_apps = self.migrate([('carts', '0003_cart_item_count_subtotal')])
+        OldCart, OldCartItem = old_apps.get_model('carts', 'Cart'), old_apps.get_model('carts', 'CartItem')
+        cart = OldCart.objects.using('carts_1').create(user_id=self.user.pk)
+        for quantity in (1, 2):
+            OldCartItem.objects.using('carts_1').create(cart_id=cart.pk, product_id=self.product.pk, quantity=quantity)
+
+        new_apps = self.migrate([('carts', '0004_cartitem_unique_cart_product')])
+        items = new_apps.get_model('carts', 'CartItem').objects.using('carts_1').values_list('quantity', flat=True)
+        self.assertEqual(list(items), [3])
@@ -1,12 +1,20 @@
 # carts/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CartViewSet, CartItemViewSet
+from melar_project.async_views import with_async_reads
+from .views import CartViewSet, CartItemViewSet, AsyncCartReadView, GuestCartView
 
 router = DefaultRouter()
 router.register(r'cart', CartViewSet, basename='cart')
 router.register(r'cart-items', CartItemViewSet, basename='cartitem')
 
+# GET list/detail keranjang dapat dilayani view async, dipilih lewat ASYNC_READ_ROUTES
+async_cart_read = AsyncCartReadView.as_view()
+
 urlpatterns = [
-    path('', include(router.urls)),
+    path('guest-cart/', GuestCartView.as_view(), name='guest-cart'),
+    path('', include(with_async_reads(router.urls, {
+        'cart-list': async_cart_read,
+        'cart-detail': async_cart_read,
+    }))),
 ]
@@ -1,27 +1,65 @@
-from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import PermissionDenied
+from decimal import Decimal
+
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from products.models import Product
+from melar_project.async_views import AsyncReadOnlyView
+from melar_project.conditional import ConditionalGetMixin
+from melar_project.fast_serializers import FastListMixin, FastSerializer
+from melar_project.pagination import IdCursorPagination
+from .guest import (
+    GUEST_CART_COOKIE, GUEST_CART_HEADER, get_guest_cart_store, guest_cart_token, new_guest_cart_token,
+)
 from .models import Cart, CartItem
-from .serializers import CartSerializer, CartItemSerializer
+from .sharding import CartShardMixin, cart_transaction
+from .serializers import CartSerializer, CartItemSerializer, BulkCartItemSerializer, CartLinesSerializer
 
-class CartViewSet(viewsets.ModelViewSet):
+class CartViewSet(CartShardMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Cart.objects.all()
     serializer_class = CartSerializer
+    fast_serializer = FastSerializer(
+        CartSerializer,
+        columns={'total_price': 'subtotal'},
+        nested={'cart_items': (FastSerializer(CartItemSerializer), 'cart')},
+    )
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         # Filter keranjang berdasarkan pengguna yang terautentikasi
-        return self.queryset.filter(user=self.request.user)
+        # Total harga dan jumlah item dibaca dari kolom item_count/subtotal,
+        # item dimuat sekaligus agar jumlah query tetap, berapapun isi keranjang
+        return self.queryset.filter(user=self.request.user).prefetch_related('cart_items')
 
-    def perform_create(self, serializer):
-        # Membuat cart baru untuk pengguna jika belum ada
-        cart, created = Cart.objects.get_or_create(user=self.request.user)
-        serializer.save(cart=cart)
+    def create(self, request, *args, **kwargs):
+        """Satu keranjang per pengguna: kembalikan keranjang yang ada atau buat dengan upsert atomik."""
+        cart = self.get_queryset().filter(pk=Cart.objects.cart_id_for_user(request.user)).first()
+        if cart is None:
+            # Id di cache usang: keranjang dihapus di proses lain atau oleh rebalance_carts
+            Cart.objects.forget_cart_id(request.user.pk)
+            cart = self.get_queryset().get(pk=Cart.objects.cart_id_for_user(request.user))
+        return Response(self.get_serializer(cart).data, status=status.HTTP_200_OK)
+
+
+class AsyncCartReadView(CartShardMixin, AsyncReadOnlyView):
+    """Versi async dari GET /api/cart/ dan /api/cart/<pk>/ (lihat ASYNC_READ_ROUTES)."""
+    queryset = Cart.objects.all()
+    serializer_class = CartSerializer
+    permission_classes = [IsAuthenticated]
+    etag_namespace = 'CartViewSet'
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user).prefetch_related('cart_items')
 
 
-class CartItemViewSet(viewsets.ModelViewSet):
+class CartItemViewSet(CartShardMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = CartItem.objects.all()
     serializer_class = CartItemSerializer
+    pagination_class = IdCursorPagination  # CartItem tidak memiliki created_at
+    fast_serializer = FastSerializer(CartItemSerializer)
     permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
@@ -31,7 +69,149 @@ class CartItemViewSet(viewsets.ModelViewSet):
         if not cart:
             raise PermissionDenied("Cart not provided or invalid.")
         
-        if cart.user != self.request.user:
+        if cart.user_id != self.request.user.pk:
+            raise PermissionDenied("You cannot add items to another user's cart.")
+
+        with cart_transaction():
+            item = serializer.save()
+            _refresh_cart_totals(item.cart_id)
+
+    def perform_update(self, serializer):
+        old_cart_id = serializer.instance.cart_id
+
+        with cart_transaction():
+            item = serializer.save()
+            _refresh_cart_totals(old_cart_id, item.cart_id)
+
+    def perform_destroy(self, instance):
+        with cart_transaction():
+            instance.delete()
+            _refresh_cart_totals(instance.cart_id)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_upsert(self, request):
+        """Terapkan banyak baris {product, quantity} ke satu keranjang dalam satu transaksi.
+
+        Jumlah query tetap, berapapun banyaknya baris dalam batch.
+        """
+        serializer = BulkCartItemSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = {line['product']: line['quantity'] for line in serializer.validated_data['items']}
+
+        # Kepemilikan dicek di shard pengguna; pencarian saja, tanpa membuat keranjang
+        # dan tanpa mempercayai id keranjang yang di-cache
+        cart_id = serializer.validated_data['cart']
+        if not Cart.objects.filter(pk=cart_id, user=request.user).exists():
             raise PermissionDenied("You cannot add items to another user's cart.")
 
-        serializer.save()
+        products = Product.objects.only('pk').in_bulk(list(lines))
+        missing = sorted(set(lines) - set(products))
+        if missing:
+            raise ValidationError({'items': [f"Invalid product ids: {missing}"]})
+
+        with cart_transaction():
+            existing = {
+                item.product_id: item
+                for item in CartItem.objects.filter(cart_id=cart_id, product_id__in=list(lines))
+            }
+            to_create, to_update, to_delete = [], [], []
+            for product_id, quantity in lines.items():
+                item = existing.get(product_id)
+                if quantity == 0:
+                    if item is not None:
+                        to_delete.append(item.pk)
+                elif item is None:
+                    to_create.append(CartItem(cart_id=cart_id, product_id=product_id, quantity=quantity))
+                elif item.quantity != quantity:
+                    item.quantity = quantity
+                    to_update.append(item)
+
+            if to_create:
+                # Baris yang dibuat bersamaan oleh request lain diperbarui, bukan diduplikasi
+                CartItem.objects.bulk_create(
+                    to_create,
+                    update_conflicts=True,
+                    unique_fields=['cart', 'product'],
+                    update_fields=['quantity'],
+                )
+            if to_update:
+                CartItem.objects.bulk_update(to_update, ['quantity'])
+            if to_delete:
+                CartItem.objects.filter(pk__in=to_delete).delete()
+            Cart.objects.filter(pk=cart_id).refresh_totals(touch=True)
+
+        cart = Cart.objects.prefetch_related('cart_items').get(pk=cart_id)
+        return Response(CartSerializer(cart).data, status=status.HTTP_200_OK)
+
+
+class GuestCartView(APIView):
+    """Keranjang pengunjung yang belum login, disimpan di cache (carts.guest), bukan di database.
+
+    GET membaca harga produk; POST dan DELETE tidak menulis ke database sama
+    sekali. Keranjang digabungkan ke Cart pengguna saat LoginView berhasil.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        token = guest_cart_token(request)
+        return Response(self._payload(get_guest_cart_store().get(token) if token else {}))
+
+    def post(self, request):
+        """Atur quantity per produk ({items: [{product, quantity}]}); quantity 0 menghapus produk."""
+        serializer = CartLinesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = {line['product']: line['quantity'] for line in serializer.validated_data['items']}
+
+        products = Product.objects.only('pk').in_bulk(list(changes))
+        missing = sorted(set(changes) - set(products))
+        if missing:
+            raise ValidationError({'items': [f"Invalid product ids: {missing}"]})
+
+        store = get_guest_cart_store()
+        token = guest_cart_token(request)
+        created = token is None
+        if created:
+            token = new_guest_cart_token()
+        lines = store.get(token)
+        for product_id, quantity in changes.items():
+            if quantity:
+                lines[product_id] = quantity
+            else:
+                lines.pop(product_id, None)
+        if len(lines) > store.max_lines:
+            raise ValidationError({'items': [f"A guest cart can hold at most {store.max_lines} products."]})
+        store.save(token, lines)
+
+        response = Response(self._payload(lines), status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+        response[GUEST_CART_HEADER] = token
+        response.set_cookie(GUEST_CART_COOKIE, token, max_age=store.timeout, httponly=True, samesite='Lax')
+        return response
+
+    def delete(self, request):
+        token = guest_cart_token(request)
+        if token:
+            get_guest_cart_store().delete(token)
+        response = Response(status=status.HTTP_204_NO_CONTENT)
+        response.delete_cookie(GUEST_CART_COOKIE)
+        return response
+
+    def _payload(self, lines):
+        prices = dict(Product.objects.filter(pk__in=list(lines)).values_list('pk', 'price')) if lines else {}
+        items = [
+            {'product': product_id, 'quantity': quantity}
+            for product_id, quantity in lines.items() if product_id in prices
+        ]
+        return {
+            'items': items,
+            'item_count': sum(item['quantity'] for item in items),
+            'total_price': sum((item['quantity'] * prices[item['product']] for item in items), Decimal(0)),
+        }
+
+
+def _refresh_cart_totals(*cart_ids):
+    """Hitung ulang item_count dan subtotal keranjang dari item-itemnya, dengan harga produk saat ini.
+
+    Menambah/mengurangi selisih dengan harga saat ini membuat subtotal melenceng bila harga
+    produk berubah di antara penambahan dan penghapusan item.
+    """
+    Cart.objects.filter(pk__in=set(cart_ids)).refresh_totals(touch=True)
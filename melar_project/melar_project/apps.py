@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class MelarProjectConfig(AppConfig):
+    name = "melar_project"
+
+    def ready(self):
+        # Receiver connection_created harus terpasang sebelum koneksi database pertama
+        from . import metrics, sqlite  # noqa: F401
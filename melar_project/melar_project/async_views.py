@@ -0,0 +1,158 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.urls import URLPattern
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from .conditional import AsyncConditionalGetMixin
+from .metrics import serialization_timer
+from .renderers import json_renderer_class
+
+
+class AsyncReadOnlyView(AsyncConditionalGetMixin, View):
+    """View baca (list/detail) async yang meniru perilaku ViewSet DRF yang setara.
+
+    Autentikasi, permission, paginasi cursor, ETag dan format error mengikuti
+    pengaturan DRF, dan body JSON identik dengan versi sync. Data diambil dengan
+    ORM async (`afirst`, `aaggregate`, `async for`); hanya halaman cursor yang
+    diambil lewat paginate_queryset DRF di sync_to_async, agar logika paginasi
+    tidak diduplikasi. Response selalu JSON.
+    """
+    queryset = None
+    serializer_class = None
+    lookup_url_kwarg = 'pk'
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+    renderer_class = None  # None: renderer JSON pertama di DEFAULT_RENDERER_CLASSES
+    http_method_names = ['get', 'head']
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def get_serializer(self, *args, **kwargs):
+        return self.serializer_class(*args, context={'request': self.request, 'view': self}, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        self.request = request = Request(request, authenticators=[auth() for auth in self.authentication_classes])
+        request.accepted_renderer = (self.renderer_class or json_renderer_class())()
+        try:
+            await self.initial(request)
+            if self.kwargs.get(self.lookup_url_kwarg) is not None:
+                return await self.retrieve(request, self.kwargs[self.lookup_url_kwarg])
+            return await self.list(request)
+        except Exception as exc:
+            return self.handle_exception(exc)
+
+    async def initial(self, request):
+        user, auth, authenticator = AnonymousUser(), None, None
+        for candidate in request.authenticators:
+            if hasattr(candidate, 'aauthenticate'):
+                result = await candidate.aauthenticate(request._request)
+            else:
+                result = await sync_to_async(candidate.authenticate)(request)
+            if result is not None:
+                (user, auth), authenticator = result, candidate
+                break
+        request._authenticator = authenticator
+        request.user, request.auth = user, auth
+
+        for permission in (permission() for permission in self.permission_classes):
+            if not permission.has_permission(request, self):
+                if request.authenticators and not request.successful_authenticator:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(
+                    getattr(permission, 'message', None), getattr(permission, 'code', None)
+                )
+
+    async def list(self, request):
+        queryset = self.get_queryset()
+        count, last_modified = await self.aget_list_validators(queryset)
+        etag = self._make_etag(request, 'list', count, last_modified)
+
+        async def render():
+            paginator = self.pagination_class() if self.pagination_class else None
+            page = await paginator.apaginate_queryset(queryset, request, view=self) if paginator else None
+            if page is None:
+                return self.render(self.get_serializer([obj async for obj in queryset], many=True).data)
+            data = self.get_serializer(page, many=True).data
+            return self.render(paginator.get_paginated_response(data).data)
+
+        return await self._aconditional_response(request, etag, last_modified, render)
+
+    async def retrieve(self, request, pk):
+        queryset = self.get_queryset()
+        last_modified = await self.aget_detail_last_modified(queryset, pk)
+        if last_modified is None:
+            raise exceptions.NotFound(f'No {queryset.model._meta.object_name} matches the given query.')
+        etag = self._make_etag(request, 'detail', sorted(self.kwargs.items()), last_modified)
+
+        async def render():
+            instance = await queryset.filter(pk=pk).afirst()
+            if instance is None:
+                raise exceptions.NotFound(f'No {queryset.model._meta.object_name} matches the given query.')
+            return self.render(self.get_serializer(instance).data)
+
+        return await self._aconditional_response(request, etag, last_modified, render)
+
+    def render(self, data, status=200):
+        renderer = self.request.accepted_renderer
+        with serialization_timer():
+            content = renderer.render(data, renderer.media_type, {'request': self.request, 'view': self})
+        return HttpResponse(content, status=status, content_type=renderer.media_type)
+
+    def handle_exception(self, exc):
+        # Bentuk error mengikuti exception handler DRF, tetapi dirender langsung
+        # agar handler Django tidak memanggil response.render() lewat thread lain
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticators = self.request.authenticators
+            header = authenticators[0].authenticate_header(self.request) if authenticators else None
+            if header:
+                exc.auth_header = header
+            else:
+                exc.status_code = 403
+        response = exception_handler(exc, {'view': self, 'request': self.request})
+        if response is None:
+            raise exc
+        rendered = self.render(response.data, status=response.status_code)
+        for name, value in response.items():
+            if name.lower() != 'content-type':
+                rendered[name] = value
+        return rendered
+
+
+def read_dispatcher(sync_view, async_view):
+    """Kirim GET/HEAD ke view async dan metode lain ke view sync aslinya."""
+    async_sync_view = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await async_view(request, *args, **kwargs)
+        return await async_sync_view(request, *args, **kwargs)
+
+    view.csrf_exempt = True  # Sama seperti view DRF yang digantikan
+    view.read_views = (async_view, sync_view)  # Untuk label metrik per view
+    return view
+
+
+def with_async_reads(urlpatterns, async_views, routes=None):
+    """Pasang view async pada route yang dipilih di ASYNC_READ_ROUTES.
+
+    Route lain tidak berubah, sehingga deployment WSGI tidak menanggung biaya
+    async_to_sync untuk route yang tidak membutuhkannya.
+    """
+    routes = set(getattr(settings, 'ASYNC_READ_ROUTES', ()) if routes is None else routes)
+    result = []
+    for pattern in urlpatterns:
+        name = getattr(pattern, 'name', None)
+        if name in routes and name in async_views:
+            pattern = URLPattern(
+                pattern.pattern, read_dispatcher(pattern.callback, async_views[name]), pattern.default_args, name
+            )
+        result.append(pattern)
+    return result
@@ -0,0 +1,95 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """Tambahkan ETag/Last-Modified dari kolom updated_at dan balas 304 bila tidak berubah.
+
+    Validator dihitung dengan satu query ringan sebelum body diserialisasi:
+    MAX(updated_at) dan COUNT(*) untuk list, updated_at baris untuk detail.
+    Penghapusan baris hanya terlihat pada ETag (lewat jumlah baris), jadi klien
+    sebaiknya memakai If-None-Match.
+    """
+    last_modified_field = 'updated_at'
+    # Nama yang dicampur ke ETag; default nama kelas view
+    etag_namespace = None
+
+    def get_list_validators(self, queryset):
+        result = queryset.order_by().aggregate(
+            last_modified=Max(self.last_modified_field), count=Count('pk')
+        )
+        return result['count'], result['last_modified']
+
+    def get_detail_last_modified(self):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        return (
+            self.get_queryset()
+            .filter(**{self.lookup_field: self.kwargs[lookup]})
+            .values_list(self.last_modified_field, flat=True)
+            .first()
+        )
+
+    def _make_etag(self, request, *parts):
+        # ETag juga bergantung pada pengguna, query string dan format response
+        raw = ':'.join(str(part) for part in (
+            self.etag_namespace or self.__class__.__name__,
+            request.user.pk,
+            request.META.get('QUERY_STRING', ''),
+            getattr(request.accepted_renderer, 'format', ''),
+            *parts,
+        ))
+        return quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+
+    def _conditional_response(self, request, etag, last_modified, render):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = render()
+        return self._add_validators(response, etag, timestamp)
+
+    def _add_validators(self, response, etag, timestamp):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        count, last_modified = self.get_list_validators(self.filter_queryset(self.get_queryset()))
+        etag = self._make_etag(request, 'list', count, last_modified)
+        return self._conditional_response(
+            request, etag, last_modified, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        last_modified = self.get_detail_last_modified()
+        if last_modified is None:
+            # Objek tidak ditemukan: biarkan view menghasilkan 404 seperti biasa
+            return super().retrieve(request, *args, **kwargs)
+        etag = self._make_etag(request, 'detail', sorted(kwargs.items()), last_modified)
+        return self._conditional_response(
+            request, etag, last_modified, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+
+class AsyncConditionalGetMixin(ConditionalGetMixin):
+    """Varian async ConditionalGetMixin untuk view di melar_project.async_views."""
+
+    async def aget_list_validators(self, queryset):
+        result = await queryset.order_by().aaggregate(
+            last_modified=Max(self.last_modified_field), count=Count('pk')
+        )
+        return result['count'], result['last_modified']
+
+    async def aget_detail_last_modified(self, queryset, pk):
+        return await queryset.filter(pk=pk).values_list(self.last_modified_field, flat=True).afirst()
+
+    async def _aconditional_response(self, request, etag, last_modified, render):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = await render()
+        return self._add_validators(response, etag, timestamp)
@@ -0,0 +1,186 @@
+import datetime
+import decimal
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+ZERO = datetime.timedelta(0)
+
+# Field yang to_representation-nya mengembalikan nilai kolom apa adanya
+IDENTITY_FIELDS = (
+    serializers.IntegerField, serializers.CharField, serializers.EmailField, serializers.BooleanField,
+)
+
+
+def _decimal_mapper(field):
+    """Format string Decimal seperti DecimalField, tanpa quantize untuk nilai yang sudah tepat."""
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.normalize_output or field.localize or field.decimal_places is None:
+        return lambda value, utc: field.to_representation(value)
+    exponent = -field.decimal_places
+    max_digits = field.max_digits
+
+    def to_string(value, utc):
+        if isinstance(value, decimal.Decimal):
+            sign, digits, value_exponent = value.as_tuple()
+            if value_exponent == exponent and (max_digits is None or len(digits) <= max_digits):
+                return f'{value:f}'
+        return field.to_representation(value)
+    return to_string
+
+
+def _datetime_mapper(field):
+    """Format ISO 8601 seperti DateTimeField; nilai UTC tidak perlu dikonversi zona waktunya."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601 or hasattr(field, 'timezone'):
+        return lambda value, utc: field.to_representation(value)
+
+    def to_iso(value, utc):
+        if utc and isinstance(value, datetime.datetime) and value.utcoffset() == ZERO:
+            value = value.isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return field.to_representation(value)
+    return to_iso
+
+
+def _output_is_utc():
+    if not settings.USE_TZ:
+        return False
+    current = timezone.get_current_timezone()
+    return current is datetime.timezone.utc or getattr(current, 'key', None) == 'UTC'
+
+
+class FastSerializer:
+    """Serializer baca cepat untuk daftar besar, dibangun dari ModelSerializer yang ada.
+
+    Baris diambil dengan .values() (tanpa membuat instance model) lalu diubah
+    menjadi dict lewat pemetaan per kolom yang disusun sekali dari field
+    serializer asal. Hasilnya sama persis dengan `serializer_class(many=True).data`.
+    Field yang tidak bisa diturunkan otomatis (mis. SerializerMethodField) harus
+    dipetakan lewat `columns`, dan field nested lewat `nested`; field lain yang
+    tidak dikenali membuat FastSerializer menolak dibangun (ImproperlyConfigured).
+
+    columns: {nama_field: nama_kolom} untuk field yang nilainya sama dengan kolom.
+    nested: {nama_field: (FastSerializer anak, nama FK di model anak)}.
+    """
+
+    def __init__(self, serializer_class, columns=None, nested=None):
+        self.serializer_class = serializer_class
+        self.columns = columns or {}
+        self.nested = nested or {}
+        self._plan = None
+
+    @property
+    def model(self):
+        return self.serializer_class.Meta.model
+
+    @property
+    def plan(self):
+        if self._plan is None:
+            self._plan = self._build_plan()
+        return self._plan
+
+    def _build_plan(self):
+        plan = []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if name not in self.nested and name not in self.columns and ('.' in field.source or field.source == '*'):
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{name} memakai source '{field.source}'; "
+                    "FastSerializer hanya mendukung kolom model langsung."
+                )
+            if name in self.nested:
+                plan.append((name, None, None))
+            elif name in self.columns:
+                plan.append((name, self.columns[name], None))
+            elif isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+                plan.append((name, self.model._meta.get_field(field.source).attname, None))
+            elif isinstance(field, serializers.DecimalField):
+                plan.append((name, field.source, _decimal_mapper(field)))
+            elif isinstance(field, serializers.DateTimeField):
+                plan.append((name, field.source, _datetime_mapper(field)))
+            elif isinstance(field, serializers.BigIntegerField):
+                coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_BIGINT_TO_STRING)
+                plan.append((name, field.source, (lambda value, utc: str(value)) if coerce_to_string else None))
+            elif type(field) in IDENTITY_FIELDS:
+                plan.append((name, field.source, None))
+            elif isinstance(field, serializers.ChoiceField) and not isinstance(field, serializers.MultipleChoiceField):
+                plan.append((name, field.source, lambda value, utc, field=field: field.to_representation(value)))
+            else:
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{name} ({type(field).__name__}) "
+                    "tidak didukung FastSerializer; petakan lewat `columns` atau `nested`."
+                )
+        return plan
+
+    @property
+    def value_columns(self):
+        columns = [column for name, column, mapper in self.plan if column is not None]
+        if self.nested and 'pk' not in columns and self.model._meta.pk.attname not in columns:
+            columns.append(self.model._meta.pk.attname)
+        return columns
+
+    def values(self, queryset, *extra):
+        """Queryset .values() berisi kolom yang dibutuhkan ditambah kolom ekstra (mis. urutan paginasi)."""
+        columns = self.value_columns
+        return queryset.prefetch_related(None).values(*columns, *(c for c in extra if c not in columns))
+
+    def serialize(self, rows):
+        utc = _output_is_utc()
+        nested = {name: self._fetch_nested(name, rows) for name in self.nested}
+        pk = self.model._meta.pk.attname
+        result = []
+        for row in rows:
+            item = {}
+            for name, column, mapper in self.plan:
+                if column is None:
+                    item[name] = nested[name].get(row[pk], [])
+                    continue
+                value = row[column]
+                item[name] = value if mapper is None or value is None else mapper(value, utc)
+            result.append(item)
+        return result
+
+    def _fetch_nested(self, name, rows):
+        child, fk_name = self.nested[name]
+        fk_column = child.model._meta.get_field(fk_name).attname
+        parent_ids = [row[self.model._meta.pk.attname] for row in rows]
+        if not parent_ids:
+            return {}
+        # Query yang sama dengan prefetch_related, sehingga urutan anak juga sama
+        child_rows = list(child.values(child.model._default_manager.filter(**{f'{fk_name}__in': parent_ids}), fk_column))
+        grouped = defaultdict(list)
+        for child_row, item in zip(child_rows, child.serialize(child_rows)):
+            grouped[child_row[fk_column]].append(item)
+        return grouped
+
+
+class FastListMixin:
+    """Layani aksi list lewat `fast_serializer` bila FAST_LIST_SERIALIZERS aktif.
+
+    Letakkan tepat sebelum kelas ViewSet DRF agar mixin lain (ETag, cache
+    response) tetap membungkus hasilnya.
+    """
+    fast_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_serializer is None or not getattr(settings, 'FAST_LIST_SERIALIZERS', False):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = []
+        if self.paginator is not None and hasattr(self.paginator, 'get_ordering'):
+            # Kolom urutan cursor harus ada di setiap baris untuk membentuk cursor berikutnya
+            ordering = [field.lstrip('-') for field in self.paginator.get_ordering(request, queryset, self)]
+        rows = self.fast_serializer.values(queryset, *ordering)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.fast_serializer.serialize(page))
+        return Response(self.fast_serializer.serialize(list(rows)))
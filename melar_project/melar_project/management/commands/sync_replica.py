@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from melar_project.routers import copy_to_replica, replica_aliases
+
+
+class Command(BaseCommand):
+    help = "Salin database primary ke replika baca SQLite (sekali, atau berkala dengan --interval)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--alias', action='append', dest='aliases',
+            help="Alias replika yang disalin (boleh berulang). Default: semua alias dengan REPLICA_OF.",
+        )
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help="Ulangi penyalinan setiap N detik sampai dihentikan.",
+        )
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or replica_aliases()
+        unknown = set(aliases) - set(replica_aliases())
+        if unknown:
+            raise CommandError(f"Bukan alias replika: {', '.join(sorted(unknown))}")
+
+        while True:
+            for alias in aliases:
+                start = time.perf_counter()
+                try:
+                    copy_to_replica(alias)
+                except ValueError as exc:
+                    raise CommandError(str(exc)) from exc
+                self.stdout.write(f"Copied primary to '{alias}' in {time.perf_counter() - start:.2f}s.")
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
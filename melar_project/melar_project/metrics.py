@@ -0,0 +1,327 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+# Batas atas bucket histogram (detik untuk waktu, jumlah untuk query)
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# (nama metrik, atribut RequestStats, bucket, keterangan)
+METRICS = (
+    ('melar_request_latency_seconds', 'latency', TIME_BUCKETS, 'Total latensi request per view.'),
+    ('melar_request_db_seconds', 'db_time', TIME_BUCKETS, 'Total waktu query SQL per request.'),
+    ('melar_request_serialization_seconds', 'serialization_time', TIME_BUCKETS,
+     'Waktu render body response per request.'),
+    ('melar_request_queries', 'queries', QUERY_BUCKETS, 'Jumlah query SQL per request.'),
+)
+
+QUERIES_BY_ALIAS = 'melar_db_queries_total'
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+_current_stats = ContextVar('request_metrics_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = (
+        'view', 'queries', 'aliases', 'db_time', 'serialization_time', 'latency', 'started', 'render_started',
+    )
+
+    def __init__(self):
+        self.view = UNRESOLVED_VIEW
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.aliases = {}  # Jumlah query per alias database
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+        self.latency = 0.0
+        self.render_started = None
+
+
+class Histogram:
+    """Histogram kumulatif bergaya Prometheus dengan bucket tetap (tidak thread-safe sendiri)."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Slot terakhir: +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry:
+    """Histogram per (metrik, view) di memori proses ini.
+
+    Setiap proses worker memiliki registry sendiri; Prometheus men-scrape tiap
+    proses (atau gunakan satu worker per port) lalu menjumlahkannya.
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._queries_by_alias = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stats):
+        with self._lock:
+            for alias, count in stats.aliases.items():
+                key = (stats.view, alias)
+                self._queries_by_alias[key] = self._queries_by_alias.get(key, 0) + count
+            for name, attribute, buckets, help_text in METRICS:
+                histogram = self._histograms.get((name, stats.view))
+                if histogram is None:
+                    histogram = self._histograms[(name, stats.view)] = Histogram(buckets)
+                histogram.observe(getattr(stats, attribute))
+
+    def histogram(self, name, view):
+        return self._histograms.get((name, view))
+
+    def queries_by_alias(self, view):
+        return {alias: count for (name, alias), count in self._queries_by_alias.items() if name == view}
+
+    def render(self):
+        """Format eksposisi teks Prometheus (versi 0.0.4)."""
+        lines = []
+        with self._lock:
+            for name, attribute, buckets, help_text in METRICS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (metric, view), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    label = _label(view)
+                    for bound, total in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{view="{label}",le="{bound}"}} {total}')
+                    lines.append(f'{name}_sum{{view="{label}"}} {histogram.sum}')
+                    lines.append(f'{name}_count{{view="{label}"}} {histogram.count}')
+            lines.append(f'# HELP {QUERIES_BY_ALIAS} Jumlah query SQL per view dan alias database.')
+            lines.append(f'# TYPE {QUERIES_BY_ALIAS} counter')
+            for (view, alias), count in sorted(self._queries_by_alias.items()):
+                lines.append(f'{QUERIES_BY_ALIAS}{{view="{_label(view)}",alias="{_label(alias)}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
+
+
+def reset_metrics_registry():
+    global _registry
+    with _registry_lock:
+        _registry = None
+
+
+def _metrics_config():
+    return getattr(settings, 'REQUEST_METRICS', {})
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper permanen di setiap koneksi; hanya mencatat saat ada request aktif.
+
+    Statistik request dibawa ContextVar, sehingga query dari sync_to_async (view
+    async) dan dari alias database mana pun ikut terhitung.
+    """
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - start
+        stats.queries += 1
+        alias = context['connection'].alias
+        stats.aliases[alias] = stats.aliases.get(alias, 0) + 1
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@receiver(connection_created)
+def _install_on_new_connection(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+@contextmanager
+def serialization_timer():
+    """Tambahkan durasi blok ke waktu serialisasi request aktif (untuk response non-template)."""
+    stats = _current_stats.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.serialization_time += time.perf_counter() - start
+
+
+def view_name(view_func, method):
+    """Label view yang stabil, mis. 'ProductViewSet.list' atau 'AsyncLoginView.post'."""
+    dispatch = getattr(view_func, 'read_views', None)
+    if dispatch is not None:
+        # read_dispatcher: GET/HEAD dilayani view async, metode lain oleh ViewSet
+        view_func = dispatch[0] if method in ('GET', 'HEAD') else dispatch[1]
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is None:
+        return f'{view_func.__module__}.{getattr(view_func, "__qualname__", type(view_func).__name__)}'
+    actions = getattr(view_func, 'actions', None)
+    action = actions.get(method.lower(), method.lower()) if actions else method.lower()
+    return f'{view_class.__name__}.{action}'
+
+
+class RequestMetricsMiddleware:
+    """Catat jumlah query, waktu DB, waktu render dan latensi total per view.
+
+    Letakkan paling atas di MIDDLEWARE agar latensi mencakup middleware lain.
+    Biaya per request hanya beberapa perf_counter() dan satu kunci saat observe;
+    request yang melebihi REQUEST_METRICS['QUERY_BUDGET'] atau
+    ['LATENCY_BUDGET'] (detik) dicatat di logger 'melar_project.metrics'.
+    ['VIEW_LATENCY_BUDGETS'] mengganti anggaran latensi untuk view tertentu
+    (None = tidak diperiksa), mis. view yang meng-hash password.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not _metrics_config().get('ENABLED', True):
+            return self.get_response(request)
+        stats, token = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+            stats.latency = time.perf_counter() - stats.started
+        self._finish(request, response, stats)
+        return response
+
+    async def __acall__(self, request):
+        if not _metrics_config().get('ENABLED', True):
+            return await self.get_response(request)
+        stats, token = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+            stats.latency = time.perf_counter() - stats.started
+        self._finish(request, response, stats)
+        return response
+
+    def _start(self, request):
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+        stats = RequestStats()
+        request._metrics_stats = stats
+        return stats, _current_stats.set(stats)
+
+    def process_template_response(self, request, response):
+        # Response DRF dirender tepat setelah hook ini; callback menutup pengukurannya
+        stats = getattr(request, '_metrics_stats', None)
+        if stats is not None:
+            stats.render_started = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: self._rendered(stats))
+        return response
+
+    def _rendered(self, stats):
+        stats.serialization_time += time.perf_counter() - stats.render_started
+
+    def _finish(self, request, response, stats):
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match is not None:
+            stats.view = view_name(resolver_match.func, request.method)
+        get_metrics_registry().observe(stats)
+        config = _metrics_config()
+        query_budget = config.get('QUERY_BUDGET')
+        latency_budget = config.get('VIEW_LATENCY_BUDGETS', {}).get(stats.view, config.get('LATENCY_BUDGET'))
+        if (query_budget is not None and stats.queries > query_budget) or (
+            latency_budget is not None and stats.latency > latency_budget
+        ):
+            logger.warning(
+                'Request melebihi anggaran: %s %s %s status=%s queries=%d db=%.1fms serialization=%.1fms '
+                'latency=%.1fms aliases=%s',
+                stats.view, request.method, request.path, response.status_code, stats.queries,
+                stats.db_time * 1000, stats.serialization_time * 1000, stats.latency * 1000,
+                ','.join(f'{alias}:{count}' for alias, count in sorted(stats.aliases.items())),
+            )
+
+
+def measure_stream(request, chunks):
+    """Ukur body StreamingHttpResponse yang dibaca setelah middleware selesai mencatat request.
+
+    Query dan waktu selama stream dicatat sebagai view '<view>:stream' ketika stream habis.
+    """
+    parent = getattr(request, '_metrics_stats', None)
+    if parent is None or not _metrics_config().get('ENABLED', True):
+        yield from chunks
+        return
+    stats = RequestStats()
+    stats.view = f'{parent.view}:stream'
+    iterator = iter(chunks)
+    try:
+        while True:
+            token = _current_stats.set(stats)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                _current_stats.reset(token)
+            yield chunk
+    finally:
+        stats.latency = time.perf_counter() - stats.started
+        get_metrics_registry().observe(stats)
+
+
+def metrics_view(request):
+    """Endpoint teks Prometheus untuk token Bearer REQUEST_METRICS['TOKEN'] atau staf yang login.
+
+    Tanpa TOKEN, scraper anonim selalu ditolak: nama view dan latensi tidak untuk publik.
+    """
+    token = _metrics_config().get('TOKEN')
+    authorized = (token and request.headers.get('Authorization') == f'Bearer {token}') or (
+        request.user.is_authenticated and request.user.is_staff
+    )
+    if not authorized:
+        return HttpResponseForbidden()
+    return HttpResponse(get_metrics_registry().render(), content_type='text/plain; version=0.0.4; charset=utf-8')
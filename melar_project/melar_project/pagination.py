@@ -0,0 +1,33 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Paginasi cursor (keyset) berdasarkan kolom (created_at, id) yang terindeks.
+
+    Setiap halaman difilter dengan `WHERE created_at < posisi cursor`, sehingga
+    halaman jauh sama murahnya dengan halaman pertama.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 100)
+
+    def get_ordering(self, request, queryset, view):
+        # View dapat mengganti urutan per request, mis. ranking hasil pencarian
+        get_pagination_ordering = getattr(view, 'get_pagination_ordering', None)
+        ordering = get_pagination_ordering() if get_pagination_ordering else None
+        return ordering or super().get_ordering(request, queryset, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # paginate_queryset milik DRF dipakai apa adanya (bukan salinannya); hanya
+        # evaluasi halamannya yang dijalankan di thread sync untuk view async
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+
+class IdCursorPagination(CreatedAtCursorPagination):
+    """Paginasi cursor untuk model tanpa created_at, diurutkan berdasarkan primary key."""
+    ordering = ('id',)
@@ -0,0 +1,25 @@
+import re
+
+from django.db import connections
+
+# Baris "SCAN <tabel>" tanpa "USING ... INDEX" berarti full table scan di SQLite
+FULL_SCAN_RE = re.compile(r'^SCAN (?P<table>\w+)$')
+
+
+def explain_query_plan(queryset):
+    """Jalankan EXPLAIN QUERY PLAN untuk queryset dan kembalikan kolom detail tiap langkah."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def plan_problems(queryset, allow_sort=False):
+    """Kembalikan langkah rencana query yang bermasalah: full table scan atau sort di temp B-tree."""
+    problems = []
+    for detail in explain_query_plan(queryset):
+        if FULL_SCAN_RE.match(detail):
+            problems.append(detail)
+        elif not allow_sort and detail.startswith('USE TEMP B-TREE FOR ORDER BY'):
+            problems.append(detail)
+    return problems
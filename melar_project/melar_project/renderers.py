@@ -0,0 +1,88 @@
+import codecs
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser, get_encoding
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - tergantung lingkungan
+    orjson = None
+
+
+def _require_orjson(name):
+    if orjson is None:
+        raise ImproperlyConfigured(f"Paket 'orjson' dibutuhkan untuk {name}.")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer berbasis orjson dengan output yang sama dengan renderer DRF.
+
+    Tipe yang tidak dikenal orjson (Decimal, lazy string, QuerySet, dst.) serta
+    date/time/datetime dilewatkan ke JSONEncoder DRF, sehingga Decimal mentah
+    tetap menjadi float dan datetime UTC tetap berakhiran 'Z'. Permintaan dengan
+    `indent=`, atau pengaturan UNICODE_JSON/COMPACT_JSON non-default, memakai
+    renderer DRF biasa. Perbedaan yang tersisa: float di luar [1e-4, 1e16) ditulis
+    tanpa '+'/nol di eksponen (mis. 1e16, bukan 1e+16) dan NaN/Infinity menjadi null.
+    """
+
+    def __init__(self):
+        _require_orjson(type(self).__name__)
+        self.options = (
+            orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        self.default = self.encoder_class().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.default, option=self.options)
+        except orjson.JSONEncodeError:
+            # Mis. integer di luar 64-bit; biarkan encoder DRF yang menangani atau melapor
+            return super().render(data, accepted_media_type, renderer_context)
+        # Sama seperti DRF: U+2028/U+2029 selalu di-escape agar tetap subset JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser berbasis orjson; body yang ditolak orjson diurai ulang dengan json.
+
+    orjson selalu menolak NaN/Infinity dan integer di luar 64-bit. Penguraian
+    ulang membuat hasil dan pesan error untuk kasus tersebut (dan untuk JSON
+    yang memang tidak valid) sama persis dengan JSONParser DRF.
+    """
+    renderer_class = ORJSONRenderer
+
+    def __init__(self):
+        _require_orjson(type(self).__name__)
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = get_encoding(parser_context or {})
+        body = stream.read()
+        if codecs.lookup(encoding).name == 'utf-8':
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        try:
+            parse_constant = json.strict_constant if self.strict else None
+            return json.loads(body.decode(encoding), parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+def json_renderer_class():
+    """Renderer JSON pertama di DEFAULT_RENDERER_CLASSES (untuk response yang selalu JSON)."""
+    for renderer_class in api_settings.DEFAULT_RENDERER_CLASSES:
+        if issubclass(renderer_class, JSONRenderer):
+            return renderer_class
+    return JSONRenderer
@@ -0,0 +1,142 @@
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Cookie yang dipasang setelah write, dan header yang bisa dikirim ulang klien API
+# (mis. aplikasi mobile tanpa cookie); nilainya epoch detik batas jendela sticky
+STICKY_COOKIE = 'melar_primary_until'
+STICKY_HEADER = 'X-Primary-Until'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def read_replicas():
+    return getattr(settings, 'DATABASE_READ_REPLICAS', ())
+
+
+def sticky_until(request):
+    """Batas jendela read-your-writes dari cookie atau header request (0 bila tidak ada)."""
+    value = request.COOKIES.get(STICKY_COOKIE) or request.headers.get(STICKY_HEADER)
+    try:
+        return float(value) if value else 0
+    except ValueError:
+        return 0
+
+
+def in_sticky_window(request):
+    """True selama jendela read-your-writes setelah write pengguna ini."""
+    return sticky_until(request) > time.time()
+
+
+def reads_from_replica(request):
+    return request.method in SAFE_METHODS and bool(read_replicas()) and not in_sticky_window(request)
+
+
+class ReplicaRouter:
+    """Arahkan baca di dalam ReplicaReadMixin ke replika, semua yang lain ke primary.
+
+    Replika adalah alias DATABASES dengan kunci 'REPLICA_OF'; isinya disalin dari
+    primary (`manage.py sync_replica`), sehingga tidak pernah dimigrasi langsung.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            replicas = read_replicas()
+            if replicas:
+                return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Eksplisit: instance yang dibaca dari replika tetap disimpan ke primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Replika berisi data yang sama dengan primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if connections[db].settings_dict.get('REPLICA_OF'):
+            return False
+        return None
+
+
+def replica_aliases():
+    """Semua alias DATABASES yang merupakan replika (memiliki 'REPLICA_OF')."""
+    return [alias for alias in connections if connections[alias].settings_dict.get('REPLICA_OF')]
+
+
+def copy_to_replica(alias):
+    """Salin isi primary ke replika SQLite dengan backup API (snapshot konsisten, online).
+
+    Halaman ditulis langsung ke file replika, sehingga koneksi persisten pembaca
+    di proses lain melihat isi baru pada transaksi baca berikutnya.
+    """
+    target = connections[alias]
+    source = connections[target.settings_dict['REPLICA_OF']]
+    if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+        raise ValueError('copy_to_replica hanya mendukung SQLite; gunakan replikasi bawaan database lain.')
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
+
+
+class ReplicaReadMixin:
+    """Layani request baca view ini dari replika, kecuali dalam jendela sticky-primary.
+
+    Berlaku untuk view sync (ViewSet DRF) maupun async (AsyncReadOnlyView); ORM
+    async ikut membaca ContextVar yang sama lewat sync_to_async.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not reads_from_replica(request):
+            return super().dispatch(request, *args, **kwargs)
+        if getattr(self, 'view_is_async', False):
+            return self._adispatch(super().dispatch(request, *args, **kwargs))
+        token = _replica_reads.set(True)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+
+    async def _adispatch(self, coroutine):
+        token = _replica_reads.set(True)
+        try:
+            return await coroutine
+        finally:
+            _replica_reads.reset(token)
+
+
+class StickyPrimaryMiddleware:
+    """Setelah write yang berhasil, arahkan baca pengguna tersebut ke primary selama
+    DATABASE_STICKY_SECONDS lewat cookie dan header X-Primary-Until.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.mark_sticky(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.mark_sticky(request, await self.get_response(request))
+
+    def mark_sticky(self, request, response):
+        if request.method in SAFE_METHODS or response.status_code >= 400 or not read_replicas():
+            return response
+        seconds = getattr(settings, 'DATABASE_STICKY_SECONDS', 5)
+        until = f'{time.time() + seconds:.3f}'
+        response.set_cookie(STICKY_COOKIE, until, max_age=seconds, httponly=True, samesite='Lax')
+        response[STICKY_HEADER] = until
+        return response
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,9 +45,14 @@ INSTALLED_APPS = [
     'seller_requests',
     'products',
     'carts',
+    'melar_project',
 ]
 
 MIDDLEWARE = [
+    # Paling atas agar latensi per view mencakup seluruh middleware lain
+    'melar_project.metrics.RequestMetricsMiddleware',
+    # Jendela sticky-primary setelah write (lihat DATABASE_READ_REPLICAS)
+    'melar_project.routers.StickyPrimaryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,9 +90,69 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Replika baca: salinan primary yang diperbarui `python manage.py sync_replica`
+    # (jalankan dengan --interval untuk menyalin berkala). Tidak pernah dimigrasi langsung.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': Path(os.environ.get('MELAR_REPLICA_DB', BASE_DIR / 'db-replica.sqlite3')),
+        'REPLICA_OF': 'default',
+    },
 }
 
+# Shard aktif untuk Cart/CartItem, dipilih dengan jump hash dari user_id. 'default' menjadi shard 0
+# agar data lama tetap di tempat. Hanya tambah alias di akhir daftar, jalankan
+# `migrate --database=<alias>` lalu `rebalance_carts`. Mis. MELAR_CART_SHARDS=default,carts_1,carts_2
+CART_SHARDS = [alias for alias in os.environ.get('MELAR_CART_SHARDS', 'default').split(',') if alias]
+
+# Setiap shard selain 'default' adalah file SQLite sendiri (db-<alias>.sqlite3), hanya didefinisikan
+# bila diaktifkan atau didaftarkan di MELAR_CART_SHARD_DATABASES (terdefinisi tanpa menerima keranjang,
+# mis. untuk `migrate --database=<alias>` sebelum diaktifkan). melar_project.test_settings mendaftarkan
+# carts_1 dan carts_2 untuk test sharding. Tabel katalog di shard tetap kosong, jadi foreign key ke
+# produk/pengguna tidak ditegakkan di sana; carts.signals membersihkan baris yatimnya.
+CART_SHARD_DATABASES = [
+    alias for alias in os.environ.get('MELAR_CART_SHARD_DATABASES', '').split(',') if alias
+]
+for alias in dict.fromkeys(CART_SHARDS + CART_SHARD_DATABASES):
+    DATABASES.setdefault(alias, {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db-{alias.replace("_", "-")}.sqlite3',
+        'PRAGMAS': {'foreign_keys': 'OFF'},
+    })
+
+# Router shard keranjang lebih dulu; model lain diteruskan ke router replika
+DATABASE_ROUTERS = ['carts.sharding.CartShardRouter', 'melar_project.routers.ReplicaRouter']
+
+# Alias replika yang melayani baca katalog (produk, kategori, toko), mis. MELAR_READ_REPLICAS=replica.
+# Kosong: semua baca ke primary. Setelah write, baca pengguna itu tetap ke primary selama
+# DATABASE_STICKY_SECONDS (cookie melar_primary_until / header X-Primary-Until).
+DATABASE_READ_REPLICAS = [alias for alias in os.environ.get('MELAR_READ_REPLICAS', '').split(',') if alias]
+DATABASE_STICKY_SECONDS = 5
+
+# Profil database produksi (MELAR_DATABASE_PROFILE=production): WAL agar pembaca tidak
+# memblokir penulis, BEGIN IMMEDIATE agar transaksi tulis mengantre lewat busy_timeout
+# alih-alih gagal "database is locked" saat naik dari kunci baca, dan koneksi persisten.
+# PRAGMAS dijalankan pada setiap koneksi baru oleh melar_project.sqlite.
+DATABASE_PROFILE = os.environ.get('MELAR_DATABASE_PROFILE', 'development')
+
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',  # Aman di WAL: commit hanya bisa hilang saat OS/listrik mati
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -32000,  # Dalam KiB (negatif): ±32 MB per koneksi
+    'busy_timeout': 5000,  # Milidetik
+    'temp_store': 'MEMORY',
+}
+
+if DATABASE_PROFILE == 'production':
+    for database in DATABASES.values():
+        database.update({
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 5},
+            'PRAGMAS': {**SQLITE_PRODUCTION_PRAGMAS, **database.get('PRAGMAS', {})},
+        })
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -133,10 +199,120 @@ AUTH_USER_MODEL = 'users.CustomUser'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT dengan klaim role/is_seller/is_active, tanpa SELECT pengguna per request
+        'users.authentication.StatelessJWTAuthentication',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'melar_project.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 20,
+    # Ganti dengan 'melar_project.renderers.ORJSONRenderer' / 'melar_project.renderers.ORJSONParser'
+    # (butuh paket orjson) untuk encode/decode JSON yang lebih cepat dengan output yang sama
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
+    'DEFAULT_PARSER_CLASSES': (
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+# Route yang GET-nya dilayani view async (ORM async, tanpa pindah thread di ASGI).
+# Pilihan: 'product-list', 'product-detail', 'cart-list', 'cart-detail'.
+# Biarkan kosong untuk deployment WSGI.
+ASYNC_READ_ROUTES = []
+
+# Aksi list produk, keranjang, item keranjang dan toko dilayani FastSerializer
+# (.values() + pemetaan per kolom) dengan output yang identik dengan serializer biasa
+FAST_LIST_SERIALIZERS = False
+
+# Batas maksimum ?page_size= yang dapat diminta klien
+PAGINATION_MAX_PAGE_SIZE = 100
+
+# Batas bawah bucket harga untuk facet produk dan masa berlaku cache facet (detik)
+PRODUCT_PRICE_BUCKETS = [0, 100000, 500000, 1000000, 5000000]
+PRODUCT_FACET_CACHE_TIMEOUT = 3600
+
+# Registry kategori (products.registry): alias cache untuk token versi (harus cache bersama bila
+# lebih dari satu worker) dan umur maksimum token serta peta kategori per proses, dalam detik
+CATEGORY_REGISTRY = {
+    'CACHE': 'default',
+    'TIMEOUT': 300,
+}
+
+# Jumlah baris yang diambil per putaran .iterator() saat ekspor katalog
+PRODUCT_EXPORT_CHUNK_SIZE = 2000
+
+# Impor produk massal: baris per transaksi bulk_create dan batas error yang dilaporkan
+PRODUCT_IMPORT_BATCH_SIZE = 1000
+PRODUCT_IMPORT_MAX_ERRORS = 1000
+
+# Metrik per view (jumlah query, waktu DB, waktu render, latensi) di /metrics.
+# Request yang melebihi QUERY_BUDGET query atau LATENCY_BUDGET detik dicatat sebagai warning;
+# VIEW_LATENCY_BUDGETS mengganti anggaran untuk view yang sengaja lambat (hashing password).
+# Scraper mengirim header 'Authorization: Bearer <TOKEN>'; tanpa TOKEN hanya staf yang login.
+REQUEST_METRICS = {
+    'ENABLED': True,
+    'QUERY_BUDGET': 30,
+    'LATENCY_BUDGET': 0.5,
+    'VIEW_LATENCY_BUDGETS': {
+        'LoginView.post': 2.0,
+        'AsyncLoginView.post': 2.0,
+        'RegisterView.post': 2.0,
+        'AsyncRegisterView.post': 2.0,
+        'ChangePasswordView.post': 2.0,
+    },
+    'TOKEN': os.environ.get('MELAR_METRICS_TOKEN'),
 }
 
+# Logging: warning anggaran metrik (melar_project.metrics) ditulis ke konsol
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'melar_project.metrics': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+# Cache response list/detail untuk produk dan kategori.
+# Gunakan 'products.cache.RedisCacheBackend' dengan OPTIONS {'url': 'redis://...'} untuk cache bersama.
+RESPONSE_CACHE = {
+    'BACKEND': 'products.cache.LRUCacheBackend',
+    'OPTIONS': {'max_entries': 1024},
+    'TIMEOUT': 300,
+    # Alias cache Django untuk token versi; harus cache bersama bila lebih dari satu worker
+    'VERSION_CACHE': 'default',
+}
+
+# Cache Django. Keranjang tamu memakai alias sendiri; di produksi arahkan ke cache bersama
+# (mis. django.core.cache.backends.redis.RedisCache) agar semua worker melihat keranjang yang sama
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'guest_carts': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'guest-carts',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+# Keranjang pengunjung anonim (carts.guest): alias cache, TTL dalam detik (diperpanjang setiap
+# perubahan) dan batas jumlah produk per keranjang
+GUEST_CARTS = {
+    'CACHE': 'guest_carts',
+    'TTL': 7 * 24 * 3600,
+    'MAX_LINES': 100,
+}
+
+# Pemetaan pengguna -> id keranjang (Cart.objects.cart_id_for_user): alias cache (harus cache bersama
+# bila lebih dari satu worker) dan lama penyimpanan dalam detik
+CART_ID_CACHE = 'default'
+CART_ID_CACHE_TIMEOUT = 3600
+
 from datetime import timedelta
 
 SIMPLE_JWT = {
@@ -144,5 +320,19 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.UserClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.UserClaimsTokenRefreshSerializer',
 }
 
+# Bloom filter JTI yang di-blacklist: interval sinkronisasi antar proses (detik) dan tingkat salah positif.
+# Alias cache untuk token versi blacklist; harus cache bersama agar logout langsung berlaku di semua worker
+TOKEN_BLACKLIST_FILTER_SYNC_SECONDS = 5
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = 0.001
+TOKEN_BLACKLIST_FILTER_CACHE = 'default'
+
+# Pool hashing password untuk jalur login/register async (users.hashing).
+# None = satu worker per core (MAX_PENDING: 4 per worker); pekerjaan di atas MAX_PENDING ditolak
+# dengan 503. MAX_PENDING 0 = tanpa batas.
+PASSWORD_HASHING_WORKERS = None
+PASSWORD_HASHING_MAX_PENDING = None
+
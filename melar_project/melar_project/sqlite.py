@@ -0,0 +1,30 @@
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Jalankan DATABASES[alias]['PRAGMAS'] pada setiap koneksi SQLite baru.
+
+    journal_mode=WAL tersimpan di file database, tetapi pragma lain (synchronous,
+    mmap_size, cache_size, busy_timeout, ...) berlaku per koneksi sehingga harus
+    diulang setiap kali koneksi dibuka.
+    """
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(post_migrate)
+def reapply_sqlite_pragmas(sender, using, **kwargs):
+    """Schema editor SQLite menyalakan kembali foreign_keys saat selesai, sehingga koneksi
+    yang baru dimigrasi (mis. database test) perlu PRAGMAS-nya diterapkan ulang.
+    """
+    connection = connections[using]
+    if connection.connection is not None:
+        apply_sqlite_pragmas(sender=connection.__class__, connection=connection)
@@ -0,0 +1,12 @@
+"""
+Settings untuk menjalankan test: `python manage.py test --settings=melar_project.test_settings`.
+
+Sama dengan melar_project.settings, ditambah shard keranjang carts_1 dan carts_2 (database test
+di memori) yang dipakai test sharding.
+"""
+
+import os
+
+os.environ.setdefault('MELAR_CART_SHARD_DATABASES', 'carts_1,carts_2')
+
+from .settings import *  # noqa: E402,F401,F403
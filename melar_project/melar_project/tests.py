@@ -0,0 +1,608 @@
+import asyncio
+import datetime
+import importlib
+import io
+import json
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, connection, connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import clear_url_caches, resolve
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from carts.models import Cart, CartItem
+from carts.views import CartViewSet
+from melar_project.fast_serializers import FastSerializer
+from melar_project.metrics import get_metrics_registry, reset_metrics_registry
+from melar_project.renderers import ORJSONParser, ORJSONRenderer
+from melar_project.routers import ReplicaRouter
+from melar_project.query_plan import explain_query_plan, plan_problems
+from products.cache import reset_response_cache
+from products.models import Category, Product
+from products.export import export_queryset
+from products.search import search_products
+from products.serializers import ProductSerializer
+from products.views import CategoryViewSet, ProductViewSet
+from seller_requests.models import SellerRequest
+from seller_requests.views import SellerRequestViewSet
+from shops.models import Shop
+from shops.views import ShopViewSet
+from users.serializers import UserClaimsTokenObtainPairSerializer
+
+User = get_user_model()
+
+
+class QueryPlanTests(TestCase):
+    """Pastikan queryset utama setiap viewset tidak melakukan full table scan di SQLite."""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(
+            email='planner@example.com', username='planner', password='password'
+        )
+
+    def _page_queryset(self, viewset_class, user):
+        """Queryset halaman (cursor) seperti yang dijalankan oleh aksi list viewset."""
+        view = viewset_class(action_map={'get': 'list'}, kwargs={}, format_kwarg=None)
+        view.request = view.initialize_request(self.factory.get('/'))
+        view.request.user = user
+        ordering = view.paginator.ordering
+        # Halaman lanjutan: filter posisi cursor pada kolom urutan pertama
+        field = ordering[0].lstrip('-')
+        position = 0 if field == 'id' else timezone.now()
+        lookup = f'{field}__lt' if ordering[0].startswith('-') else f'{field}__gt'
+        return view.get_queryset().filter(**{lookup: position}).order_by(*ordering)[:20]
+
+    def assertNoFullScan(self, queryset, **kwargs):
+        problems = plan_problems(queryset, **kwargs)
+        self.assertEqual(problems, [], msg=f"Query plan: {explain_query_plan(queryset)}")
+
+    def test_viewset_querysets_use_indexes(self):
+        admin = User.objects.create_user(
+            email='plan-admin@example.com', username='plan-admin', password='password', role='admin'
+        )
+        cases = [
+            (ProductViewSet, self.user),
+            (CategoryViewSet, admin),
+            (ShopViewSet, self.user),
+            (CartViewSet, self.user),
+            (SellerRequestViewSet, self.user),
+            (SellerRequestViewSet, admin),
+        ]
+        for viewset_class, user in cases:
+            with self.subTest(viewset=viewset_class.__name__, role=user.role):
+                self.assertNoFullScan(self._page_queryset(viewset_class, user))
+
+    def test_hot_filters_use_indexes(self):
+        ordering = ('-created_at', '-id')
+        querysets = {
+            'available products per category': Product.objects.filter(category_id=1, available=True),
+            'available products': Product.objects.filter(available=True),
+            'products per owner': Product.objects.filter(owner=self.user),
+            'pending seller requests': SellerRequest.objects.filter(status='pending'),
+        }
+        # Ekspor katalog inkremental memakai urutan indeks (updated_at, id)
+        self.assertNoFullScan(export_queryset(timezone.now()))
+        for name, queryset in querysets.items():
+            with self.subTest(name):
+                self.assertNoFullScan(queryset.order_by(*ordering)[:20])
+
+    def test_product_search_uses_fts_index(self):
+        # Hanya baris yang cocok yang diurutkan berdasarkan rank, jadi sort diperbolehkan
+        queryset = search_products(Product.objects.filter(available=True), 'laptop')
+        self.assertNoFullScan(queryset.order_by('search_rank', 'id')[:20], allow_sort=True)
+        self.assertTrue(any('VIRTUAL TABLE' in step for step in explain_query_plan(queryset)))
+
+    def test_plan_problems_detects_full_scan(self):
+        # Deskripsi tidak terindeks, jadi harus terdeteksi sebagai full table scan
+        queryset = Product.objects.filter(description='x')
+        self.assertTrue(plan_problems(queryset))
+
+
+def reload_urlconfs():
+    for module in ('products.urls', 'carts.urls', 'melar_project.urls'):
+        importlib.reload(importlib.import_module(module))
+    clear_url_caches()
+
+
+@contextmanager
+def async_read_routes(*routes):
+    """Bangun ulang URLconf dengan ASYNC_READ_ROUTES tertentu selama blok berjalan."""
+    try:
+        with override_settings(ASYNC_READ_ROUTES=list(routes)):
+            reload_urlconfs()
+            yield
+    finally:
+        reload_urlconfs()
+
+
+class AsyncReadViewTests(TestCase):
+    """View baca async harus menghasilkan response yang sama dengan ViewSet sync."""
+
+    routes = ('product-list', 'product-detail', 'cart-list', 'cart-detail')
+
+    def setUp(self):
+        reset_response_cache()
+        self.addCleanup(reset_response_cache)
+        self.seller = User.objects.create_user(
+            email='async-seller@example.com', username='async-seller', password='password', role='seller'
+        )
+        self.customer = User.objects.create_user(
+            email='async-customer@example.com', username='async-customer', password='password'
+        )
+        category = Category.objects.create(name='Async')
+        self.products = [
+            Product.objects.create(
+                owner=self.seller, category=category, name=f'Produk {i}',
+                description='Deskripsi', price=Decimal('1000.50') + i, available=i % 2 == 0,
+            )
+            for i in range(5)
+        ]
+        self.cart = Cart.objects.create(user=self.customer)
+        CartItem.objects.create(cart=self.cart, product=self.products[0], quantity=2)
+        Cart.objects.refresh_totals()
+
+    def auth(self, user):
+        token = UserClaimsTokenObtainPairSerializer.get_token(user).access_token
+        return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def assertSameResponse(self, path, **headers):
+        sync_response = self.client.get(path, **headers)
+        with async_read_routes(*self.routes):
+            self.assertTrue(asyncio.iscoroutinefunction(resolve(path.split('?')[0]).func))
+            async_response = self.client.get(path, **headers)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.content, sync_response.content)
+        self.assertEqual(async_response['Content-Type'], sync_response['Content-Type'])
+        self.assertEqual(async_response.get('ETag'), sync_response.get('ETag'))
+        self.assertEqual(async_response.get('WWW-Authenticate'), sync_response.get('WWW-Authenticate'))
+        return async_response
+
+    def test_product_list_and_detail(self):
+        seller = self.auth(self.seller)
+        response = self.assertSameResponse('/products/?page_size=2', **seller)
+        self.assertSameResponse(response.json()['next'].split('testserver')[1], **seller)
+        self.assertSameResponse('/products/?available=true&min_price=1001', **seller)
+        self.assertSameResponse('/products/?q=produk', **seller)
+        self.assertSameResponse(f'/products/{self.products[0].pk}/', **seller)
+
+    def test_errors_match_sync_views(self):
+        self.assertSameResponse('/products/')
+        self.assertSameResponse('/products/', **self.auth(self.customer))
+        self.assertSameResponse('/products/?min_price=abc', **self.auth(self.seller))
+        self.assertSameResponse('/products/999999/', **self.auth(self.seller))
+        self.assertSameResponse(f'/api/cart/{self.cart.pk}/', **self.auth(self.seller))
+
+    def test_cart_list_and_detail(self):
+        customer = self.auth(self.customer)
+        self.assertSameResponse('/api/cart/', **customer)
+        self.assertSameResponse(f'/api/cart/{self.cart.pk}/', **customer)
+
+    def test_async_cart_queries_and_conditional_get(self):
+        customer = self.auth(self.customer)
+        with async_read_routes(*self.routes):
+            # Validator ETag, keranjang dan item; pengguna dibaca dari klaim token
+            with self.assertNumQueries(3):
+                response = self.client.get('/api/cart/', **customer)
+            response = self.client.get('/api/cart/', HTTP_IF_NONE_MATCH=response['ETag'], **customer)
+            self.assertEqual(response.status_code, 304)
+
+    def test_writes_still_use_sync_viewset(self):
+        with async_read_routes(*self.routes):
+            response = self.client.post('/products/', {
+                'category': self.products[0].category_id, 'name': 'Baru', 'description': 'Baru',
+                'price': '10.00', 'owner': self.seller.pk,
+            }, content_type='application/json', **self.auth(self.seller))
+        self.assertEqual(response.status_code, 201)
+
+
+class FastListSerializerTests(TestCase):
+    """Aksi list lewat FastSerializer harus menghasilkan body yang identik byte demi byte."""
+
+    def setUp(self):
+        reset_response_cache()
+        self.addCleanup(reset_response_cache)
+        self.seller = User.objects.create_user(
+            email='fast-seller@example.com', username='fast-seller', password='password', role='seller'
+        )
+        category = Category.objects.create(name='Fast')
+        self.products = [
+            Product.objects.create(
+                owner=self.seller, category=category, name=f'Produk {i}',
+                description='Deskripsi', price=Decimal('1000.50') + i, available=i % 2 == 0,
+            )
+            for i in range(5)
+        ]
+        # Harga dengan skala berbeda dari decimal_places harus tetap diformat seperti DecimalField
+        Product.objects.filter(pk=self.products[1].pk).update(price=Decimal('7.5'))
+        self.cart = Cart.objects.create(user=self.seller)
+        CartItem.objects.create(cart=self.cart, product=self.products[0], quantity=2)
+        CartItem.objects.create(cart=self.cart, product=self.products[2], quantity=1)
+        Cart.objects.refresh_totals()
+        Shop.objects.create(user=self.seller, shop_name='Toko Cepat')
+        Shop.objects.create(user=self.seller, shop_name='Toko Lain', description='Ada deskripsi')
+        token = UserClaimsTokenObtainPairSerializer.get_token(self.seller).access_token
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def get(self, path, fast):
+        reset_response_cache()
+        with override_settings(FAST_LIST_SERIALIZERS=fast):
+            response = self.client.get(path, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def assertSameBody(self, path):
+        fast = self.get(path, True)
+        self.assertEqual(fast.content, self.get(path, False).content)
+        return fast
+
+    def test_list_endpoints_are_byte_identical(self):
+        for path in ('/products/', '/products/?q=produk', '/products/?available=true&min_price=1001',
+                     '/api/cart/', '/api/cart-items/', '/api/shops/'):
+            with self.subTest(path):
+                self.assertSameBody(path)
+
+    def test_cursor_pages_are_byte_identical(self):
+        for path in ('/products/?page_size=2', '/products/?q=produk&page_size=2', '/api/cart-items/?page_size=1'):
+            with self.subTest(path):
+                response = self.assertSameBody(path)
+                self.assertSameBody(response.json()['next'].split('testserver')[1])
+
+    def test_non_utc_timezone_is_byte_identical(self):
+        with timezone.override('Asia/Jakarta'):
+            self.assertSameBody('/products/')
+
+    def test_fast_cart_list_fetches_items_in_one_query(self):
+        with override_settings(FAST_LIST_SERIALIZERS=True):
+            # Validator ETag, keranjang dan satu query item untuk semua keranjang
+            with self.assertNumQueries(3):
+                self.client.get('/api/cart/', **self.headers)
+
+    def test_unsupported_field_is_rejected(self):
+        class WithMethodField(ProductSerializer):
+            label = serializers.SerializerMethodField()
+
+            def get_label(self, obj):
+                return obj.name
+
+        with self.assertRaises(ImproperlyConfigured):
+            FastSerializer(WithMethodField).plan
+        self.assertIn('label', [name for name, column, mapper in FastSerializer(
+            WithMethodField, columns={'label': 'name'}).plan])
+
+
+class ORJSONRendererTests(TestCase):
+    """ORJSONRenderer/ORJSONParser harus identik dengan JSONRenderer/JSONParser DRF."""
+
+    def setUp(self):
+        reset_response_cache()
+        self.addCleanup(reset_response_cache)
+        self.user = User.objects.create_user(
+            email='orjson@example.com', username='orjson', password='password', role='seller'
+        )
+        category = Category.objects.create(name='Elektronik ⚡')
+        product = Product.objects.create(
+            owner=self.user, category=category, name='Laptop “Pro”\u2028', description='Ünïcode',
+            price=Decimal('15999999.99'),
+        )
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=product, quantity=3)
+        Cart.objects.refresh_totals()
+        token = UserClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def assertSameRender(self, data, accepted_media_type=None):
+        expected = JSONRenderer().render(data, accepted_media_type)
+        self.assertEqual(ORJSONRenderer().render(data, accepted_media_type), expected)
+
+    def test_api_payloads_render_identically(self):
+        for path in ('/products/', '/api/cart/', '/products/facets/'):
+            with self.subTest(path):
+                response = self.client.get(path, **self.headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(ORJSONRenderer().render(response.data), response.content)
+
+    def test_python_types_render_identically(self):
+        jakarta = datetime.timezone(datetime.timedelta(hours=7))
+        self.assertSameRender({
+            'decimal': Decimal('47999999.97'),
+            'decimals': [Decimal('0.10'), Decimal('-3'), Decimal('1000000')],
+            'utc': datetime.datetime(2024, 5, 1, 10, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'jakarta': datetime.datetime(2024, 5, 1, 17, 30, tzinfo=jakarta),
+            'naive': datetime.datetime(2024, 5, 1, 10, 30),
+            'date': datetime.date(2024, 5, 1),
+            'time': datetime.time(8, 15, 30, 500),
+            'duration': datetime.timedelta(hours=1, seconds=1),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'lazy': gettext_lazy('Produk'),
+            'text': 'garis\u2028paragraf\u2029 “kutip” \\ </script>',
+            1: 'kunci integer',
+            'nested': ({'float': 0.1, 'int': 2 ** 63 - 1, 'bool': True, 'none': None},),
+            'values': Category.objects.values('name'),
+        })
+
+    def test_fallbacks(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+        self.assertSameRender({'a': [1, 2]}, 'application/json; indent=4')
+        self.assertSameRender({'big': 2 ** 70})
+
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(io.BytesIO(body), 'application/json', {'encoding': encoding})
+
+    def test_parser_matches_drf(self):
+        bodies = [
+            '{"name": "Laptop “Pro”", "price": "1.50", "qty": 2, "ratio": 0.1, "tags": [null, true]}'.encode(),
+            b'{"big": 1180591620717411303424}',
+        ]
+        for body in bodies:
+            with self.subTest(body=body):
+                self.assertEqual(self.parse(ORJSONParser(), body), self.parse(JSONParser(), body))
+        body = '{"nama": "ü"}'.encode('utf-16')
+        self.assertEqual(self.parse(ORJSONParser(), body, 'utf-16'), {'nama': 'ü'})
+
+    def test_parser_errors_match_drf(self):
+        for body in (b'{"price": NaN}', b'{"name": ', b'\xff'):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError) as expected:
+                    self.parse(JSONParser(), body)
+                with self.assertRaises(ParseError) as actual:
+                    self.parse(ORJSONParser(), body)
+                self.assertEqual(str(actual.exception), str(expected.exception))
+
+
+class RequestMetricsTests(TestCase):
+    """Middleware metrik mencatat biaya per view dan menyajikannya di /metrics."""
+
+    def setUp(self):
+        reset_response_cache()
+        reset_metrics_registry()
+        self.addCleanup(reset_response_cache)
+        self.addCleanup(reset_metrics_registry)
+        self.seller = User.objects.create_user(
+            email='metrics@example.com', username='metrics', password='password', role='seller'
+        )
+        category = Category.objects.create(name='Metrik')
+        self.product = Product.objects.create(
+            owner=self.seller, category=category, name='Produk', description='Deskripsi', price=Decimal('10.00'),
+        )
+        token = UserClaimsTokenObtainPairSerializer.get_token(self.seller).access_token
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def histogram(self, name, view):
+        return get_metrics_registry().histogram(name, view)
+
+    def test_records_queries_and_timings_per_view(self):
+        # Validator ETag dan halaman produk
+        with self.assertNumQueries(2):
+            self.client.get('/products/', **self.headers)
+        self.client.get(f'/products/{self.product.pk}/', **self.headers)
+
+        queries = self.histogram('melar_request_queries', 'ProductViewSet.list')
+        self.assertEqual((queries.count, queries.sum), (1, 2))
+        self.assertEqual(self.histogram('melar_request_queries', 'ProductViewSet.retrieve').count, 1)
+        for name in ('melar_request_db_seconds', 'melar_request_serialization_seconds',
+                     'melar_request_latency_seconds'):
+            with self.subTest(name):
+                self.assertGreater(self.histogram(name, 'ProductViewSet.list').sum, 0)
+        latency = self.histogram('melar_request_latency_seconds', 'ProductViewSet.list').sum
+        self.assertGreaterEqual(latency, self.histogram('melar_request_db_seconds', 'ProductViewSet.list').sum)
+
+    def test_async_views_are_labelled_and_counted(self):
+        with async_read_routes('product-list'):
+            self.client.get('/products/', **self.headers)
+        queries = self.histogram('melar_request_queries', 'AsyncProductReadView.get')
+        self.assertEqual(queries.count, 1)
+        self.assertGreater(queries.sum, 0)
+        self.assertGreater(self.histogram('melar_request_serialization_seconds', 'AsyncProductReadView.get').sum, 0)
+
+    def test_prometheus_endpoint(self):
+        self.client.get('/products/', **self.headers)
+        self.client.get('/tidak-ada/')
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        staff = User.objects.create_user(
+            email='staff@example.com', username='staff', password='password', is_staff=True
+        )
+        self.client.force_login(staff)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE melar_request_queries histogram', body)
+        self.assertIn('melar_request_queries_bucket{view="ProductViewSet.list",le="+Inf"} 1', body)
+        self.assertIn('melar_request_latency_seconds_count{view="<unresolved>"} 1', body)
+
+    @override_settings(REQUEST_METRICS={'TOKEN': 'rahasia'})
+    def test_prometheus_endpoint_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer rahasia').status_code, 200)
+
+    def test_logs_requests_over_budget(self):
+        with override_settings(REQUEST_METRICS={'QUERY_BUDGET': 1, 'LATENCY_BUDGET': None}):
+            with self.assertLogs('melar_project.metrics', 'WARNING') as logs:
+                self.client.get('/products/', **self.headers)
+        self.assertIn('ProductViewSet.list GET /products/ status=200 queries=2', logs.output[0])
+        with override_settings(REQUEST_METRICS={'QUERY_BUDGET': 100, 'LATENCY_BUDGET': 60}):
+            with self.assertNoLogs('melar_project.metrics', 'WARNING'):
+                self.client.get('/products/', **self.headers)
+
+    def test_view_latency_budget_overrides_default(self):
+        config = {'QUERY_BUDGET': None, 'LATENCY_BUDGET': 0, 'VIEW_LATENCY_BUDGETS': {'ProductViewSet.list': None}}
+        with override_settings(REQUEST_METRICS=config):
+            with self.assertNoLogs('melar_project.metrics', 'WARNING'):
+                self.client.get('/products/', **self.headers)
+            with self.assertLogs('melar_project.metrics', 'WARNING') as logs:
+                self.client.get(f'/products/{self.product.pk}/', **self.headers)
+        self.assertIn('ProductViewSet.retrieve', logs.output[0])
+
+    @override_settings(REQUEST_METRICS={'ENABLED': False})
+    def test_can_be_disabled(self):
+        self.client.get('/products/', **self.headers)
+        self.assertIsNone(self.histogram('melar_request_queries', 'ProductViewSet.list'))
+
+
+class SQLiteProductionProfileTests(TestCase):
+    """Pragma profil produksi dipasang di setiap koneksi baru dan transaksi tulis memakai BEGIN IMMEDIATE."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'profile.sqlite3')
+
+    def connect(self, alias, **pragmas):
+        settings_dict = {
+            **connection.settings_dict,
+            'NAME': self.path,
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+            'PRAGMAS': {**settings.SQLITE_PRODUCTION_PRAGMAS, **pragmas},
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            return cursor.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def test_pragmas_applied_on_new_connection(self):
+        wrapper = self.connect('profile')
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+        self.assertEqual(self.pragma(wrapper, 'cache_size'), -32000)
+        self.assertEqual(self.pragma(wrapper, 'mmap_size'), 256 * 1024 * 1024)
+        # Pragma per koneksi diulang setelah koneksi dibuka kembali
+        wrapper.close()
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+
+    def test_write_transaction_takes_lock_up_front(self):
+        writer = self.connect('profile-writer')
+        other = self.connect('profile-other', busy_timeout=50)
+        with writer.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        connections['profile-writer'] = writer
+        self.addCleanup(connections.__delitem__, 'profile-writer')
+
+        with transaction.atomic(using='profile-writer'):
+            # BEGIN IMMEDIATE: kunci tulis diambil saat atomic() dimulai, sebelum ada query
+            with self.assertRaisesMessage(OperationalError, 'locked'):
+                with other.cursor() as cursor:
+                    cursor.execute('INSERT INTO item DEFAULT VALUES')
+            # WAL: pembaca tetap jalan selama ada penulis
+            with other.cursor() as cursor:
+                self.assertEqual(cursor.execute('SELECT COUNT(*) FROM item').fetchone()[0], 0)
+
+
+@override_settings(DATABASE_READ_REPLICAS=['replica'], DATABASE_STICKY_SECONDS=30)
+class ReadReplicaTests(TransactionTestCase):
+    """Baca katalog dari replika yang disalin dari primary, dengan jendela sticky-primary setelah write."""
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        reset_response_cache()
+        reset_metrics_registry()
+        self.addCleanup(reset_response_cache)
+        self.addCleanup(reset_metrics_registry)
+        self.seller = User.objects.create_user(
+            email='replica@example.com', username='replica', password='password', role='seller'
+        )
+        self.category = Category.objects.create(name='Replika')
+        self.product = self.create_product('Tersalin')
+        call_command('sync_replica', stdout=io.StringIO())
+        token = UserClaimsTokenObtainPairSerializer.get_token(self.seller).access_token
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def create_product(self, name):
+        return Product.objects.create(
+            owner=self.seller, category=self.category, name=name, description='Deskripsi', price=Decimal('10.00'),
+        )
+
+    def names(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [product['name'] for product in response.json()['results']]
+
+    def test_catalogue_reads_use_replica_until_copied(self):
+        self.create_product('Belum tersalin')
+        self.assertEqual(self.names(self.client.get('/products/', **self.headers)), ['Tersalin'])
+        self.assertEqual(get_metrics_registry().queries_by_alias('ProductViewSet.list'), {'replica': 2})
+
+        call_command('sync_replica', stdout=io.StringIO())
+        self.assertEqual(
+            self.names(self.client.get('/products/', **self.headers)), ['Belum tersalin', 'Tersalin']
+        )
+
+    def test_export_streams_from_replica(self):
+        self.create_product('Belum tersalin')
+        response = self.client.get('/products/export/', **self.headers)
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['Tersalin'])
+        # Query stream dicatat setelah response dikembalikan, di bawah label tersendiri
+        self.assertEqual(get_metrics_registry().queries_by_alias('ProductViewSet.export:stream'), {'replica': 1})
+
+    def test_sticky_primary_after_write(self):
+        response = self.client.post('/products/', {
+            'category': self.category.pk, 'name': 'Baru', 'description': 'Baru', 'price': '10.00',
+            'owner': self.seller.pk,
+        }, content_type='application/json', **self.headers)
+        self.assertEqual(response.status_code, 201)
+        until = response['X-Primary-Until']
+        self.assertEqual(response.cookies['melar_primary_until'].value, until)
+
+        # Cookie dari test client: penulis langsung melihat produknya sendiri
+        self.assertIn('Baru', self.names(self.client.get('/products/', **self.headers)))
+        self.assertEqual(get_metrics_registry().queries_by_alias('ProductViewSet.list'), {'default': 2})
+
+        # Klien tanpa cookie: header X-Primary-Until dikirim ulang; tanpa keduanya baca dari replika
+        self.client.cookies.clear()
+        self.assertIn('Baru', self.names(self.client.get('/products/', HTTP_X_PRIMARY_UNTIL=until, **self.headers)))
+        self.assertNotIn('Baru', self.names(self.client.get('/products/', **self.headers)))
+
+    def test_replica_and_sticky_reads_bypass_response_cache(self):
+        # Baca replika yang tertinggal tidak boleh mengisi cache dengan token versi terbaru
+        self.create_product('Belum tersalin')
+        response = self.client.get('/products/', **self.headers)
+        self.assertEqual(response['X-Cache'], 'BYPASS')
+        with override_settings(DATABASE_READ_REPLICAS=[]):
+            self.assertEqual(
+                self.names(self.client.get('/products/', **self.headers)), ['Belum tersalin', 'Tersalin']
+            )
+            response = self.client.get('/products/', HTTP_X_PRIMARY_UNTIL=f'{time.time() + 5:.3f}', **self.headers)
+            self.assertEqual(response['X-Cache'], 'BYPASS')
+            self.assertEqual(self.client.get('/products/', **self.headers)['X-Cache'], 'HIT')
+
+    def test_async_read_view_uses_replica(self):
+        self.create_product('Belum tersalin')
+        with async_read_routes('product-list'):
+            self.assertEqual(self.names(self.client.get('/products/', **self.headers)), ['Tersalin'])
+        self.assertEqual(get_metrics_registry().queries_by_alias('AsyncProductReadView.get'), {'replica': 2})
+
+    def test_other_views_and_writes_use_primary(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Product), 'default')
+        self.assertEqual(router.db_for_write(Product), 'default')
+        self.assertIs(router.allow_migrate('replica', 'products'), False)
+        self.client.get('/api/cart/', **self.headers)
+        self.assertEqual(get_metrics_registry().queries_by_alias('CartViewSet.list'), {'default': 2})
+
+    def test_metrics_report_queries_per_alias(self):
+        self.client.get('/products/', **self.headers)
+        with override_settings(REQUEST_METRICS={'TOKEN': 'rahasia'}):
+            body = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer rahasia').content.decode()
+        self.assertIn('melar_db_queries_total{view="ProductViewSet.list",alias="replica"} 2', body)
@@ -17,8 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from .metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),  # Scrape Prometheus
     path('api/users/', include('users.urls')),
     path('api/shops/', include('shops.urls')), 
     path('api/', include('seller_requests.urls')),
@@ -0,0 +1,258 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, router
+from django.utils.module_loading import import_string
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from melar_project.routers import in_sticky_window
+
+
+class LRUCacheBackend:
+    """Backend cache in-process dengan batas jumlah entri (least recently used)."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        expires_at = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class LocalRedisStandIn:
+    """Pengganti lokal untuk klien Redis (subset get/set/delete/flushdb) dipakai saat tes."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            item = self._data.get(name)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[name]
+                return None
+            return value
+
+    def set(self, name, value, ex=None):
+        if isinstance(value, str):
+            value = value.encode()
+        with self._lock:
+            self._data[name] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCacheBackend:
+    """Backend cache untuk klien berantarmuka Redis; nilai disimpan sebagai JSON."""
+
+    def __init__(self, client=None, url=None, prefix='melar:'):
+        if client is None:
+            if url is None:
+                raise ImproperlyConfigured("RedisCacheBackend membutuhkan 'client' atau 'url'.")
+            try:
+                import redis
+            except ImportError as exc:
+                raise ImproperlyConfigured("Paket 'redis' dibutuhkan untuk RedisCacheBackend.") from exc
+            client = redis.Redis.from_url(url)
+        elif isinstance(client, str):
+            client = import_string(client)()
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key, value, timeout=None):
+        self.client.set(self.prefix + key, json.dumps(value, cls=JSONEncoder), ex=timeout or None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        self.client.flushdb()
+
+
+class ResponseCache:
+    """Cache data response per objek dan per daftar, dengan token versi untuk invalidasi.
+
+    Setiap objek memiliki token versi sendiri dan setiap model memiliki token versi
+    untuk daftar. Invalidasi cukup mengganti token, sehingga entri lama tidak pernah
+    terbaca lagi. Token yang hilang (mis. tergusur) diganti dengan token baru,
+    bukan diulang dari nol, agar entri lama tidak cocok kembali.
+
+    Data response disimpan di `backend` (boleh per proses), sedangkan token versi
+    disimpan di cache Django `versions`. Dengan beberapa worker, `versions` harus
+    cache bersama agar invalidasi di satu worker membuat entri worker lain tidak
+    terbaca lagi; cache per proses ditolak oleh `check --deploy` (products.E002).
+    """
+
+    def __init__(self, backend, versions, timeout=300):
+        self.backend = backend
+        self.versions = versions
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _version(self, version_key):
+        version = self.versions.get(version_key)
+        if version is None:
+            version = uuid.uuid4().hex
+            # add() agar worker yang bersamaan tidak saling menimpa token
+            if not self.versions.add(version_key, version, timeout=None):
+                version = self.versions.get(version_key, version)
+        return version
+
+    def detail_key(self, label, pk):
+        version = self._version(f'{label}:{pk}:version')
+        return f'{label}:{pk}:{version}'
+
+    def list_key(self, label, request):
+        version = self._version(f'{label}:list:version')
+        query = request.META.get('QUERY_STRING', '')
+        return f'{label}:list:{version}:{request.get_host()}:{query}'
+
+    def invalidate(self, label, pk):
+        self.versions.set(f'{label}:{pk}:version', uuid.uuid4().hex, timeout=None)
+        self.invalidate_list(label)
+
+    def invalidate_list(self, label):
+        # Untuk penulisan massal yang hanya menambah baris (tanpa mengubah objek lama)
+        self.versions.set(f'{label}:list:version', uuid.uuid4().hex, timeout=None)
+
+    def get(self, key):
+        data = self.backend.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key, data):
+        self.backend.set(key, data, self.timeout)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+_response_cache = None
+
+
+def response_version_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE', {}).get('VERSION_CACHE', 'default')]
+
+
+def get_response_cache():
+    """Bangun ResponseCache dari settings.RESPONSE_CACHE (sekali per proses)."""
+    global _response_cache
+    if _response_cache is None:
+        config = getattr(settings, 'RESPONSE_CACHE', {})
+        backend_class = import_string(config.get('BACKEND', 'products.cache.LRUCacheBackend'))
+        backend = backend_class(**config.get('OPTIONS', {}))
+        versions = response_version_cache()
+        _response_cache = ResponseCache(backend, versions, timeout=config.get('TIMEOUT', 300))
+    return _response_cache
+
+
+def reset_response_cache():
+    global _response_cache
+    _response_cache = None
+
+
+class CachedResponseMixin:
+    """Mixin viewset yang menyajikan list/retrieve dari ResponseCache.
+
+    Permission tingkat view tetap diperiksa pada setiap request. Retrieve tidak
+    memanggil get_object() saat cache hit, jadi hanya gunakan mixin ini pada
+    viewset yang tidak memiliki permission tingkat objek untuk aksi baca.
+    """
+
+    def _response_cache_usable(self):
+        """Cache hanya dibaca/diisi dari primary di luar jendela sticky-primary.
+
+        Baca dari replika bisa tertinggal dari primary; bila diisi ke cache, data lama
+        tersimpan di bawah token versi terbaru dan tersaji ke semua orang hingga TIMEOUT.
+        Dalam jendela sticky penulis harus melihat tulisannya sendiri, jadi juga tanpa cache.
+        """
+        return (
+            router.db_for_read(self.queryset.model) == DEFAULT_DB_ALIAS
+            and not in_sticky_window(self.request)
+        )
+
+    def _uncached_response(self, render):
+        response = render()
+        response['X-Cache'] = 'BYPASS'
+        return response
+
+    def _cached_response(self, key, render):
+        cache = get_response_cache()
+        data = cache.get(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        response = render()
+        if response.status_code == 200:
+            cache.set(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        render = partial(super().list, request, *args, **kwargs)
+        if not self._response_cache_usable():
+            return self._uncached_response(render)
+        key = get_response_cache().list_key(self.queryset.model._meta.label_lower, request)
+        return self._cached_response(key, render)
+
+    def retrieve(self, request, *args, **kwargs):
+        render = partial(super().retrieve, request, *args, **kwargs)
+        if not self._response_cache_usable():
+            return self._uncached_response(render)
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        key = get_response_cache().detail_key(self.queryset.model._meta.label_lower, pk)
+        return self._cached_response(key, render)
@@ -0,0 +1,45 @@
+from django.core.checks import Error, register
+
+from .cache import response_version_cache
+from .registry import registry_cache
+
+# Backend cache yang isinya hanya terlihat oleh proses yang menulisnya
+PER_PROCESS_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_per_process_cache(cache):
+    backend = type(cache)
+    return f'{backend.__module__}.{backend.__qualname__}' in PER_PROCESS_CACHE_BACKENDS
+
+
+@register(deploy=True)
+def check_category_registry_cache(app_configs, **kwargs):
+    """Token versi CategoryRegistry harus berada di cache bersama saat deploy multi-worker."""
+    if not is_per_process_cache(registry_cache()):
+        return []
+    return [
+        Error(
+            "CATEGORY_REGISTRY['CACHE'] memakai cache per proses; perubahan kategori "
+            "tidak terlihat oleh worker lain.",
+            hint='Arahkan CATEGORY_REGISTRY["CACHE"] ke alias cache bersama (Redis, Memcached, database).',
+            id='products.E001',
+        )
+    ]
+
+
+@register(deploy=True)
+def check_response_cache_versions(app_configs, **kwargs):
+    """Token versi ResponseCache harus bersama agar invalidasi terlihat oleh semua worker."""
+    if not is_per_process_cache(response_version_cache()):
+        return []
+    return [
+        Error(
+            "RESPONSE_CACHE['VERSION_CACHE'] memakai cache per proses; worker lain tetap "
+            "menyajikan response lama setelah data diubah.",
+            hint='Arahkan RESPONSE_CACHE["VERSION_CACHE"] ke alias cache bersama (Redis, Memcached, database).',
+            id='products.E002',
+        )
+    ]
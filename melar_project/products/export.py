@@ -0,0 +1,56 @@
+from django.conf import settings
+
+from melar_project.renderers import json_renderer_class
+
+from .models import Product
+from .serializers import ProductSerializer
+
+# Format ekspor yang didukung beserta content type-nya
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+# Baris dikumpulkan hingga kira-kira sebesar ini sebelum dikirim ke klien
+BUFFER_SIZE = 64 * 1024
+
+
+def export_queryset(updated_since=None):
+    """Produk diurutkan berdasarkan (updated_at, id) lewat indeks product_updated_id_idx.
+
+    Urutan ini memungkinkan indexer melanjutkan ekspor dengan updated_since
+    bernilai updated_at terakhir yang diterimanya.
+    """
+    queryset = Product.objects.order_by('updated_at', 'id')
+    if updated_since is not None:
+        queryset = queryset.filter(updated_at__gte=updated_since)
+    return queryset
+
+
+def stream_products(queryset, output='ndjson', chunk_size=None):
+    """Hasilkan katalog sebagai potongan bytes tanpa memuat seluruh baris ke memori.
+
+    Setiap baris diserialisasi dengan ProductSerializer dan renderer JSON yang sama
+    seperti /products/, sehingga satu baris ekspor identik dengan item di API.
+    """
+    chunk_size = chunk_size or getattr(settings, 'PRODUCT_EXPORT_CHUNK_SIZE', 2000)
+    serializer = ProductSerializer()
+    renderer = json_renderer_class()()
+    separator = b'\n' if output == 'ndjson' else b','
+
+    buffer = bytearray(b'[' if output == 'json' else b'')
+    first = True
+    for product in queryset.iterator(chunk_size=chunk_size):
+        if output == 'json' and not first:
+            buffer += separator
+        buffer += renderer.render(serializer.to_representation(product))
+        if output == 'ndjson':
+            buffer += separator
+        first = False
+        if len(buffer) >= BUFFER_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if output == 'json':
+        buffer += b']'
+    if buffer:
+        yield bytes(buffer)
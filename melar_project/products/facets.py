@@ -0,0 +1,119 @@
+from bisect import bisect_right
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Product
+from .registry import get_category_registry
+
+FACET_CACHE_KEY = 'products:facets'
+DEFAULT_PRICE_BUCKETS = [0, 100000, 500000, 1000000, 5000000]
+
+
+def get_price_buckets():
+    """Batas bawah setiap bucket harga; bucket terakhir tidak memiliki batas atas."""
+    return [Decimal(str(bound)) for bound in getattr(settings, 'PRODUCT_PRICE_BUCKETS', DEFAULT_PRICE_BUCKETS)]
+
+
+def bucket_index(price, buckets):
+    return max(bisect_right(buckets, Decimal(str(price))) - 1, 0)
+
+
+def compute_facets():
+    """Hitung jumlah produk yang tersedia per kategori dan per bucket harga dari database."""
+    buckets = get_price_buckets()
+    available = Product.objects.filter(available=True)
+
+    categories = dict(
+        available.order_by().values_list('category_id').annotate(count=Count('id'))
+    )
+    ranges = {}
+    for i, lower in enumerate(buckets):
+        condition = Q(price__gte=lower)
+        if i + 1 < len(buckets):
+            condition &= Q(price__lt=buckets[i + 1])
+        ranges[f'bucket_{i}'] = Count('id', filter=condition)
+    counts = available.aggregate(**ranges)
+
+    return {
+        'categories': categories,
+        'price_buckets': [counts[f'bucket_{i}'] for i in range(len(buckets))],
+    }
+
+
+def _category_key(category_id):
+    return f'{FACET_CACHE_KEY}:category:{category_id}'
+
+
+def _bucket_key(index):
+    return f'{FACET_CACHE_KEY}:bucket:{index}'
+
+
+def get_facets():
+    """Ambil facet dari cache; bangun ulang dari database hanya jika belum ada.
+
+    Setiap hitungan (per kategori dan per bucket harga) adalah key cache tersendiri
+    agar perubahan produk cukup memanggil cache.incr/decr yang atomik, tanpa
+    get-lalu-set yang bisa saling menimpa antar worker. FACET_CACHE_KEY menandai
+    bahwa semua hitungan sudah dibangun.
+    """
+    buckets = get_price_buckets()
+    category_ids = sorted(get_category_registry().ids())
+    bucket_keys = [_bucket_key(i) for i in range(len(buckets))]
+    category_keys = [_category_key(category_id) for category_id in category_ids]
+    values = cache.get_many([FACET_CACHE_KEY, *bucket_keys, *category_keys])
+    if len(values) == 1 + len(bucket_keys) + len(category_keys):
+        return {
+            'categories': {
+                category_id: values[key]
+                for category_id, key in zip(category_ids, category_keys)
+                if values[key] > 0
+            },
+            'price_buckets': [values[key] for key in bucket_keys],
+        }
+
+    facets = compute_facets()
+    counts = {_category_key(category_id): 0 for category_id in category_ids}
+    counts.update({_category_key(category_id): count for category_id, count in facets['categories'].items()})
+    counts.update(zip(bucket_keys, facets['price_buckets']))
+    counts[FACET_CACHE_KEY] = True
+    cache.set_many(counts, getattr(settings, 'PRODUCT_FACET_CACHE_TIMEOUT', 3600))
+    return facets
+
+
+def invalidate_facets():
+    """Buang facet dari cache, mis. setelah bulk_create yang tidak memicu signal."""
+    cache.delete(FACET_CACHE_KEY)
+
+
+def apply_facet_change(old, new):
+    """Perbarui hitungan facet di cache secara inkremental.
+
+    `old` dan `new` adalah tuple (category_id, price, available) sebelum dan sesudah
+    perubahan, atau None untuk produk yang baru dibuat/dihapus. Jika cache kosong,
+    facet akan dibangun ulang pada pembacaan berikutnya; hitungan yang hilang
+    (tergusur, atau kategori baru) membuat facet dibangun ulang juga.
+    """
+    if old == new or cache.get(FACET_CACHE_KEY) is None:
+        return
+
+    buckets = get_price_buckets()
+    deltas = Counter()
+    for state, delta in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        category_id, price, available = state
+        if not available:
+            continue
+        deltas[_category_key(category_id)] += delta
+        deltas[_bucket_key(bucket_index(price, buckets))] += delta
+
+    try:
+        for key, delta in deltas.items():
+            if delta:
+                cache.incr(key, delta)
+    except ValueError:
+        invalidate_facets()
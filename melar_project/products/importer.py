@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.fields import empty
+
+from .cache import get_response_cache
+from .facets import invalidate_facets
+from .models import Category, Product
+from .registry import get_category_registry
+from .serializers import ProductImportRowSerializer
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+def category_error(pk):
+    return f'Invalid pk "{pk}" - object does not exist.'
+
+
+class ImportFormatError(Exception):
+    """File impor tidak dapat dibaca sebagai CSV/NDJSON UTF-8."""
+
+
+def detect_format(filename, content_type=''):
+    name = (filename or '').lower()
+    if name.endswith('.csv') or content_type == 'text/csv':
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')) or content_type in ('application/x-ndjson', 'application/jsonl'):
+        return 'ndjson'
+    return None
+
+
+def read_rows(stream, input_format):
+    """Iterasi (nomor baris, data) dari file biner tanpa membaca seluruh file ke memori.
+
+    Sel CSV yang kosong dianggap tidak diisi. Baris NDJSON yang bukan objek JSON
+    dikembalikan sebagai None dan dilaporkan sebagai error baris tersebut.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        if input_format == 'csv':
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, {key: value for key, value in row.items() if key and value != ''}
+        else:
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield line_number, row if isinstance(row, dict) else None
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFormatError(str(exc)) from exc
+    finally:
+        text.detach()
+
+
+class ProductImporter:
+    """Impor produk massal: validasi per batch, lalu bulk_create per transaksi.
+
+    Kategori diperiksa terhadap id dari CategoryRegistry yang diambil sekali di
+    awal, bukan dengan query per baris; sebelum bulk_create, id kategori satu
+    batch dipastikan masih ada dengan satu query. Baris yang tidak valid dilewati dan
+    dicatat dalam laporan; setiap batch di-commit sendiri sehingga impor besar
+    tidak menahan satu transaksi panjang.
+    """
+
+    def __init__(self, owner, batch_size=None, max_errors=None):
+        self.owner = owner
+        self.batch_size = batch_size or getattr(settings, 'PRODUCT_IMPORT_BATCH_SIZE', 1000)
+        self.max_errors = getattr(settings, 'PRODUCT_IMPORT_MAX_ERRORS', 1000) if max_errors is None else max_errors
+        self.fields = ProductImportRowSerializer().fields
+        self.category_ids = get_category_registry().ids()
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def validate_row(self, row):
+        if row is None:
+            return None, {'non_field_errors': ["Baris bukan objek JSON yang valid."]}
+        values, errors = {}, {}
+        for name, field in self.fields.items():
+            try:
+                values[name] = field.run_validation(row.get(name, empty))
+            except serializers.ValidationError as exc:
+                errors[name] = exc.detail
+        if 'category' in values and values['category'] not in self.category_ids:
+            # Kategori yang dibuat setelah registry dimuat dicek sekali ke database
+            if get_category_registry().get(values['category']) is None:
+                errors['category'] = [category_error(values['category'])]
+            else:
+                self.category_ids.add(values['category'])
+        if errors:
+            return None, errors
+        return Product(
+            owner_id=self.owner.pk,
+            category_id=values['category'],
+            name=values['name'],
+            description=values['description'],
+            price=values['price'],
+            available=values['available'],
+        ), None
+
+    def run(self, rows):
+        rows = iter(rows)
+        try:
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self._import_batch(batch)
+        finally:
+            if self.created:
+                # bulk_create tidak memicu signal, jadi cache dibersihkan sekali di akhir
+                invalidate_facets()
+                get_response_cache().invalidate_list(Product._meta.label_lower)
+        return self.report()
+
+    def _import_batch(self, batch):
+        products = []
+        for line, row in batch:
+            product, errors = self.validate_row(row)
+            if errors:
+                self._fail(line, errors)
+            else:
+                products.append((line, product))
+        if products:
+            # Registry bisa masih memuat kategori yang baru dihapus proses lain; satu query
+            # per batch mencegah bulk_create gagal karena foreign key
+            existing = set(
+                Category.objects.filter(pk__in={product.category_id for _, product in products})
+                .values_list('pk', flat=True)
+            )
+            missing = {product.category_id for _, product in products} - existing
+            if missing:
+                self.category_ids -= missing
+                for line, product in products:
+                    if product.category_id in missing:
+                        self._fail(line, {'category': [category_error(product.category_id)]})
+                products = [(line, product) for line, product in products if product.category_id in existing]
+            products = [product for _, product in products]
+        if products:
+            with transaction.atomic():
+                Product.objects.bulk_create(products)
+            self.created += len(products)
+
+    def _fail(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def report(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
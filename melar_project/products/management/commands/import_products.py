@@ -0,0 +1,54 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from products.importer import IMPORT_FORMATS, ImportFormatError, ProductImporter, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = "Impor produk massal dari file CSV atau NDJSON (gunakan '-' untuk stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path file CSV/NDJSON, atau '-' untuk membaca stdin.")
+        parser.add_argument('--owner', required=True, help="Email pemilik produk yang diimpor.")
+        parser.add_argument(
+            '--format', choices=IMPORT_FORMATS, dest='input_format',
+            help="Format file; default dibaca dari ekstensi path.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help="Jumlah baris yang divalidasi dan disimpan per transaksi.",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['input_format'] or detect_format(path)
+        if input_format is None:
+            raise CommandError("Format file tidak dikenali; gunakan --format csv atau --format ndjson.")
+        try:
+            owner = get_user_model().objects.get(email=options['owner'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Pengguna {options['owner']} tidak ditemukan.")
+
+        importer = ProductImporter(owner=owner, batch_size=options['batch_size'])
+        stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        try:
+            report = importer.run(read_rows(stream, input_format))
+        except ImportFormatError as exc:
+            raise CommandError(f"File tidak dapat dibaca setelah {importer.created} produk diimpor: {exc}")
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        for error in report['errors']:
+            messages = '; '.join(
+                f"{field}: {' '.join(str(message) for message in field_errors)}"
+                for field, field_errors in error['errors'].items()
+            )
+            self.stderr.write(f"Baris {error['line']}: {messages}")
+        if report['errors_truncated']:
+            self.stderr.write(f"... dan {report['failed'] - len(report['errors'])} baris gagal lainnya.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} products, {report['failed']} rows failed."
+        ))
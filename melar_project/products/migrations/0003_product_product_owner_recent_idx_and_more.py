@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0002_product_product_created_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["owner", "created_at", "id"], name="product_owner_recent_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(condition=models.Q(("available", True)), fields=["category", "created_at", "id"], name="product_avail_cat_recent_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(condition=models.Q(("available", True)), fields=["created_at", "id"], name="product_avail_recent_idx"),
+        ),
+    ]
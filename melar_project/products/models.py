@@ -21,5 +21,34 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Urutan paginasi cursor (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='product_created_id_idx'),
+            # Ekspor katalog inkremental (updated_since), urut (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='product_updated_id_idx'),
+            # Produk milik seorang seller, terbaru lebih dulu
+            models.Index(fields=['owner', 'created_at', 'id'], name='product_owner_recent_idx'),
+            # Produk yang tersedia per kategori, terbaru lebih dulu (indeks parsial)
+            models.Index(
+                fields=['category', 'created_at', 'id'],
+                condition=models.Q(available=True),
+                name='product_avail_cat_recent_idx',
+            ),
+            # Semua produk yang tersedia, terbaru lebih dulu (indeks parsial)
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(available=True),
+                name='product_avail_recent_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Nilai saat dimuat; signal facet membandingkannya dengan nilai baru tanpa SELECT ulang
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def __str__(self):
         return self.name
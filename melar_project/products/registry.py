@@ -0,0 +1,92 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Category
+
+CATEGORY_VERSION_KEY = 'products:categories:version'
+
+
+def _registry_config():
+    return getattr(settings, 'CATEGORY_REGISTRY', {})
+
+
+def registry_cache():
+    return caches[_registry_config().get('CACHE', 'default')]
+
+
+class CategoryRegistry:
+    """Peta id -> Category per proses, dimuat ulang saat token versi berubah.
+
+    Token versi disimpan di cache CATEGORY_REGISTRY['CACHE']. Hanya cache bersama
+    (Redis, Memcached, database) yang menyebarkan perubahan kategori di satu proses
+    ke proses lain; cache per proses ditolak oleh `check --deploy` (products.E001).
+    Setiap pemakaian hanya membaca token versi dari cache, bukan query ke tabel
+    kategori. Token dan peta berumur paling lama CATEGORY_REGISTRY['TIMEOUT'] detik,
+    dan id yang tidak ada di peta dicek ke database sebelum dianggap tidak ada.
+    """
+
+    def __init__(self):
+        self.timeout = _registry_config().get('TIMEOUT', 300)
+        self._categories = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current_version(self):
+        cache = registry_cache()
+        version = cache.get(CATEGORY_VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            # add() agar proses yang bersamaan tidak saling menimpa token
+            if not cache.add(CATEGORY_VERSION_KEY, version, timeout=self.timeout):
+                version = cache.get(CATEGORY_VERSION_KEY, version)
+        return version
+
+    def _categories_for_current_version(self):
+        version = self._current_version()
+        with self._lock:
+            expired = time.monotonic() - self._loaded_at > self.timeout
+            if self._categories is None or self._version != version or expired:
+                self._categories = {category.pk: category for category in Category.objects.order_by('pk')}
+                self._version = version
+                self._loaded_at = time.monotonic()
+            return self._categories
+
+    def get(self, pk):
+        category = self._categories_for_current_version().get(pk)
+        if category is None:
+            # Mungkin dibuat di proses lain yang invalidasinya belum terlihat di sini
+            category = Category.objects.filter(pk=pk).first()
+            if category is not None:
+                self.invalidate()
+        return category
+
+    def all(self):
+        return list(self._categories_for_current_version().values())
+
+    def ids(self):
+        return set(self._categories_for_current_version())
+
+    def invalidate(self):
+        registry_cache().set(CATEGORY_VERSION_KEY, uuid.uuid4().hex, timeout=self.timeout)
+        with self._lock:
+            self._categories = None
+
+
+_category_registry = None
+
+
+def get_category_registry():
+    global _category_registry
+    if _category_registry is None:
+        _category_registry = CategoryRegistry()
+    return _category_registry
+
+
+def reset_category_registry():
+    global _category_registry
+    _category_registry = None
@@ -0,0 +1,47 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'products_product_fts'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(text):
+    """Ubah input pengguna menjadi query MATCH FTS5 yang aman.
+
+    Setiap kata dikutip agar operator FTS5 tidak ikut ditafsirkan; kata terakhir
+    dicocokkan sebagai prefix supaya pencarian sambil mengetik tetap bekerja.
+    """
+    tokens = TOKEN_RE.findall(text)
+    if not tokens:
+        return ''
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_products(queryset, text):
+    """Filter queryset produk dengan pencarian full-text dan anotasi `search_rank` (bm25).
+
+    Nilai `search_rank` yang lebih kecil berarti lebih relevan.
+    """
+    match = build_match_query(text)
+    no_rank = Value(0.0, output_field=FloatField())
+    if not match:
+        return queryset.annotate(search_rank=no_rank).none()
+
+    if connection.vendor != 'sqlite':
+        # Tanpa FTS5: fallback ke pencocokan substring tanpa ranking
+        condition = Q()
+        for token in TOKEN_RE.findall(text):
+            condition &= Q(name__icontains=token) | Q(description__icontains=token)
+        return queryset.filter(condition).annotate(search_rank=no_rank)
+
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+    ).annotate(search_rank=RawSQL(f'{FTS_TABLE}.rank', (), output_field=FloatField()))
@@ -1,5 +1,38 @@
+from functools import partial
+
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from .models import Product, Category
+from .registry import get_category_registry
+
+
+class CategoryRegistryField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField kategori yang dibaca dari CategoryRegistry, bukan dari database.
+
+    Validasi dan pilihan dropdown di browsable API tidak menjalankan SELECT kategori.
+    """
+
+    def get_queryset(self):
+        return Category.objects.all()
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        category = get_category_registry().get(pk)
+        if category is None:
+            self.fail('does_not_exist', pk_value=data)
+        return category
+
+    def get_choices(self, cutoff=None):
+        categories = get_category_registry().all()
+        if cutoff is not None:
+            categories = categories[:cutoff]
+        return {self.to_representation(category): self.display_value(category) for category in categories}
+
 
 # Serializer untuk Category
 class CategorySerializer(serializers.ModelSerializer):
@@ -9,9 +42,62 @@ class CategorySerializer(serializers.ModelSerializer):
 
 # Serializer untuk Product
 class ProductSerializer(serializers.ModelSerializer):
-    # Menggunakan PrimaryKeyRelatedField untuk relasi dengan Category
-    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all())
+    # Kategori divalidasi dari registry per proses, tanpa query per penulisan produk
+    category = CategoryRegistryField()
 
     class Meta:
         model = Product
         fields = '__all__'
+
+    def create(self, validated_data):
+        return self._save_checked(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return self._save_checked(partial(super().update, instance), validated_data)
+
+    def _save_checked(self, save, validated_data):
+        """Kategori yang dihapus proses lain bisa masih ada di registry; foreign key yang
+        gagal dilaporkan sebagai error validasi kategori, bukan 500.
+        """
+        try:
+            with transaction.atomic():
+                return save(validated_data)
+        except IntegrityError:
+            category = validated_data.get('category')
+            if category is None or Category.objects.filter(pk=category.pk).exists():
+                raise
+            get_category_registry().invalidate()
+            message = self.fields['category'].error_messages['does_not_exist'].format(pk_value=category.pk)
+            raise serializers.ValidationError({'category': [message]})
+
+
+# Serializer untuk validasi parameter query pada daftar produk
+class ProductFilterSerializer(serializers.Serializer):
+    q = serializers.CharField(required=False, allow_blank=True, max_length=200)
+    category = serializers.IntegerField(required=False)
+    available = serializers.BooleanField(required=False, allow_null=True, default=None)
+    owner = serializers.IntegerField(required=False)
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+
+    def validate(self, attrs):
+        min_price, max_price = attrs.get('min_price'), attrs.get('max_price')
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise serializers.ValidationError("min_price tidak boleh lebih besar dari max_price.")
+        return attrs
+
+
+# Serializer untuk validasi parameter ekspor katalog
+class ProductExportSerializer(serializers.Serializer):
+    output = serializers.ChoiceField(choices=['ndjson', 'json'], default='ndjson')
+    updated_since = serializers.DateTimeField(required=False)
+
+
+# Kolom satu baris impor produk. Serializer hanya dibuat sekali per impor;
+# setiap baris divalidasi langsung lewat field-fieldnya (lihat products.importer).
+class ProductImportRowSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=200)
+    description = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    category = serializers.IntegerField()
+    available = serializers.BooleanField(default=True)
@@ -0,0 +1,66 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import get_response_cache
+from .facets import apply_facet_change, invalidate_facets
+from .models import Category, Product
+from .registry import get_category_registry
+
+
+FACET_FIELDS = ('category_id', 'price', 'available')
+
+
+def facet_state(product):
+    return tuple(getattr(product, field) for field in FACET_FIELDS)
+
+
+def loaded_facet_state(product):
+    """Nilai facet saat produk dimuat dari database (Product.from_db); None bila tidak diketahui."""
+    loaded = getattr(product, '_loaded_values', {})
+    if all(field in loaded for field in FACET_FIELDS):
+        return tuple(loaded[field] for field in FACET_FIELDS)
+    return None
+
+
+@receiver(post_save, sender=Product)
+def update_facets_on_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else loaded_facet_state(instance)
+    new = facet_state(instance)
+    instance._loaded_values = {**getattr(instance, '_loaded_values', {}), **dict(zip(FACET_FIELDS, new))}
+    if old is None and not created:
+        # Produk tidak dimuat lewat ORM (atau field facet ditunda): nilai lama tidak diketahui
+        transaction.on_commit(invalidate_facets)
+    else:
+        transaction.on_commit(partial(apply_facet_change, old, new))
+
+
+@receiver(post_delete, sender=Product)
+def update_facets_on_delete(sender, instance, **kwargs):
+    old = loaded_facet_state(instance) or facet_state(instance)
+    transaction.on_commit(partial(apply_facet_change, old, None))
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_response_cache(sender, instance, **kwargs):
+    # Invalidasi langsung untuk pembaca di proses ini, lalu sekali lagi setelah commit
+    # agar response yang dibangun dari data sebelum commit tidak bertahan di cache
+    invalidate = partial(get_response_cache().invalidate, sender._meta.label_lower, instance.pk)
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_registry(sender, instance, **kwargs):
+    # Sama seperti cache response: segera, lalu sekali lagi setelah commit
+    registry = get_category_registry()
+    registry.invalidate()
+    transaction.on_commit(registry.invalidate)
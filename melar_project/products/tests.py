@@ -2,7 +2,29 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase
-from products.models import Category
+from django.conf import settings
+from django.core.cache import cache
+import json
+from datetime import timedelta
+from decimal import Decimal
+from urllib.parse import urlencode
+import os
+import tempfile
+from unittest import mock
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from products.checks import check_category_registry_cache, check_response_cache_versions
+from products.facets import get_facets
+from products.importer import ProductImporter
+from products.registry import CATEGORY_VERSION_KEY, get_category_registry, reset_category_registry
+from products.serializers import ProductSerializer
+from django.utils import timezone
+from django.test import TransactionTestCase, override_settings
+from products.cache import LRUCacheBackend, ResponseCache, get_response_cache, reset_response_cache
+from products.models import Category, Product
 
 class ProductAPITest(APITestCase):
 
@@ -103,7 +125,7 @@ class ProductAPITest(APITestCase):
         # Tes mendapatkan daftar produk
         response = self.client.get('/products/', format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertGreater(len(response.data), 0)  # Pastikan ada produk di daftar
+        self.assertGreater(len(response.data['results']), 0)  # Pastikan ada produk di daftar
 
     def test_get_product_detail(self):
         # Buat produk terlebih dahulu
@@ -137,3 +159,662 @@ class ProductAPITest(APITestCase):
         # Menghapus produk yang tidak ada
         response = self.client.delete('/products/9999/', format='json')  # ID produk yang tidak ada
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def _create_products(self, count):
+        for i in range(count):
+            Product.objects.create(
+                owner=self.seller_user, name=f'Produk {i}', description='Produk massal',
+                price='1000.00', category=self.category,
+            )
+
+    def test_product_list_cursor_pagination(self):
+        # Telusuri semua halaman lewat cursor 'next' tanpa duplikasi atau data hilang
+        self._create_products(25)
+        url, seen = '/products/?page_size=10', []
+        while url:
+            response = self.client.get(url, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 10)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(seen, sorted(seen, reverse=True))  # Terbaru lebih dulu
+
+    @override_settings(PAGINATION_MAX_PAGE_SIZE=5)
+    def test_product_list_page_size_is_capped(self):
+        self._create_products(8)
+        response = self.client.get('/products/?page_size=1000', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_category_list_cursor_pagination(self):
+        for i in range(3):
+            Category.objects.create(name=f'Kategori {i}')
+        self.client.force_authenticate(user=get_user_model().objects.create_user(
+            email='admin@example.com', username='admin123', password='securepassword', role='admin'
+        ))
+        response = self.client.get('/categories/?page_size=2', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+
+class ProductSearchTest(APITestCase):
+
+    def setUp(self):
+        self.seller_user = get_user_model().objects.create_user(
+            email='seller@example.com', username='sellers123', password='securepassword', role='seller'
+        )
+        self.client.force_authenticate(user=self.seller_user)
+        self.electronics = Category.objects.create(name="Electronics")
+        self.books = Category.objects.create(name="Books")
+
+        self.laptop = self._product('Laptop Gaming', 'Laptop gaming dengan kartu grafis cepat', self.electronics)
+        self.office = self._product('Laptop Kantor', 'Ringan untuk bekerja', self.electronics, available=False)
+        self.book = self._product('Buku Pemrograman', 'Belajar membuat laptop bekerja lebih cepat', self.books)
+        self.mouse = self._product('Mouse', 'Mouse wireless', self.electronics)
+
+    def _product(self, name, description, category, available=True):
+        return Product.objects.create(
+            owner=self.seller_user, name=name, description=description,
+            price='100.00', category=category, available=available,
+        )
+
+    def _search(self, query):
+        response = self.client.get(f'/products/?{query}', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in response.data['results']]
+
+    def test_search_matches_name_and_description_ranked(self):
+        ids = self._search('q=laptop')
+        self.assertEqual(set(ids), {self.laptop.id, self.office.id, self.book.id})
+        # Judul dan deskripsi sama-sama cocok, jadi Laptop Gaming paling relevan
+        self.assertEqual(ids[0], self.laptop.id)
+
+    def test_search_combines_with_filters(self):
+        self.assertEqual(self._search(f'q=laptop&category={self.electronics.id}&available=true'), [self.laptop.id])
+        self.assertEqual(self._search('q=laptop&available=false'), [self.office.id])
+
+    def test_search_prefix_and_operator_characters(self):
+        self.assertEqual(self._search('q=mou'), [self.mouse.id])
+        self.assertEqual(self._search('q=%22mouse%22%20(%2A%3A'), [self.mouse.id])
+        self.assertEqual(self._search('q=%21%21%21'), [])
+
+    def test_search_index_follows_updates_and_deletes(self):
+        self.mouse.name = 'Keyboard Mekanik'
+        self.mouse.description = 'Keyboard untuk mengetik'
+        self.mouse.save()
+        self.assertEqual(self._search('q=keyboard'), [self.mouse.id])
+        self.assertEqual(self._search('q=mouse'), [])
+
+        self.laptop.delete()
+        self.assertNotIn(self.laptop.id, self._search('q=laptop'))
+
+    def test_search_results_are_paginated_by_rank(self):
+        first = self.client.get('/products/?q=laptop&page_size=2', format='json')
+        self.assertEqual(len(first.data['results']), 2)
+        second = self.client.get(first.data['next'], format='json')
+        ids = [item['id'] for item in first.data['results'] + second.data['results']]
+        self.assertEqual(ids, self._search('q=laptop'))
+
+    def test_invalid_filter_returns_bad_request(self):
+        response = self.client.get('/products/?category=abc', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(PRODUCT_PRICE_BUCKETS=[0, 100, 1000])
+class ProductFilterFacetTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.seller_user = get_user_model().objects.create_user(
+            email='seller@example.com', username='sellers123', password='securepassword', role='seller'
+        )
+        self.other_seller = get_user_model().objects.create_user(
+            email='seller2@example.com', username='sellers456', password='securepassword', role='seller'
+        )
+        self.client.force_authenticate(user=self.seller_user)
+        self.electronics = Category.objects.create(name="Electronics")
+        self.books = Category.objects.create(name="Books")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cheap = self._product('50.00', self.books)
+            self.mid = self._product('500.00', self.electronics)
+            self.pricey = self._product('5000.00', self.electronics, owner=self.other_seller)
+            self.hidden = self._product('70.00', self.books, available=False)
+
+    def _product(self, price, category, owner=None, available=True):
+        return Product.objects.create(
+            owner=owner or self.seller_user, name='Produk', description='Deskripsi',
+            price=price, category=category, available=available,
+        )
+
+    def _ids(self, query):
+        response = self.client.get(f'/products/?{query}', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item['id'] for item in response.data['results']}
+
+    def _facets(self):
+        response = self.client.get('/products/facets/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        categories = {row['category']: row['count'] for row in response.data['categories']}
+        return categories, [row['count'] for row in response.data['price_buckets']]
+
+    def test_filter_by_price_range_and_owner(self):
+        self.assertEqual(self._ids('min_price=100&max_price=5000'), {self.mid.id, self.pricey.id})
+        self.assertEqual(self._ids(f'owner={self.other_seller.id}'), {self.pricey.id})
+        self.assertEqual(
+            self._ids(f'category={self.books.id}&available=true&max_price=100'), {self.cheap.id}
+        )
+
+    def test_invalid_price_range_returns_bad_request(self):
+        response = self.client.get('/products/?min_price=500&max_price=100', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_facet_counts(self):
+        categories, buckets = self._facets()
+        # Produk yang tidak tersedia tidak ikut dihitung
+        self.assertEqual(categories, {self.books.id: 1, self.electronics.id: 2})
+        self.assertEqual(buckets, [1, 1, 1])
+
+    def test_facets_served_from_cache(self):
+        self._facets()
+        with self.assertNumQueries(0):
+            self._facets()
+
+    def test_facets_follow_product_changes(self):
+        self._facets()  # Isi cache terlebih dahulu
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mid.category = self.books
+            self.mid.price = '20.00'
+            self.mid.save()
+            self.hidden.available = True
+            self.hidden.save()
+            self.pricey.delete()
+            self._product('150.00', self.electronics)
+
+        with self.assertNumQueries(0):
+            categories, buckets = self._facets()
+        self.assertEqual(categories, {self.books.id: 3, self.electronics.id: 1})
+        self.assertEqual(buckets, [3, 1, 0])
+
+    def test_saving_loaded_product_skips_old_state_select(self):
+        self._facets()
+        product = Product.objects.get(pk=self.mid.pk)
+        product.price = '50.00'
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):  # Hanya UPDATE
+                product.save()
+        self.assertEqual(self._facets()[1], [2, 0, 1])
+
+    def test_unknown_old_state_and_new_category_rebuild_facets(self):
+        self._facets()
+        toys = Category.objects.create(name="Toys")
+        with self.captureOnCommitCallbacks(execute=True):
+            # Objek tidak dimuat dari database: nilai lama tidak diketahui
+            Product(pk=self.cheap.pk, owner=self.seller_user, name='Produk', description='Deskripsi',
+                    price='50.00', category=self.electronics, created_at=self.cheap.created_at).save()
+        self.assertEqual(self._facets()[0], {self.electronics.id: 3})
+        with self.captureOnCommitCallbacks(execute=True):
+            self._product('10.00', toys)
+        self.assertEqual(self._facets(), ({self.electronics.id: 3, toys.id: 1}, [2, 1, 1]))
+
+
+class ProductResponseCacheTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        reset_response_cache()
+        self.addCleanup(reset_response_cache)
+        self.seller_user = get_user_model().objects.create_user(
+            email='seller@example.com', username='sellers123', password='securepassword', role='seller'
+        )
+        self.admin_user = get_user_model().objects.create_user(
+            email='admin@example.com', username='admin123', password='securepassword', role='admin'
+        )
+        self.client.force_authenticate(user=self.seller_user)
+        self.category = Category.objects.create(name="Electronics")
+        self.product = Product.objects.create(
+            owner=self.seller_user, name='Laptop', description='Laptop gaming',
+            price='500000.00', category=self.category,
+        )
+
+    def _get(self, url):
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_detail_and_list_are_cached(self):
+        url = f'/products/{self.product.id}/'
+        self.assertEqual(self._get(url)['X-Cache'], 'MISS')
+        # Hanya query validator ETag (updated_at) yang tersisa
+        with self.assertNumQueries(1):
+            response = self._get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['name'], 'Laptop')
+
+        self.assertEqual(self._get('/products/')['X-Cache'], 'MISS')
+        self.assertEqual(self._get('/products/')['X-Cache'], 'HIT')
+        # Query string berbeda menghasilkan entri cache berbeda
+        self.assertEqual(self._get('/products/?page_size=1')['X-Cache'], 'MISS')
+        self.assertEqual(get_response_cache().stats(), {'hits': 2, 'misses': 3})
+
+    def test_update_invalidates_detail_and_list(self):
+        url = f'/products/{self.product.id}/'
+        self._get(url)
+        self._get('/products/')
+        response = self.client.patch(url, {'name': 'Laptop Baru'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self._get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['name'], 'Laptop Baru')
+        response = self._get('/products/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['name'], 'Laptop Baru')
+
+    def test_delete_invalidates_detail(self):
+        url = f'/products/{self.product.id}/'
+        self._get(url)
+        self.product.delete()
+        self.assertEqual(self.client.get(url, format='json').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_category_change_invalidates_category_list(self):
+        self.client.force_authenticate(user=self.admin_user)
+        self._get('/categories/')
+        self.category.name = 'Elektronik'
+        self.category.save()
+        response = self._get('/categories/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['name'], 'Elektronik')
+
+    def test_cached_response_still_checks_permissions(self):
+        url = f'/products/{self.product.id}/'
+        self._get(url)
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(url, format='json').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_invalidation_reaches_other_workers(self):
+        # Dua worker: data response per proses, token versi di cache bersama
+        worker_a = ResponseCache(LRUCacheBackend(), cache)
+        worker_b = ResponseCache(LRUCacheBackend(), cache)
+        key = worker_b.detail_key('products.product', self.product.id)
+        worker_b.set(key, {'name': 'Laptop'})
+        self.assertEqual(worker_b.get(worker_b.detail_key('products.product', self.product.id)), {'name': 'Laptop'})
+
+        worker_a.invalidate('products.product', self.product.id)
+        self.assertIsNone(worker_b.get(worker_b.detail_key('products.product', self.product.id)))
+
+    def test_deploy_check_rejects_per_process_version_cache(self):
+        self.assertEqual([error.id for error in check_response_cache_versions(None)], ['products.E002'])
+        file_cache = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                      'LOCATION': os.path.join(tempfile.gettempdir(), 'melar-response-versions')}
+        with override_settings(CACHES={**settings.CACHES, 'shared': file_cache},
+                               RESPONSE_CACHE={**settings.RESPONSE_CACHE, 'VERSION_CACHE': 'shared'}):
+            self.assertEqual(check_response_cache_versions(None), [])
+
+    @override_settings(RESPONSE_CACHE={
+        'BACKEND': 'products.cache.RedisCacheBackend',
+        'OPTIONS': {'client': 'products.cache.LocalRedisStandIn'},
+    })
+    def test_redis_backend(self):
+        reset_response_cache()
+        url = f'/products/{self.product.id}/'
+        first = self._get(url)
+        second = self._get(url)
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(second.data, first.data)
+
+        self.product.price = '450000.00'
+        self.product.save()
+        response = self._get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['price'], '450000.00')
+
+
+class ProductConditionalGetTest(APITestCase):
+
+    def setUp(self):
+        reset_response_cache()
+        self.seller_user = get_user_model().objects.create_user(
+            email='seller@example.com', username='sellers123', password='securepassword', role='seller'
+        )
+        self.client.force_authenticate(user=self.seller_user)
+        self.category = Category.objects.create(name="Electronics")
+        self.product = Product.objects.create(
+            owner=self.seller_user, name='Laptop', description='Laptop gaming',
+            price='500000.00', category=self.category,
+        )
+
+    def test_detail_not_modified(self):
+        url = f'/products/{self.product.id}/'
+        etag = self.client.get(url, format='json')['ETag']
+        # Tanpa serialisasi: cukup satu query updated_at
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_list_etag_changes_on_create_and_delete(self):
+        etag = self.client.get('/products/', format='json')['ETag']
+        self.assertEqual(
+            self.client.get('/products/', format='json', HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        other = Product.objects.create(
+            owner=self.seller_user, name='Mouse', description='Mouse', price='1000.00', category=self.category,
+        )
+        response = self.client.get('/products/', format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response['ETag']
+        other.delete()
+        response = self.client.get('/products/', format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_depends_on_query_string(self):
+        etag = self.client.get('/products/', format='json')['ETag']
+        response = self.client.get('/products/?page_size=1', format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ProductExportTest(APITestCase):
+
+    def setUp(self):
+        self.seller_user = get_user_model().objects.create_user(
+            email='seller@example.com', username='sellers123', password='securepassword', role='seller'
+        )
+        self.client.force_authenticate(user=self.seller_user)
+        self.category = Category.objects.create(name="Electronics")
+        self.products = [
+            Product.objects.create(
+                owner=self.seller_user, name=f'Produk {i}', description='Deskripsi',
+                price=f'{i}000.50', category=self.category,
+            )
+            for i in range(5)
+        ]
+
+    def _export(self, query=''):
+        response = self.client.get(f'/products/export/?{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_ndjson_rows_match_product_detail(self):
+        response, content = self._export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['id'] for row in rows], [p.id for p in self.products])
+        # Setiap baris identik dengan response detail produk
+        detail = self.client.get(f'/products/{self.products[0].id}/', format='json')
+        self.assertEqual(content.splitlines()[0], detail.content)
+
+    @override_settings(PRODUCT_EXPORT_CHUNK_SIZE=2)
+    def test_json_array_across_chunks(self):
+        response, content = self._export('output=json')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual([row['id'] for row in json.loads(content)], [p.id for p in self.products])
+
+    def test_empty_export(self):
+        since = (timezone.now() + timedelta(days=1)).isoformat()
+        self.assertEqual(self._export(urlencode({'output': 'json', 'updated_since': since}))[1], b'[]')
+        self.assertEqual(self._export(urlencode({'updated_since': since}))[1], b'')
+
+    def test_updated_since_filter(self):
+        since = timezone.now() + timedelta(hours=1)
+        Product.objects.filter(pk=self.products[1].pk).update(updated_at=since)
+        _, content = self._export(urlencode({'updated_since': since.isoformat()}))
+        self.assertEqual([json.loads(line)['id'] for line in content.splitlines()], [self.products[1].id])
+
+    def test_invalid_parameters(self):
+        for query in ('output=xml', 'updated_since=kemarin'):
+            with self.subTest(query):
+                response = self.client.get(f'/products/export/?{query}')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_customer_cannot_export(self):
+        customer = get_user_model().objects.create_user(
+            email='customer@example.com', username='customer123', password='securepassword'
+        )
+        self.client.force_authenticate(user=customer)
+        self.assertEqual(self.client.get('/products/export/').status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ProductImportTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        reset_response_cache()
+        self.seller_user = get_user_model().objects.create_user(
+            email='seller@example.com', username='sellers123', password='securepassword', role='seller'
+        )
+        self.client.force_authenticate(user=self.seller_user)
+        self.category = Category.objects.create(name="Electronics")
+
+    def _upload(self, name, content, query=''):
+        upload = SimpleUploadedFile(name, content.encode() if isinstance(content, str) else content)
+        return self.client.post(f'/products/import/{query}', {'file': upload}, format='multipart')
+
+    def test_csv_import_with_row_errors(self):
+        content = (
+            "name,description,price,category,available\n"
+            f"Laptop,Laptop gaming,1500.00,{self.category.id},true\n"
+            f"Mouse,Mouse wireless,abc,{self.category.id},\n"
+            f",Tanpa nama,10.00,{self.category.id},\n"
+            "Keyboard,Keyboard mekanik,250.00,9999,false\n"
+            f"Monitor,Monitor 27 inci,3000.00,{self.category.id},false\n"
+        )
+        response = self._upload('produk.csv', content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 3))
+        self.assertFalse(response.data['errors_truncated'])
+        errors = {error['line']: set(error['errors']) for error in response.data['errors']}
+        self.assertEqual(errors, {3: {'price'}, 4: {'name'}, 5: {'category'}})
+
+        laptop = Product.objects.get(name='Laptop')
+        self.assertEqual((laptop.owner, laptop.price, laptop.available), (self.seller_user, Decimal('1500.00'), True))
+        self.assertFalse(Product.objects.get(name='Monitor').available)
+
+    def test_ndjson_import_in_batches(self):
+        lines = [json.dumps({'name': f'Produk {i}', 'description': 'Deskripsi', 'price': '10.00',
+                             'category': self.category.id}) for i in range(5)]
+        lines[2:2] = ['', 'bukan json', '[1, 2]']
+        with override_settings(PRODUCT_IMPORT_BATCH_SIZE=2):
+            with CaptureQueriesContext(connection) as queries:
+                response = self._upload('produk.ndjson', '\n'.join(lines))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['failed']), (5, 2))
+        self.assertEqual([error['line'] for error in response.data['errors']], [4, 5])
+        # Satu INSERT per batch, bukan per baris
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "products_product"')]
+        self.assertEqual(len(inserts), 3)
+
+    def test_import_refreshes_caches_and_search(self):
+        self.assertEqual(self.client.get('/products/').data['results'], [])
+        self.assertEqual(get_facets()['categories'], {})
+        content = json.dumps({'name': 'Kamera Mirrorless', 'description': 'Kamera', 'price': '10.00',
+                              'category': self.category.id})
+        self._upload('produk.jsonl', content)
+
+        self.assertEqual(len(self.client.get('/products/').data['results']), 1)
+        self.assertEqual(get_facets()['categories'], {self.category.id: 1})
+        self.assertEqual(len(self.client.get('/products/?q=kamera').data['results']), 1)
+
+    def test_invalid_uploads(self):
+        self.assertEqual(self.client.post('/products/import/', {}, format='multipart').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._upload('produk.xlsx', 'x').status_code, status.HTTP_400_BAD_REQUEST)
+        # Format dapat dipaksa lewat ?input=
+        response = self._upload('produk.txt', 'name,description,price,category\n', query='?input=csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(PRODUCT_IMPORT_BATCH_SIZE=100)
+    def test_undecodable_file_reports_partial_import(self):
+        # Cukup banyak baris valid sebelum byte rusak agar beberapa batch sempat di-commit
+        line = f'{{"name": "A", "description": "A", "price": "1.00", "category": {self.category.id}}}\n'.encode()
+        response = self._upload('produk.ndjson', line * 1000 + b'\xff\xfe\n')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('file', response.data)
+        self.assertGreater(response.data['created'], 0)
+        self.assertEqual(Product.objects.count(), response.data['created'])
+
+    def test_customer_cannot_import(self):
+        customer = get_user_model().objects.create_user(
+            email='customer@example.com', username='customer123', password='securepassword'
+        )
+        self.client.force_authenticate(user=customer)
+        self.assertEqual(self._upload('produk.csv', 'name\n').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_command(self):
+        content = (
+            "name,description,price,category\n"
+            f"Laptop,Laptop gaming,1500.00,{self.category.id}\n"
+            f"Mouse,Mouse wireless,-,{self.category.id}\n"
+        )
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write(content)
+        self.addCleanup(os.remove, handle.name)
+
+        out, err = StringIO(), StringIO()
+        call_command('import_products', handle.name, '--owner', 'seller@example.com', stdout=out, stderr=err)
+        self.assertIn('Imported 1 products, 1 rows failed.', out.getvalue())
+        self.assertIn('Baris 3: price:', err.getvalue())
+        self.assertTrue(Product.objects.filter(name='Laptop', owner=self.seller_user).exists())
+
+
+class CategoryRegistryTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        reset_category_registry()
+        self.addCleanup(reset_category_registry)
+        self.seller_user = get_user_model().objects.create_user(
+            email='seller@example.com', username='sellers123', password='securepassword', role='seller'
+        )
+        self.client.force_authenticate(user=self.seller_user)
+        self.category = Category.objects.create(name="Electronics")
+
+    def _create(self, category):
+        return self.client.post('/products/', {
+            'category': category, 'name': 'Laptop', 'description': 'Laptop gaming',
+            'price': '1000.00', 'owner': self.seller_user.id,
+        }, format='json')
+
+    def _category_queries(self, queries):
+        return [q['sql'] for q in queries.captured_queries if 'FROM "products_category"' in q['sql']]
+
+    def test_product_write_skips_category_select(self):
+        get_category_registry().all()  # Registry sudah dimuat oleh request sebelumnya
+        with CaptureQueriesContext(connection) as queries:
+            response = self._create(self.category.id)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self._category_queries(queries), [])
+
+    def test_invalid_category_messages(self):
+        response = self._create(9999)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['category'], ['Invalid pk "9999" - object does not exist.'])
+        response = self._create('abc')
+        self.assertEqual(response.data['category'], ['Incorrect type. Expected pk value, received str.'])
+
+    def test_signals_invalidate_registry(self):
+        get_category_registry().all()
+        books = Category.objects.create(name="Books")
+        self.assertEqual(self._create(books.id).status_code, status.HTTP_201_CREATED)
+
+        books.delete()
+        self.assertEqual(self._create(books.id).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_version_bump_from_another_process(self):
+        get_category_registry().all()
+        # bulk_create tidak memicu signal; proses lain mengganti token versi di cache bersama
+        Category.objects.bulk_create([Category(name="Books")])
+        books = Category.objects.get(name="Books")
+        self.assertNotIn(books.id, get_category_registry().ids())
+        cache.set(CATEGORY_VERSION_KEY, 'other-process')
+        self.assertIn(books.id, get_category_registry().ids())
+
+    def test_missing_category_falls_back_to_database(self):
+        get_category_registry().all()
+        # Invalidasi dari proses lain belum terlihat (atau cache tidak dibagi antar worker)
+        Category.objects.bulk_create([Category(name="Books")])
+        books = Category.objects.get(name="Books")
+        self.assertEqual(self._create(books.id).status_code, status.HTTP_201_CREATED)
+        self.assertIn(books.id, get_category_registry().ids())
+
+    def test_registry_expires_without_version_change(self):
+        registry = get_category_registry()
+        registry.all()
+        Category.objects.bulk_create([Category(name="Books")])
+        books = Category.objects.get(name="Books")
+        self.assertNotIn(books.id, registry.ids())
+        registry._loaded_at -= registry.timeout + 1
+        self.assertIn(books.id, registry.ids())
+
+    @override_settings(CATEGORY_REGISTRY={'CACHE': 'default', 'TIMEOUT': 60})
+    def test_version_token_has_finite_timeout(self):
+        reset_category_registry()
+        cache.delete(CATEGORY_VERSION_KEY)
+        with mock.patch.object(cache, 'add', wraps=cache.add) as add:
+            get_category_registry().all()
+        self.assertEqual(add.call_args.kwargs['timeout'], 60)
+        with mock.patch.object(cache, 'set', wraps=cache.set) as set_:
+            get_category_registry().invalidate()
+        self.assertEqual(set_.call_args.kwargs['timeout'], 60)
+
+    def test_import_skips_category_deleted_in_another_process(self):
+        books = Category.objects.create(name="Books")
+        importer = ProductImporter(self.seller_user)
+        # Dihapus langsung di database: registry dan importer masih memuat id-nya
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM products_category WHERE id = %s', [books.id])
+        report = importer.run([
+            (2, {'name': 'Novel', 'description': 'Novel', 'price': '10.00', 'category': books.id}),
+            (3, {'name': 'Laptop', 'description': 'Laptop', 'price': '10.00', 'category': self.category.id}),
+        ])
+        self.assertEqual((report['created'], report['failed']), (1, 1))
+        self.assertEqual(report['errors'], [
+            {'line': 2, 'errors': {'category': [f'Invalid pk "{books.id}" - object does not exist.']}},
+        ])
+
+    def test_deploy_check_rejects_per_process_cache(self):
+        self.assertEqual([error.id for error in check_category_registry_cache(None)], ['products.E001'])
+        file_cache = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                      'LOCATION': os.path.join(tempfile.gettempdir(), 'melar-registry')}
+        with override_settings(CACHES={**settings.CACHES, 'shared': file_cache},
+                               CATEGORY_REGISTRY={'CACHE': 'shared'}):
+            self.assertEqual(check_category_registry_cache(None), [])
+
+    def test_browsable_api_choices_come_from_registry(self):
+        get_category_registry().all()
+        field = ProductSerializer().fields['category']
+        with self.assertNumQueries(0):
+            choices = field.get_choices()
+        self.assertEqual(choices, {self.category.id: 'Electronics'})
+
+
+class CategoryDeletedElsewhereTest(TransactionTestCase):
+    """Foreign key kategori baru diperiksa saat commit, jadi perlu transaksi sungguhan."""
+
+    def setUp(self):
+        cache.clear()
+        reset_category_registry()
+        self.addCleanup(reset_category_registry)
+        self.client = APIClient()
+        self.seller_user = get_user_model().objects.create_user(
+            email='seller@example.com', username='sellers123', password='securepassword', role='seller'
+        )
+        self.client.force_authenticate(user=self.seller_user)
+
+    def test_stale_registry_entry_is_a_validation_error(self):
+        books = Category.objects.create(name="Books")
+        get_category_registry().all()
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM products_category WHERE id = %s', [books.id])
+        response = self.client.post('/products/', {
+            'category': books.id, 'name': 'Novel', 'description': 'Novel',
+            'price': '10.00', 'owner': self.seller_user.id,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['category'], [f'Invalid pk "{books.id}" - object does not exist.'])
+        self.assertNotIn(books.id, get_category_registry().ids())
@@ -1,11 +1,18 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet, CategoryViewSet
+from melar_project.async_views import with_async_reads
+from .views import ProductViewSet, CategoryViewSet, AsyncProductReadView
 
 router = DefaultRouter()
 router.register(r'products', ProductViewSet)
 router.register(r'categories', CategoryViewSet)
 
+# GET list/detail produk dapat dilayani view async, dipilih lewat ASYNC_READ_ROUTES
+async_product_read = AsyncProductReadView.as_view()
+
 urlpatterns = [
-    path('', include(router.urls)),
+    path('', include(with_async_reads(router.urls, {
+        'product-list': async_product_read,
+        'product-detail': async_product_read,
+    }))),
 ]
@@ -1,18 +1,160 @@
-from rest_framework import viewsets
+from django.db import router
+from django.http import StreamingHttpResponse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Product, Category
-from .serializers import ProductSerializer, CategorySerializer
+from .cache import CachedResponseMixin
+from .facets import get_facets, get_price_buckets
+from .search import search_products
+from .export import EXPORT_CONTENT_TYPES, export_queryset, stream_products
+from .importer import IMPORT_FORMATS, ImportFormatError, ProductImporter, detect_format, read_rows
+from .serializers import ProductSerializer, CategorySerializer, ProductFilterSerializer, ProductExportSerializer
 from users.permissions import IsOwner, IsAdminOrSeller, IsAdmin
+from melar_project.async_views import AsyncReadOnlyView
+from melar_project.conditional import ConditionalGetMixin
+from melar_project.fast_serializers import FastListMixin, FastSerializer
+from melar_project.metrics import measure_stream
+from melar_project.routers import ReplicaReadMixin
+from melar_project.pagination import IdCursorPagination
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductListFilterMixin:
+    """Filter dan pencarian daftar produk, dipakai bersama oleh view sync dan async."""
+
+    def filter_product_list(self, queryset, query_params):
+        filters = ProductFilterSerializer(data=query_params.dict())
+        filters.is_valid(raise_exception=True)
+        params = filters.validated_data
+
+        if 'category' in params:
+            queryset = queryset.filter(category_id=params['category'])
+        if params.get('available') is not None:
+            queryset = queryset.filter(available=params['available'])
+        if 'owner' in params:
+            queryset = queryset.filter(owner_id=params['owner'])
+        if 'min_price' in params:
+            queryset = queryset.filter(price__gte=params['min_price'])
+        if 'max_price' in params:
+            queryset = queryset.filter(price__lte=params['max_price'])
+        if params.get('q'):
+            # Pencarian full-text (FTS5), diurutkan berdasarkan relevansi bm25
+            self.search_query = params['q']
+            queryset = search_products(queryset, self.search_query)
+        return queryset
+
+    def get_pagination_ordering(self):
+        # Hasil pencarian dipaginasi berdasarkan relevansi, bukan waktu pembuatan
+        if getattr(self, 'search_query', None):
+            return ('search_rank', 'id')
+        return None
+
+
+class ProductViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, ProductListFilterMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    fast_serializer = FastSerializer(ProductSerializer)
     permission_classes = [IsAuthenticated, IsAdminOrSeller]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        self.search_query = None
+        if self.action != 'list':
+            return queryset
+        return self.filter_product_list(queryset, self.request.query_params)
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Jumlah produk tersedia per kategori dan per bucket harga, dibaca dari cache."""
+        facets = get_facets()
+        buckets = get_price_buckets()
+        price_buckets = []
+        for i, count in enumerate(facets['price_buckets']):
+            upper = buckets[i + 1] if i + 1 < len(buckets) else None
+            price_buckets.append({
+                'min_price': str(buckets[i]),
+                'max_price': str(upper) if upper is not None else None,
+                'count': count,
+            })
+        return Response({
+            'categories': [
+                {'category': category_id, 'count': count}
+                for category_id, count in sorted(facets['categories'].items())
+            ],
+            'price_buckets': price_buckets,
+        })
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Ekspor seluruh katalog sebagai NDJSON atau array JSON secara streaming.
+
+        Baris dibaca per potongan dengan .iterator(), sehingga memori tetap datar
+        berapapun jumlah produknya. Parameter `output` bukan `format` karena
+        `format` dipakai DRF untuk memilih renderer.
+        """
+        params = ProductExportSerializer(data=request.query_params.dict())
+        params.is_valid(raise_exception=True)
+        output = params.validated_data['output']
+        # Alias diikat sekarang: body stream dievaluasi setelah dispatch mengembalikan ContextVar replika
+        queryset = export_queryset(params.validated_data.get('updated_since')).using(router.db_for_read(Product))
+
+        response = StreamingHttpResponse(
+            measure_stream(request, stream_products(queryset, output)), content_type=EXPORT_CONTENT_TYPES[output]
+        )
+        response['Content-Disposition'] = f'attachment; filename="products.{output}"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser, FormParser])
+    def import_products(self, request):
+        """Impor produk massal dari file CSV/NDJSON (field `file`) milik pengguna ini.
+
+        Format dibaca dari ekstensi atau content type file, atau dari `?input=csv|ndjson`.
+        Baris yang tidak valid dilewati dan dilaporkan per nomor baris.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': ["File wajib diunggah."]})
+        input_format = request.query_params.get('input') or detect_format(upload.name, upload.content_type)
+        if input_format not in IMPORT_FORMATS:
+            raise ValidationError({'file': ["Format file harus CSV atau NDJSON."]})
+
+        importer = ProductImporter(owner=request.user)
+        try:
+            report = importer.run(read_rows(upload.file, input_format))
+        except ImportFormatError as exc:
+            # Batch sebelum kerusakan sudah di-commit, jadi laporannya tetap dikirim
+            return Response(
+                {'file': [f"File tidak dapat dibaca: {exc}"], **importer.report()},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(report, status=status.HTTP_200_OK)
+
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
         
-class CategoryViewSet(viewsets.ModelViewSet):
+class AsyncProductReadView(ReplicaReadMixin, ProductListFilterMixin, AsyncReadOnlyView):
+    """Versi async dari GET /products/ dan /products/<pk>/ (lihat ASYNC_READ_ROUTES).
+
+    Tidak melewati cache response; ETag dan body sama dengan ProductViewSet.
+    """
+    queryset = Product.objects.all()
+    serializer_class = ProductSerializer
+    permission_classes = [IsAuthenticated, IsAdminOrSeller]
+    # ETag sama dengan ProductViewSet agar cache klien tetap berlaku saat route berganti
+    etag_namespace = 'ProductViewSet'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        self.search_query = None
+        if self.kwargs.get(self.lookup_url_kwarg) is not None:
+            return queryset
+        return self.filter_product_list(queryset, self.request.query_params)
+
+
+class CategoryViewSet(ReplicaReadMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    pagination_class = IdCursorPagination  # Category tidak memiliki created_at
     permission_classes = [IsAuthenticated, IsAdmin]  # Hanya admin yang dapat mengelola kategori
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("seller_requests", "0002_alter_sellerrequest_status"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sellerrequest",
+            index=models.Index(fields=["created_at", "id"], name="sellerreq_created_id_idx"),
+        ),
+    ]
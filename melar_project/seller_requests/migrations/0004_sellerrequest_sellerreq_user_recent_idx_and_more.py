@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("seller_requests", "0003_sellerrequest_sellerreq_created_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sellerrequest",
+            index=models.Index(fields=["user", "created_at", "id"], name="sellerreq_user_recent_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="sellerrequest",
+            index=models.Index(condition=models.Q(("status", "pending")), fields=["created_at", "id"], name="sellerreq_pending_idx"),
+        ),
+    ]
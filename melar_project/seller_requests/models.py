@@ -9,5 +9,19 @@ class SellerRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Urutan paginasi cursor (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='sellerreq_created_id_idx'),
+            # Permohonan milik pengguna non-admin, terbaru lebih dulu
+            models.Index(fields=['user', 'created_at', 'id'], name='sellerreq_user_recent_idx'),
+            # Antrian permohonan yang masih pending (indeks parsial)
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(status='pending'),
+                name='sellerreq_pending_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.email} - {self.status}"
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shops", "0002_shop_shop_created_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="shop",
+            index=models.Index(fields=["user", "created_at", "id"], name="shop_user_recent_idx"),
+        ),
+    ]
@@ -15,5 +15,13 @@ class Shop(models.Model):
     created_at = models.DateTimeField(default=timezone.now)  # Waktu pembuatan
     updated_at = models.DateTimeField(auto_now=True)  # Waktu pembaruan
 
+    class Meta:
+        indexes = [
+            # Urutan paginasi cursor (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='shop_created_id_idx'),
+            # Toko milik pengguna (ShopViewSet.get_queryset), terbaru lebih dulu
+            models.Index(fields=['user', 'created_at', 'id'], name='shop_user_recent_idx'),
+        ]
+
     def __str__(self):
         return self.shop_name
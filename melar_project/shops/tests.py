@@ -53,7 +53,7 @@ class ShopViewSetTests(APITestCase):
         print("List User Shops Response:", response.content)  # Debugging line
         self.assertEqual(response.status_code, status.HTTP_200_OK, 
                          msg=f"Expected 200 OK but got {response.status_code}. Response: {response.data}")
-        self.assertEqual(len(response.data), 1, "User should see their own shop.")
+        self.assertEqual(len(response.data['results']), 1, "User should see their own shop.")
 
     def test_admin_can_see_all_shops(self):
         """Test that admin can see all shops."""
@@ -71,7 +71,7 @@ class ShopViewSetTests(APITestCase):
         print("Admin List Shops Response:", response.content)  # Debugging line
         self.assertEqual(response.status_code, status.HTTP_200_OK, 
                          msg=f"Expected 200 OK but got {response.status_code}. Response: {response.data}")
-        self.assertGreater(len(response.data), 0, "Admin should see all shops.")
+        self.assertGreater(len(response.data['results']), 0, "Admin should see all shops.")
 
     def test_update_shop(self):
         """Test updating a shop."""
@@ -202,5 +202,5 @@ class ShopViewSetTests(APITestCase):
         print("User List Own Shops Response:", response.content)  # Debugging line
         self.assertEqual(response.status_code, status.HTTP_200_OK, 
                         msg=f"Expected 200 OK but got {response.status_code}. Response: {response.data}")
-        self.assertEqual(len(response.data), 1, "User should only see their own shop.")
+        self.assertEqual(len(response.data['results']), 1, "User should only see their own shop.")
 
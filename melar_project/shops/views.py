@@ -5,10 +5,14 @@ from rest_framework.permissions import IsAuthenticated
 from .models import Shop
 from .serializers import ShopSerializer
 from users.permissions import IsOwner
+from melar_project.conditional import ConditionalGetMixin
+from melar_project.fast_serializers import FastListMixin, FastSerializer
+from melar_project.routers import ReplicaReadMixin
 
-class ShopViewSet(viewsets.ModelViewSet):
+class ShopViewSet(ReplicaReadMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Shop.objects.all()
     serializer_class = ShopSerializer
+    fast_serializer = FastSerializer(ShopSerializer)
     permission_classes = [IsAuthenticated, IsOwner]
 
     def perform_create(self, serializer):
@@ -0,0 +1,61 @@
+# authentication.py
+
+from asgiref.sync import sync_to_async
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import StatelessUser
+
+# Klaim yang disematkan ke token saat login, cukup untuk kelas-kelas di permissions.py
+USER_CLAIMS = ('role', 'is_seller', 'is_active')
+
+
+def add_user_claims(token, user):
+    """Sematkan role, is_seller dan is_active pengguna sebagai klaim token."""
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """Autentikasi JWT yang membangun pengguna dari klaim token tanpa SELECT per request.
+
+    Token tanpa klaim pengguna (mis. diterbitkan sebelum klaim diperkenalkan)
+    tetap diautentikasi lewat database seperti JWTAuthentication biasa.
+    """
+
+    async def aauthenticate(self, request):
+        """Varian async untuk view async; hanya token tanpa klaim yang menyentuh database."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if all(claim in validated_token for claim in USER_CLAIMS):
+            return self.get_user(validated_token), validated_token
+        return await sync_to_async(self.get_user)(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed("Token contained no recognizable user identification")
+
+        if not validated_token['is_active']:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        claims = {api_settings.USER_ID_FIELD: user_id}
+        claims.update((claim, validated_token[claim]) for claim in USER_CLAIMS)
+        field_names = [f.attname for f in StatelessUser._meta.concrete_fields if f.attname in claims]
+        return StatelessUser.from_db(
+            router.db_for_read(StatelessUser),
+            field_names,
+            [claims[name] for name in field_names],
+        )
@@ -0,0 +1,127 @@
+# blacklist.py
+
+import hashlib
+import math
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """Bloom filter sederhana: `in` bisa salah positif, tetapi tidak pernah salah negatif."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+BLACKLIST_VERSION_KEY = 'users:blacklist:version'
+
+
+def blacklist_version_cache():
+    return caches[getattr(settings, 'TOKEN_BLACKLIST_FILTER_CACHE', 'default')]
+
+
+def bump_blacklist_version():
+    """Tandai bahwa ada baris blacklist baru, agar filter di semua proses segera sinkron."""
+    blacklist_version_cache().set(BLACKLIST_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+class TokenBlacklistFilter:
+    """Bloom filter per proses berisi JTI yang di-blacklist.
+
+    Filter hanya pra-pemeriksaan "pasti tidak di-blacklist": jawaban "tidak ada"
+    melewati tabel blacklist, jawaban "mungkin ada" dikonfirmasi ke database.
+    Setiap baris blacklist baru mengganti token versi di cache bersama
+    TOKEN_BLACKLIST_FILTER_CACHE (lihat users.signals); sebelum menjawab, filter
+    membandingkan token itu dan mengambil baris baru dari database bila berubah,
+    sehingga token yang di-blacklist di proses lain langsung ditolak. Sinkronisasi
+    berkala setiap TOKEN_BLACKLIST_FILTER_SYNC_SECONDS detik tetap berjalan sebagai
+    cadangan bila token versi hilang dari cache.
+    """
+
+    def __init__(self, sync_interval=5, error_rate=0.001):
+        self.sync_interval = sync_interval
+        self.error_rate = error_rate
+        self._bloom = None
+        self._last_id = 0
+        self._last_sync = 0.0
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _rebuild(self):
+        last_id = BlacklistedToken.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        jtis = list(
+            BlacklistedToken.objects.filter(id__lte=last_id, token__expires_at__gt=timezone.now())
+            .values_list('token__jti', flat=True)
+        )
+        bloom = BloomFilter(max(MIN_CAPACITY, len(jtis) * 2), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        self._bloom, self._last_id, self._last_sync = bloom, last_id, time.monotonic()
+
+    def _sync(self):
+        rows = BlacklistedToken.objects.filter(id__gt=self._last_id).values_list('id', 'token__jti')
+        for row_id, jti in rows:
+            self._bloom.add(jti)
+            self._last_id = max(self._last_id, row_id)
+        self._last_sync = time.monotonic()
+
+    def might_contain(self, jti):
+        # Token versi dibaca sebelum sinkronisasi: baris yang ditulis setelahnya memicu sinkronisasi berikutnya
+        version = blacklist_version_cache().get(BLACKLIST_VERSION_KEY)
+        with self._lock:
+            if self._bloom is None or self._bloom.count > self._bloom.capacity:
+                self._rebuild()
+            elif version != self._version or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync()
+            self._version = version
+            return jti in self._bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+
+_blacklist_filter = None
+
+
+def get_blacklist_filter():
+    global _blacklist_filter
+    if _blacklist_filter is None:
+        _blacklist_filter = TokenBlacklistFilter(
+            sync_interval=getattr(settings, 'TOKEN_BLACKLIST_FILTER_SYNC_SECONDS', 5),
+            error_rate=getattr(settings, 'TOKEN_BLACKLIST_FILTER_ERROR_RATE', 0.001),
+        )
+    return _blacklist_filter
+
+
+def reset_blacklist_filter():
+    global _blacklist_filter
+    _blacklist_filter = None
@@ -0,0 +1,19 @@
+from django.core.checks import Error, register
+
+from products.checks import is_per_process_cache
+from .blacklist import blacklist_version_cache
+
+
+@register(deploy=True)
+def check_blacklist_version_cache(app_configs, **kwargs):
+    """Token versi blacklist harus bersama agar logout terlihat oleh semua worker."""
+    if not is_per_process_cache(blacklist_version_cache()):
+        return []
+    return [
+        Error(
+            "TOKEN_BLACKLIST_FILTER_CACHE memakai cache per proses; token yang di-blacklist "
+            "di satu worker masih diterima worker lain hingga sinkronisasi berkala.",
+            hint='Arahkan TOKEN_BLACKLIST_FILTER_CACHE ke alias cache bersama (Redis, Memcached, database).',
+            id='users.E001',
+        )
+    ]
@@ -0,0 +1,93 @@
+# hashing.py
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+
+
+class PasswordHashingBusy(Exception):
+    """Antrian hashing penuh; request sebaiknya ditolak dengan 503 dan dicoba lagi."""
+
+
+class PasswordHashingPool:
+    """Thread pool terbatas untuk hashing password dengan backpressure.
+
+    PBKDF2 dari hashlib melepas GIL, sehingga thread cukup untuk memakai semua core.
+    Jumlah pekerjaan yang sedang berjalan atau mengantre dibatasi `max_pending`;
+    pekerjaan berikutnya langsung ditolak dengan PasswordHashingBusy alih-alih
+    menumpuk dan menahan worker request. `max_pending=0` berarti tanpa batas.
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = self.workers * 4 if max_pending is None else max_pending
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hashing')
+        self._slots = threading.BoundedSemaphore(self.max_pending) if self.max_pending else None
+
+    def submit(self, fn, *args):
+        if self._slots is None:
+            return self._executor.submit(fn, *args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusy()
+        try:
+            return self._executor.submit(self._call, fn, args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _call(self, fn, args):
+        # Slot dilepas sebelum hasil terlihat oleh pemanggil
+        try:
+            return fn(*args)
+        finally:
+            self._slots.release()
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+def verify_password(raw_password, encoded):
+    """Periksa password dan laporkan apakah hash perlu diperbarui (hasher/iterasi berubah).
+
+    Hanya melakukan hashing, tanpa akses database, agar aman dijalankan di pool.
+    """
+    if not check_password(raw_password, encoded):
+        return False, False
+    preferred = get_hasher('default')
+    hasher = identify_hasher(encoded)
+    must_update = hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+    return True, must_update
+
+
+def hash_password(raw_password):
+    return make_password(raw_password)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PasswordHashingPool(
+                workers=getattr(settings, 'PASSWORD_HASHING_WORKERS', None),
+                max_pending=getattr(settings, 'PASSWORD_HASHING_MAX_PENDING', None),
+            )
+        return _pool
+
+
+def reset_hashing_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
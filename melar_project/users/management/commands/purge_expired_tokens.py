@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    help = "Hapus OutstandingToken dan BlacklistedToken yang sudah kedaluwarsa secara bertahap."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Jumlah token yang dihapus per transaksi.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        now = timezone.now()
+        deleted = 0
+
+        # Hapus per potongan agar transaksi tetap pendek dan memori tetap kecil
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                # BlacklistedToken ikut terhapus lewat CASCADE
+                _, per_model = OutstandingToken.objects.filter(pk__in=ids).delete()
+            deleted += per_model.get(OutstandingToken._meta.label, 0)
+
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired tokens."))
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0005_alter_customuser_role"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatelessUser",
+            fields=[
+            ],
+            options={
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("users.customuser",),
+        ),
+    ]
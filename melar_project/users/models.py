@@ -9,8 +9,13 @@ class CustomUserManager(BaseUserManager):
             raise ValueError('Email harus diisi')
         email = self.normalize_email(email)
         extra_fields.setdefault('role', 'user')  # Default role adalah user
+        password_hash = extra_fields.pop('password_hash', None)
         user = self.model(email=email, username=username, **extra_fields)
-        user.set_password(password)
+        if password_hash:
+            # Hash sudah dihitung di luar thread request (lihat users.hashing)
+            user.password = password_hash
+        else:
+            user.set_password(password)
         user.save(using=self._db)
         return user
 
@@ -52,3 +57,20 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         role_display = "Admin" if self.role == 'admin' else "Seller" if self.is_seller else "Customer"
         return f"{self.email} ({role_display})"
+
+
+class StatelessUser(CustomUser):
+    """Pengguna yang dibangun dari klaim JWT tanpa query ke database.
+
+    Hanya field yang ada di token yang terisi; field lain ditunda (deferred) dan
+    seluruhnya dimuat dalam satu query saat salah satunya pertama kali diakses.
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
@@ -5,6 +5,11 @@ from django.contrib.auth.password_validation import validate_password
 from .models import CustomUser
 from django.contrib.auth import password_validation
 from django.contrib.auth.hashers import check_password
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from .authentication import USER_CLAIMS, add_user_claims
+from .tokens import FilteredRefreshToken
 
 class CustomUserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
@@ -84,4 +89,25 @@ class ChangePasswordSerializer(serializers.Serializer):
         user.save()
         return user
 
-  
+
+class UserClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Tambahkan klaim role, is_seller dan is_active ke token saat login."""
+    token_class = FilteredRefreshToken
+
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class UserClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Perbarui klaim pengguna pada access token baru agar perubahan role ikut terbawa."""
+    token_class = FilteredRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data['access'])
+        user = CustomUser.objects.only(*USER_CLAIMS).get(
+            **{api_settings.USER_ID_FIELD: access[api_settings.USER_ID_CLAIM]}
+        )
+        data['access'] = str(add_user_claims(access, user))
+        return data
@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .blacklist import bump_blacklist_version
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def announce_blacklisted_token(sender, instance, created, raw=False, **kwargs):
+    # Setelah commit: proses lain yang sinkron lebih awal tidak akan melihat barisnya
+    if created and not raw:
+        transaction.on_commit(bump_blacklist_version)
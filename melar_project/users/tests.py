@@ -2,6 +2,20 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+import threading
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hasher
+from .blacklist import BloomFilter, get_blacklist_filter, reset_blacklist_filter
+from .checks import check_blacklist_version_cache
+from .hashing import PasswordHashingBusy, PasswordHashingPool, get_hashing_pool, reset_hashing_pool
+from .tokens import FilteredRefreshToken
 
 User = get_user_model()
 
@@ -47,6 +61,19 @@ class UserTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('tokens', response.data)
 
+    def test_login_wrong_password(self):
+        """Test that a failed login keeps the documented message body."""
+        response = self.client.post(self.login_url, {
+            'email': self.user_data['email'],
+            'password': 'wrongpassword'
+        })
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data, {"message": "Login failed. Please check your credentials."})
+
+        response = self.client.post(self.login_url, {'email': self.user_data['email']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"message": "Login failed. Please check your credentials."})
+
     def test_logout_user(self):
         """Test user logout."""
         # Logout without sending an invalid refresh token
@@ -82,3 +109,261 @@ class UserTests(APITestCase):
         self.client.logout()  # Logout to test unauthenticated access
         response = self.client.get(self.profile_url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_conditional_get(self):
+        """Test that the profile honours If-None-Match and If-Modified-Since."""
+        response = self.client.get(self.profile_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        response = self.client.get(self.profile_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(self.profile_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.user.full_name = 'Changed Name'
+        self.user.save()
+        response = self.client.get(self.profile_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class StatelessJWTTests(APITestCase):
+
+    def setUp(self):
+        """Create a user and log in through the API to obtain tokens with user claims."""
+        self.user = User.objects.create_user(
+            username='claims', email='claims@example.com', full_name='Claims User', password='testpassword123'
+        )
+        response = self.client.post(reverse('login'), {
+            'email': 'claims@example.com', 'password': 'testpassword123'
+        })
+        self.tokens = response.data['tokens']
+
+    def auth(self, access=None):
+        return {'HTTP_AUTHORIZATION': f"Bearer {access or self.tokens['access']}"}
+
+    def test_login_token_contains_user_claims(self):
+        """Test that login embeds role, is_seller and is_active as token claims."""
+        token = AccessToken(self.tokens['access'])
+        self.assertEqual((token['role'], token['is_seller'], token['is_active']), ('user', False, True))
+
+    def test_authentication_skips_user_query(self):
+        """Test that permission checks are answered from the token alone."""
+        # Hanya query validator ETag dan cart; tanpa SELECT pengguna
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/cart/', **self.auth())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Permission berbasis role tetap bekerja dari klaim
+        with self.assertNumQueries(0):
+            response = self.client.get('/products/', **self.auth())
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_other_fields_are_loaded_lazily_once(self):
+        """Test that touching non-claim fields loads the user with a single query."""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('profile'), **self.auth())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], 'claims@example.com')
+        self.assertEqual(response.data['full_name'], 'Claims User')
+
+    def test_inactive_claim_is_rejected(self):
+        """Test that a token carrying is_active=False is refused."""
+        token = AccessToken(self.tokens['access'])
+        token['is_active'] = False
+        response = self.client.get(reverse('profile'), **self.auth(str(token)))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_updates_claims(self):
+        """Test that a refreshed access token carries the current role."""
+        self.user.role = 'admin'
+        self.user.save()
+        response = self.client.post(reverse('token_refresh'), {'refresh': self.tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['role'], 'admin')
+
+    def test_token_without_claims_falls_back_to_database(self):
+        """Test that tokens issued without user claims still authenticate."""
+        access = str(RefreshToken.for_user(self.user).access_token)
+        response = self.client.get(reverse('profile'), **self.auth(access))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TokenBlacklistFilterTests(APITestCase):
+
+    def setUp(self):
+        """Start every test with a fresh per-process filter."""
+        reset_blacklist_filter()
+        self.addCleanup(reset_blacklist_filter)
+        self.user = User.objects.create_user(
+            username='blacklist', email='blacklist@example.com', full_name='Blacklist User',
+            password='testpassword123'
+        )
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        """Test that every added item is reported as present."""
+        bloom = BloomFilter(capacity=100)
+        items = [f'jti-{i}' for i in range(100)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+        false_positives = sum(f'other-{i}' in bloom for i in range(1000))
+        self.assertLess(false_positives, 20)
+
+    def test_unblacklisted_token_skips_database(self):
+        """Test that a token that is not blacklisted is verified without a blacklist query."""
+        get_blacklist_filter().might_contain('warm-up')
+        refresh = str(FilteredRefreshToken.for_user(self.user))
+        with self.assertNumQueries(0):
+            FilteredRefreshToken(refresh)
+
+    def test_logout_blacklists_token(self):
+        """Test that a token blacklisted at logout is rejected afterwards."""
+        refresh = FilteredRefreshToken.for_user(self.user)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse('logout'), {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_205_RESET_CONTENT)
+
+        with self.assertRaises(TokenError):
+            FilteredRefreshToken(str(refresh))
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_BLACKLIST_FILTER_SYNC_SECONDS=0)
+    def test_filter_picks_up_blacklist_rows_from_other_processes(self):
+        """Test that rows written elsewhere reach the filter on the next sync."""
+        get_blacklist_filter().might_contain('warm-up')
+        refresh = FilteredRefreshToken.for_user(self.user)
+        outstanding = OutstandingToken.objects.get(jti=refresh['jti'])
+        BlacklistedToken.objects.create(token=outstanding)  # Ditulis tanpa melewati filter
+
+        with self.assertRaises(TokenError):
+            FilteredRefreshToken(str(refresh))
+
+    def test_blacklist_in_another_process_applies_before_next_sync(self):
+        """Test that a new blacklist row bumps the shared version so the filter syncs at once."""
+        get_blacklist_filter().might_contain('warm-up')
+        refresh = FilteredRefreshToken.for_user(self.user)
+        outstanding = OutstandingToken.objects.get(jti=refresh['jti'])
+        with self.captureOnCommitCallbacks(execute=True):
+            BlacklistedToken.objects.create(token=outstanding)
+
+        with self.assertRaises(TokenError):
+            FilteredRefreshToken(str(refresh))
+        # Tanpa baris baru, pemeriksaan berikutnya kembali tanpa query
+        other = str(FilteredRefreshToken.for_user(self.user))
+        with self.assertNumQueries(0):
+            FilteredRefreshToken(other)
+
+    def test_deploy_check_rejects_per_process_version_cache(self):
+        """Test that the deploy check flags a blacklist version cache local to one process."""
+        self.assertEqual([error.id for error in check_blacklist_version_cache(None)], ['users.E001'])
+
+    def test_purge_expired_tokens(self):
+        """Test that expired outstanding and blacklisted tokens are purged in chunks."""
+        past = timezone.now() - timedelta(days=1)
+        for i in range(5):
+            token = OutstandingToken.objects.create(jti=f'expired-{i}', token='x', expires_at=past)
+            if i % 2 == 0:
+                BlacklistedToken.objects.create(token=token)
+        live = FilteredRefreshToken.for_user(self.user)
+
+        out = StringIO()
+        call_command('purge_expired_tokens', '--batch-size', '2', stdout=out)
+
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [live['jti']])
+        self.assertFalse(BlacklistedToken.objects.exists())
+        self.assertIn('Purged 5 expired tokens', out.getvalue())
+
+
+class AsyncAuthTests(APITestCase):
+
+    def setUp(self):
+        """Start every test with a fresh hashing pool."""
+        reset_hashing_pool()
+        self.addCleanup(reset_hashing_pool)
+        self.user = User.objects.create_user(
+            username='async', email='async@example.com', full_name='Async User', password='testpassword123'
+        )
+
+    def test_async_register(self):
+        """Test registration through the async path with a pool-computed hash."""
+        response = self.client.post(reverse('register_async'), {
+            'username': 'newuser', 'email': 'newuser@example.com',
+            'full_name': 'New User', 'password': 'newpassword123'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['user']['email'], 'newuser@example.com')
+        self.assertTrue(User.objects.get(email='newuser@example.com').check_password('newpassword123'))
+
+    def test_async_register_invalid(self):
+        """Test that validation errors are reported like the sync endpoint."""
+        response = self.client.post(reverse('register_async'), {'email': 'bad'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('errors', response.json())
+
+    def test_async_login(self):
+        """Test that async login returns tokens carrying user claims."""
+        response = self.client.post(reverse('login_async'), {
+            'email': 'async@example.com', 'password': 'testpassword123'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.json()['tokens']['access'])['role'], 'user')
+
+    def test_async_login_wrong_password(self):
+        """Test that wrong credentials and unknown emails are rejected."""
+        for email in ('async@example.com', 'unknown@example.com'):
+            response = self.client.post(reverse('login_async'), {
+                'email': email, 'password': 'wrongpassword'
+            }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_rehashes_when_iterations_change(self):
+        """Test that a hash made with old iterations is upgraded on successful login."""
+        old_hash = PBKDF2PasswordHasher().encode('testpassword123', 'oldsalt', iterations=1000)
+        User.objects.filter(pk=self.user.pk).update(password=old_hash)
+
+        response = self.client.post(reverse('login_async'), {
+            'email': 'async@example.com', 'password': 'testpassword123'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.password, old_hash)
+        self.assertFalse(get_hasher('default').must_update(self.user.password))
+        self.assertTrue(self.user.check_password('testpassword123'))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_MAX_PENDING=1)
+    def test_saturated_pool_returns_503(self):
+        """Test that login is refused quickly when the hashing queue is full."""
+        release = threading.Event()
+        self.addCleanup(release.set)
+        get_hashing_pool().submit(release.wait)
+        response = self.client.post(reverse('login_async'), {
+            'email': 'async@example.com', 'password': 'testpassword123'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_pool_rejects_work_beyond_max_pending(self):
+        """Test that the pool applies backpressure instead of queueing without bound."""
+        pool = PasswordHashingPool(workers=1, max_pending=1)
+        self.addCleanup(pool.shutdown)
+        release = threading.Event()
+        future = pool.submit(release.wait)
+        with self.assertRaises(PasswordHashingBusy):
+            pool.submit(len, 'x')
+        release.set()
+        future.result()
+        self.assertEqual(pool.submit(len, 'xy').result(), 2)
+
+    def test_pool_without_pending_limit(self):
+        """Test that max_pending=0 disables backpressure instead of rejecting everything."""
+        pool = PasswordHashingPool(workers=1, max_pending=0)
+        self.addCleanup(pool.shutdown)
+        release = threading.Event()
+        futures = [pool.submit(release.wait) for _ in range(3)]
+        last = pool.submit(len, 'x')
+        release.set()
+        self.assertEqual(last.result(timeout=5), 1)
+        self.assertTrue(all(future.result(timeout=5) for future in futures))
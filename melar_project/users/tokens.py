@@ -0,0 +1,19 @@
+# tokens.py
+
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .blacklist import get_blacklist_filter
+
+
+class FilteredRefreshToken(RefreshToken):
+    """Refresh token yang memeriksa bloom filter sebelum menanyakan tabel blacklist."""
+
+    def check_blacklist(self):
+        if get_blacklist_filter().might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        get_blacklist_filter().add(self.payload[api_settings.JTI_CLAIM])
+        return result
@@ -1,12 +1,16 @@
 # urls.py
 
 from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework_simplejwt.views import TokenRefreshView
-from .views import RegisterView, LoginView, LogoutView, UserProfileView, ChangePasswordView
+from .views import RegisterView, LoginView, AsyncRegisterView, AsyncLoginView, LogoutView, UserProfileView, ChangePasswordView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
+    # Jalur async: hashing password dijalankan di pool terbatas (users.hashing)
+    path('async/register/', csrf_exempt(AsyncRegisterView.as_view()), name='register_async'),
+    path('async/login/', csrf_exempt(AsyncLoginView.as_view()), name='login_async'),
     path('logout/', LogoutView.as_view(), name='logout'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('profile/', UserProfileView.as_view(), name='profile'),
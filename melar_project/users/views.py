@@ -1,12 +1,27 @@
 # views.py
 
 from rest_framework import status, permissions, generics
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import FilteredRefreshToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView
-from .serializers import CustomUserSerializer, ChangePasswordSerializer
+from .serializers import CustomUserSerializer, ChangePasswordSerializer, UserClaimsTokenObtainPairSerializer
+from .models import CustomUser
+from .hashing import PasswordHashingBusy, get_hashing_pool, hash_password, verify_password
 from django.conf import settings
+from django.db import DatabaseError
+from django.http import JsonResponse
+from django.views import View
+from asgiref.sync import sync_to_async
+from carts.guest import GUEST_CART_COOKIE, guest_cart_token, merge_guest_cart
+from melar_project.conditional import ConditionalGetMixin
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
 
 class RegisterView(APIView):
     """Handle user registration and return relevant feedback."""
@@ -31,15 +46,129 @@ class LoginView(TokenObtainPairView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
-        if response.status_code == status.HTTP_200_OK:
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0]) from e
+        except (AuthenticationFailed, ValidationError) as e:
             return Response({
-                "message": "Login successful.",
-                "tokens": response.data
-            }, status=status.HTTP_200_OK)
-        return Response({
-            "message": "Login failed. Please check your credentials."
-        }, status=response.status_code)
+                "message": "Login failed. Please check your credentials."
+            }, status=e.status_code)
+
+        response = Response({
+            "message": "Login successful.",
+            "tokens": serializer.validated_data
+        }, status=status.HTTP_200_OK)
+        _merge_guest_cart(request, serializer.user, response)
+        return response
+
+
+def _merge_guest_cart(request, user, response):
+    """Pindahkan keranjang tamu (bila ada) ke keranjang pengguna yang baru login.
+
+    Penggabungan yang gagal tidak menggagalkan login: keranjang tamu dan cookie-nya
+    dibiarkan agar bisa digabung pada login berikutnya.
+    """
+    token = guest_cart_token(request)
+    if token:
+        try:
+            merge_guest_cart(user, token)
+        except DatabaseError:
+            logger.exception('Gagal menggabungkan keranjang tamu untuk pengguna %s', user.pk)
+            return
+        response.delete_cookie(GUEST_CART_COOKIE)
+
+
+def _parse_body(request):
+    """Baca body JSON atau form untuk view async yang tidak melewati parser DRF."""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST.dict()
+
+
+def _busy_response():
+    response = JsonResponse({
+        "message": "Server is busy, please try again shortly."
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = '1'
+    return response
+
+
+class AsyncRegisterView(View):
+    """Registrasi dengan hashing password di pool terbatas, bukan di thread request."""
+
+    async def post(self, request):
+        data = _parse_body(request)
+        if data is None:
+            return JsonResponse({"message": "Malformed request body."}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = CustomUserSerializer(data=data, context={'request': request})
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse({
+                "message": "Registration failed. Please check the provided data.",
+                "errors": serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            password_hash = await get_hashing_pool().run(hash_password, serializer.validated_data['password'])
+        except PasswordHashingBusy:
+            return _busy_response()
+
+        def save():
+            serializer.save(password_hash=password_hash)
+            return serializer.data
+
+        return JsonResponse({
+            "message": "User registered successfully.",
+            "user": await sync_to_async(save)()
+        }, status=status.HTTP_201_CREATED)
+
+
+class AsyncLoginView(View):
+    """Login JWT dengan verifikasi password di pool terbatas.
+
+    Bila hasher atau jumlah iterasi di PASSWORD_HASHERS berubah, hash pengguna
+    diperbarui secara transparan setelah login berhasil.
+    """
+
+    async def post(self, request):
+        data = _parse_body(request) or {}
+        email, password = data.get('email'), data.get('password')
+        if not email or not password:
+            return JsonResponse({
+                "message": "Login failed. Please check your credentials."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        user = await CustomUser.objects.filter(email=email).afirst()
+        pool = get_hashing_pool()
+        try:
+            if user is None:
+                # Tetap hitung hash agar waktu respons tidak membocorkan email yang terdaftar
+                await pool.run(hash_password, password)
+                valid, must_update = False, False
+            else:
+                valid, must_update = await pool.run(verify_password, password, user.password)
+            if valid and must_update:
+                user.password = await pool.run(hash_password, password)
+                await user.asave(update_fields=['password'])
+        except PasswordHashingBusy:
+            return _busy_response()
+
+        if not valid or not user.is_active:
+            return JsonResponse({
+                "message": "Login failed. Please check your credentials."
+            }, status=status.HTTP_401_UNAUTHORIZED)
+
+        refresh = await sync_to_async(UserClaimsTokenObtainPairSerializer.get_token)(user)
+        response = JsonResponse({
+            "message": "Login successful.",
+            "tokens": {"refresh": str(refresh), "access": str(refresh.access_token)}
+        }, status=status.HTTP_200_OK)
+        await sync_to_async(_merge_guest_cart)(request, user, response)
+        return response
 
 
 class LogoutView(APIView):
@@ -54,7 +183,7 @@ class LogoutView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            token = RefreshToken(refresh_token)
+            token = FilteredRefreshToken(refresh_token)
             token.blacklist()  # Assumes simplejwt.blacklist is configured
             return Response({
                 "message": "Logout successful. Token has been blacklisted."
@@ -66,7 +195,7 @@ class LogoutView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserProfileView(generics.RetrieveUpdateAPIView):
+class UserProfileView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     """Retrieve and update the authenticated user's profile."""
     serializer_class = CustomUserSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -75,6 +204,15 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         """Return the current authenticated user."""
         return self.request.user
 
+    def get_detail_last_modified(self):
+        """Read updated_at, which loads the user's deferred fields in one query.
+
+        StatelessUser only carries the token claims. The serializer needs the same fields,
+        so a full GET still costs a single query. updated_at stays out of the claims,
+        because it would be stale after a profile edit until the token is refreshed.
+        """
+        return self.request.user.updated_at
+
     def update(self, request, *args, **kwargs):
         """Update the user's profile with feedback messages."""
         user = self.get_object()